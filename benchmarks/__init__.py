@@ -0,0 +1,30 @@
+"""
+Performance benchmarks.
+
+Usage:
+    python -m benchmarks.bench_server_list [--sizes 5000 50000] [--update-baseline]
+    python -m benchmarks.bench_api_refresh [--sizes 5000 20000] [--latency 0.05] [--update-baseline]
+    python -m benchmarks.bench_import_time [--top 15] [--update-baseline]
+    python -m benchmarks.bench_kill_switch [--switches 10] [--update-baseline]
+
+Results are compared against the baselines stored in benchmarks/baselines.
+Timings depend on the machine, so baselines should be updated on the
+machine the benchmarks are compared on.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
@@ -0,0 +1,128 @@
+"""
+End-to-end benchmark of the server list refreshes against the fake API.
+
+Usage:
+    python -m benchmarks.bench_api_refresh [--sizes 5000 20000] [--latency 0.05] [--update-baseline]
+
+Requests go through the REST API helpers, are serialized to JSON and sent
+over the loopback interface, so the measured times include the costs
+hidden by mocked sessions. The fake API runs in the same process, so its
+allocations are included in the memory peak.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn.core.testing.fake_api import FakeAPIServer, LoopbackAPIClient
+from proton.vpn.session.rate_limiter import RateLimiter
+from proton.vpn.session.servers.fetcher import ServerListFetcher
+from proton.vpn.session.utils import set_api_rate_limiter
+
+from benchmarks.common import BenchmarkResult, build_argument_parser, measure_async, report
+
+BENCHMARK_NAME = "api_refresh"
+DEFAULT_SIZES = (5_000, 20_000)
+USER_TIER = 2
+# The client-side rate limit would otherwise be what is measured.
+UNLIMITED = 1_000_000
+
+
+class LoopbackSession:
+    """Minimal stand-in for the VPN session, sending its requests to the fake API."""
+    def __init__(self, client: LoopbackAPIClient):
+        self.async_api_request = client.async_api_request
+        self.vpn_account = SimpleNamespace(
+            max_tier=USER_TIER, location=SimpleNamespace(IP="127.0.0.1")
+        )
+        # Feature flags enabling If-Modified-Since on the logicals route.
+        self.feature_flags = SimpleNamespace(get=lambda _flag: True)
+
+
+async def run(sizes: List[int], latency: float, repeat: int) -> List[BenchmarkResult]:
+    """Runs the benchmark for each fleet size and returns the results."""
+    set_api_rate_limiter(RateLimiter(
+        global_rate=UNLIMITED, global_capacity=UNLIMITED,
+        route_rate=UNLIMITED, route_capacity=UNLIMITED
+    ))
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for size in sizes:
+            cache_file = CacheHandler(str(Path(cache_dir) / f"serverlist-{size}.json"))
+            results.extend(await run_fleet(size, latency, repeat, cache_file))
+
+    return results
+
+
+async def run_fleet(
+    size: int, latency: float, repeat: int, cache_file: CacheHandler
+) -> List[BenchmarkResult]:
+    """Runs the benchmark against a fake API serving a fleet of the specified size."""
+    async with FakeAPIServer(fleet_size=size, seed=size, latency=latency) as server:
+        client = LoopbackAPIClient(server.port)
+        session = LoopbackSession(client)
+        state = {}
+
+        async def new_fetcher():
+            state["fetcher"] = ServerListFetcher(session, cache_file=cache_file)
+
+        await new_fetcher()
+        await state["fetcher"].fetch()
+
+        results = [
+            await measure_async(
+                f"{size}: fetch", lambda: state["fetcher"].fetch(),
+                setup=new_fetcher, repeat=repeat
+            ),
+            # The fetcher keeps its server list: If-Modified-Since -> 304.
+            await measure_async(
+                f"{size}: fetch not modified", lambda: state["fetcher"].fetch(), repeat=repeat
+            ),
+            await measure_async(
+                f"{size}: update_loads", lambda: state["fetcher"].update_loads(), repeat=repeat
+            ),
+        ]
+        await client.close()
+
+    return results
+
+
+def main() -> int:
+    """Benchmark entry point."""
+    parser = build_argument_parser(__doc__.strip().split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="Number of logical servers of the fake API fleets."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0,
+        help="Latency, in seconds, added by the fake API to every response (default: 0)."
+    )
+    args = parser.parse_args()
+    results = asyncio.run(run(args.sizes, args.latency, args.repeat))
+    return report(BENCHMARK_NAME, results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
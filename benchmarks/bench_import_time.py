@@ -0,0 +1,158 @@
+"""
+Benchmark of the start-up cost of the library: import time and construction of ProtonVPNAPI.
+
+Usage:
+    python -m benchmarks.bench_import_time [--module proton.vpn.core.api] [--top 15]
+
+Every measurement is done in a fresh interpreter, so that nothing is
+already imported or cached.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List
+
+from benchmarks.common import BenchmarkResult, build_argument_parser, report
+
+BENCHMARK_NAME = "import_time"
+DEFAULT_MODULE = "proton.vpn.core.api"
+
+# Script run in a fresh interpreter to time the import of the library and
+# the construction of ProtonVPNAPI. It prints the results as JSON.
+STARTUP_SCRIPT = """
+import json, resource, time
+start = time.perf_counter()
+from proton.vpn.core.api import ProtonVPNAPI, ClientTypeMetadata
+imported = time.perf_counter()
+ProtonVPNAPI(ClientTypeMetadata(type="cli", version="0.0.0"))
+constructed = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "construct": constructed - imported,
+    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}))
+"""
+
+
+@dataclass
+class ImportTime:
+    """Entry of the `-X importtime` output."""
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+
+
+def parse_import_times(output: str) -> List[ImportTime]:
+    """
+    Parses the output of `python -X importtime`, which has lines like:
+        import time:      self [us] |  cumulative | imported package
+        import time:       123 |        456 |   proton.vpn.core.api
+    """
+    import_times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line.
+        import_times.append(ImportTime(
+            module=fields[2].strip(),
+            self_seconds=int(fields[0]) / 1_000_000,
+            cumulative_seconds=int(fields[1]) / 1_000_000,
+        ))
+    return import_times
+
+
+def measure_import_times(module: str) -> List[ImportTime]:
+    """Returns the import time breakdown of the module, measured in a fresh interpreter."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    return parse_import_times(process.stderr)
+
+
+def measure_startup(repeat: int) -> List[BenchmarkResult]:
+    """
+    Measures the time to import the library and to construct ProtonVPNAPI.
+
+    The times are the median of `repeat` fresh interpreters. The memory is
+    the peak resident set size of the interpreter, which includes the
+    interpreter itself.
+    """
+    runs = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    max_rss = int(statistics.median(run["max_rss_bytes"] for run in runs))
+    return [
+        BenchmarkResult(
+            "import proton.vpn.core.api",
+            statistics.median(run["import"] for run in runs), max_rss
+        ),
+        BenchmarkResult(
+            "construct ProtonVPNAPI",
+            statistics.median(run["construct"] for run in runs), max_rss
+        ),
+    ]
+
+
+def print_import_breakdown(module: str, top: int):
+    """Prints the modules that take the longest to import, including their dependencies."""
+    import_times = measure_import_times(module)
+    total = next(
+        (entry.cumulative_seconds for entry in import_times if entry.module == module), 0
+    )
+    print(f"Slowest imports of {module} (total: {total * 1000:.2f} ms):")
+    print(f"{'module':<60} {'cumulative':>13} {'self':>13}")
+    slowest = sorted(import_times, key=lambda entry: entry.cumulative_seconds, reverse=True)
+    for entry in slowest[:top]:
+        print(
+            f"{entry.module:<60} {entry.cumulative_seconds * 1000:>10.2f} ms "
+            f"{entry.self_seconds * 1000:>10.2f} ms"
+        )
+    print()
+
+
+def main() -> int:
+    """Benchmark entry point."""
+    parser = build_argument_parser(__doc__.strip().split("\n", 1)[0])
+    parser.add_argument(
+        "--module", default=DEFAULT_MODULE,
+        help=f"Module whose import time is broken down (default: {DEFAULT_MODULE})."
+    )
+    parser.add_argument(
+        "--top", type=int, default=15,
+        help="Number of modules shown in the import time breakdown (default: 15)."
+    )
+    args = parser.parse_args()
+    print_import_breakdown(args.module, args.top)
+    results = measure_startup(args.repeat)
+    return report(BENCHMARK_NAME, results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
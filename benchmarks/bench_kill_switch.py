@@ -0,0 +1,128 @@
+"""
+Benchmark of the kill switch calls made while connecting, switching servers and disconnecting.
+
+Usage:
+    python -m benchmarks.bench_kill_switch [--switches 10] [--latency 0.005] [--update-baseline]
+
+The connection state machine is run against a kill switch backend that
+simulates the latency of each call, with and without the caching wrapper.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import sys
+from typing import List, Optional
+
+from proton.vpn.connection import events, states
+from proton.vpn.connection.enum import KillSwitchSetting
+from proton.vpn.core.testing.counting_kill_switch import CountingKillSwitch
+from proton.vpn.killswitch.interface import CachingKillSwitch
+
+from benchmarks.common import BenchmarkResult, build_argument_parser, measure, report
+
+BENCHMARK_NAME = "kill_switch"
+DEFAULT_SWITCHES = 10
+DEFAULT_LATENCY = 0.005
+
+
+class FakeConnection:
+    """VPN connection that is established and stopped instantly."""
+    def __init__(self, server_name: str):
+        self.server = server_name
+
+    async def start(self):
+        """Starts the connection."""
+
+    async def stop(self):
+        """Stops the connection."""
+
+    async def add_persistence(self):
+        """Persists the connection parameters."""
+
+    async def remove_persistence(self):
+        """Removes the persisted connection parameters."""
+
+
+def _backend_event(state: states.State) -> Optional[events.Event]:
+    """Returns the event the VPN backend would signal once the state tasks are done."""
+    context = events.EventContext(connection=state.context.connection)
+    if isinstance(state, states.Connecting):
+        return events.Connected(context)
+    if isinstance(state, states.Disconnecting):
+        return events.Disconnected(context)
+    return None
+
+
+async def _process_event(state: states.State, event: events.Event) -> states.State:
+    """Runs the state machine until it settles, like VPNConnector does."""
+    while event:
+        state = state.on_event(event)
+        event = await state.run_tasks() or _backend_event(state)
+    return state
+
+
+async def run_scenario(switches: int, kill_switch_setting: KillSwitchSetting):
+    """Connects, switches servers the specified number of times and disconnects."""
+    states.StateContext.kill_switch_setting = kill_switch_setting
+    state = states.Disconnected()
+    for server_number in range(switches + 1):
+        connection = FakeConnection(f"server-{server_number}")
+        state = await _process_event(state, events.Up(events.EventContext(connection=connection)))
+    disconnection = events.Down(events.EventContext(connection=state.context.connection))
+    await _process_event(state, disconnection)
+
+
+def run(switches: int, latency: float, repeat: int) -> List[BenchmarkResult]:
+    """Runs the scenario for each kill switch setting, with and without caching."""
+    results = []
+    for kill_switch_setting in KillSwitchSetting:
+        for caching in (False, True):
+            backend = CountingKillSwitch(latency=latency)
+            states.StateContext.kill_switch = CachingKillSwitch(backend) if caching else backend
+            name = (
+                f"KS {kill_switch_setting.name.lower()}{' (cached)' if caching else ''}: "
+                f"{switches} switches"
+            )
+            results.append(measure(
+                name, lambda: asyncio.run(run_scenario(switches, kill_switch_setting)),
+                repeat=repeat
+            ))
+            backend_calls_per_run = len(backend.calls) // (repeat + 1)
+            print(f"{name:<45} {backend_calls_per_run:>6} backend calls")
+    print()
+    return results
+
+
+def main() -> int:
+    """Benchmark entry point."""
+    parser = build_argument_parser(__doc__.strip().split("\n", 1)[0])
+    parser.add_argument(
+        "--switches", type=int, default=DEFAULT_SWITCHES,
+        help=f"Number of server switches (default: {DEFAULT_SWITCHES})."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=DEFAULT_LATENCY,
+        help=f"Simulated latency of each kill switch call, in seconds (default: {DEFAULT_LATENCY})."
+    )
+    args = parser.parse_args()
+    results = run(args.switches, args.latency, args.repeat)
+    return report(BENCHMARK_NAME, results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark of the ServerList operations with realistic fleets.
+
+Usage:
+    python -m benchmarks.bench_server_list [--sizes 5000 20000 50000] [--update-baseline]
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import sys
+from typing import List
+
+from proton.vpn.core.testing.fleet import generate_fleet, generate_loads
+from proton.vpn.session.servers.logicals import ServerList, PersistenceKeys
+from proton.vpn.session.servers.types import ServerLoad
+
+from benchmarks.common import BenchmarkResult, build_argument_parser, measure, report
+
+BENCHMARK_NAME = "server_list"
+DEFAULT_SIZES = (5_000, 20_000, 50_000)
+USER_TIER = 2
+
+
+def run(sizes: List[int], repeat: int) -> List[BenchmarkResult]:
+    """Runs the benchmark for each fleet size and returns the results."""
+    results = []
+    for size in sizes:
+        logicals = generate_fleet(size, seed=size)
+        payload = {"LogicalServers": logicals, PersistenceKeys.USER_TIER.value: USER_TIER}
+        raw_payload = json.dumps(payload)
+        raw_loads = json.dumps({"LogicalServers": generate_loads(logicals, seed=size)})
+        server_list = ServerList.from_dict(json.loads(raw_payload))
+        country = "US"
+        state = {}
+
+        def rebuild_server_list_and_loads():
+            state["server_list"] = ServerList.from_dict(json.loads(raw_payload))
+            state["loads"] = [
+                ServerLoad(data) for data in json.loads(raw_loads)["LogicalServers"]
+            ]
+
+        results.extend([
+            measure(
+                f"{size}: parse logicals JSON", lambda: json.loads(raw_payload), repeat=repeat
+            ),
+            measure(
+                f"{size}: ServerList.from_dict",
+                lambda: ServerList.from_dict(json.loads(raw_payload)), repeat=repeat
+            ),
+            measure(f"{size}: ServerList.to_dict", server_list.to_dict, repeat=repeat),
+            measure(f"{size}: ServerList.get_fastest", server_list.get_fastest, repeat=repeat),
+            measure(
+                f"{size}: ServerList.get_fastest_in_country",
+                lambda: server_list.get_fastest_in_country(country), repeat=repeat
+            ),
+            measure(
+                f"{size}: ServerList.group_by_country", server_list.group_by_country,
+                repeat=repeat
+            ),
+            measure(
+                f"{size}: ServerList.update",
+                lambda: state["server_list"].update(state["loads"]),
+                setup=rebuild_server_list_and_loads, repeat=repeat
+            ),
+        ])
+
+    return results
+
+
+def main() -> int:
+    """Benchmark entry point."""
+    parser = build_argument_parser(__doc__.strip().split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="Number of logical servers of the generated fleets."
+    )
+    args = parser.parse_args()
+    results = run(args.sizes, args.repeat)
+    return report(BENCHMARK_NAME, results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
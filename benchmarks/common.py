@@ -0,0 +1,192 @@
+"""
+Helpers shared by the benchmarks: measurement, reporting and baselines.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+BASELINES_PATH = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class BenchmarkResult:
+    """Result of a benchmarked operation."""
+    name: str
+    seconds: float  # Median of the runs.
+    peak_memory_bytes: int  # tracemalloc peak during a single run.
+
+    def format(self, baseline: Optional["BenchmarkResult"] = None) -> str:
+        """Returns a human-readable line with the result, compared to the baseline if any."""
+        line = (
+            f"{self.name:<45} {self.seconds * 1000:>10.2f} ms "
+            f"{self.peak_memory_bytes / 1024 / 1024:>10.2f} MiB"
+        )
+        if baseline:
+            line += (
+                f"   time {_format_ratio(self.seconds, baseline.seconds)}"
+                f"   memory {_format_ratio(self.peak_memory_bytes, baseline.peak_memory_bytes)}"
+            )
+        return line
+
+
+def measure(
+    name: str, operation: Callable[[], object],
+    setup: Callable[[], None] = None, repeat: int = 5
+) -> BenchmarkResult:
+    """
+    Measures the time and the tracemalloc peak of the operation.
+
+    The time is the median of `repeat` runs without tracemalloc, since it
+    slows down allocations considerably. The memory peak is measured in an
+    additional run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, statistics.median(timings), peak)
+
+
+async def measure_async(
+    name: str, operation: Callable[[], Awaitable],
+    setup: Callable[[], Awaitable] = None, repeat: int = 5
+) -> BenchmarkResult:
+    """Same as `measure`, for operations returning an awaitable."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            await setup()
+        gc.collect()
+        start = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        await setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(name, statistics.median(timings), peak)
+
+
+def load_baseline(name: str) -> Dict[str, BenchmarkResult]:
+    """Loads the stored baseline of the benchmark, if any."""
+    path = BASELINES_PATH / f"{name}.json"
+    if not path.is_file():
+        return {}
+
+    with open(path, encoding="utf-8") as file:
+        return {
+            result["name"]: BenchmarkResult(**result) for result in json.load(file)
+        }
+
+
+def save_baseline(name: str, results: List[BenchmarkResult]):
+    """Stores the results as the new baseline of the benchmark."""
+    BASELINES_PATH.mkdir(exist_ok=True)
+    with open(BASELINES_PATH / f"{name}.json", "w", encoding="utf-8") as file:
+        json.dump([asdict(result) for result in results], file, indent=2)
+        file.write("\n")
+
+
+def build_argument_parser(description: str) -> argparse.ArgumentParser:
+    """Returns the command line parser shared by all benchmarks."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per operation (default: 5)."
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="Store the results as the new baseline."
+    )
+    parser.add_argument(
+        "--max-regression", type=float, default=None,
+        help="Exit with an error if any operation is slower than the baseline "
+             "by more than this ratio (e.g. 0.2 for 20%%)."
+    )
+    return parser
+
+
+def report(
+    benchmark_name: str, results: List[BenchmarkResult], args: argparse.Namespace
+) -> int:
+    """
+    Prints the results compared to the baseline and, depending on the
+    command line arguments, updates the baseline or checks for regressions.
+
+    :returns: the exit code.
+    """
+    baseline = load_baseline(benchmark_name)
+    print(f"{'operation':<45} {'time':>13} {'peak memory':>14}")
+    for result in results:
+        print(result.format(baseline.get(result.name)))
+
+    if args.update_baseline:
+        save_baseline(benchmark_name, results)
+        print(f"Baseline updated: {BASELINES_PATH / benchmark_name}.json")
+        return 0
+
+    if not baseline:
+        print("No baseline found. Run with --update-baseline to store one.")
+        return 0
+
+    if args.max_regression is None:
+        return 0
+
+    regressions = [
+        result.name for result in results
+        if result.name in baseline
+        and result.seconds > baseline[result.name].seconds * (1 + args.max_regression)
+    ]
+    for name in regressions:
+        print(f"Regression: {name}")
+    return 1 if regressions else 0
+
+
+def _format_ratio(value: float, baseline_value: float) -> str:
+    if not baseline_value:
+        return "   n/a"
+    return f"{(value / baseline_value - 1) * 100:+6.1f}%"
@@ -22,37 +22,265 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
 import inspect
-from typing import Callable, List, Optional
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
 
 from proton.vpn import logging
 
 logger = logging.getLogger(__name__)
 
 
+class OverflowPolicy(Enum):
+    """
+    What to do with a new notification for a subscriber which has not
+    consumed the previous ones yet, in queued mode.
+    """
+    #: When the subscriber queue is full, the oldest pending notification is dropped.
+    DROP_OLDEST = "drop_oldest"
+    #: When the subscriber queue is full, the new notification is dropped.
+    DROP_NEWEST = "drop_newest"
+    #: Pending notifications are superseded by the new one (latest state wins).
+    COALESCE = "coalesce"
+
+
+# Returns whether the notification with the specified args/kwargs must be
+# delivered, in which case it's never dropped by the overflow policy.
+MustDeliverPredicate = Callable[[tuple, dict], bool]
+
+
+@dataclass
+class SubscriberMetrics:
+    """Delivery metrics of a subscriber, in queued mode."""
+    delivered: int = 0
+    dropped: int = 0
+    slow_deliveries: int = 0  # Deliveries that took longer than the time budget.
+    total_seconds: float = 0
+    max_seconds: float = 0
+
+    @property
+    def average_seconds(self) -> float:
+        """Average time the subscriber took to handle a notification."""
+        return self.total_seconds / self.delivered if self.delivered else 0
+
+
+# Returns the subscriber, or None if it was garbage collected.
+SubscriberRef = Callable[[], Optional[Callable]]
+
+
+class _StrongRef:  # pylint: disable=too-few-public-methods
+    """Reference to a subscriber which is kept alive while registered."""
+    __slots__ = ("_subscriber",)
+
+    def __init__(self, subscriber: Callable):
+        self._subscriber = subscriber
+
+    def __call__(self) -> Callable:
+        return self._subscriber
+
+
+def _get_subscriber_key(subscriber: Callable) -> Hashable:
+    """
+    Returns the key a subscriber is registered with. Bound methods are
+    identified by their instance and function, so that a weakly registered
+    method can be found without keeping its instance alive.
+    """
+    if inspect.ismethod(subscriber):
+        return id(subscriber.__self__), subscriber.__func__
+    return subscriber
+
+
+class _SubscriberQueue:
+    """Pending notifications of a subscriber, delivered one at a time by a task."""
+    def __init__(
+            self, subscriber_ref: SubscriberRef, publisher: "Publisher",
+            overflow_policy: OverflowPolicy
+    ):
+        self._subscriber_ref = subscriber_ref
+        self.metrics = SubscriberMetrics()
+        self._publisher = publisher
+        self._overflow_policy = overflow_policy
+        self._pending: Deque[Tuple[tuple, dict]] = deque()
+        self._delivery_task: Optional[asyncio.Task] = None
+
+    @property
+    def delivery_task(self) -> Optional[asyncio.Task]:
+        """Task delivering the pending notifications, if any."""
+        return self._delivery_task
+
+    def put(self, args: tuple, kwargs: dict):
+        """
+        Queues the notification and makes sure it's delivered.
+
+        Notifications the publisher must deliver are never dropped, even if
+        that means exceeding the maximum queue size.
+        """
+        if self._overflow_policy is OverflowPolicy.COALESCE:
+            self._drop_pending(len(self._pending))
+        elif len(self._pending) >= self._publisher.max_queue_size:
+            if (
+                self._overflow_policy is OverflowPolicy.DROP_NEWEST
+                and not self._publisher.must_deliver(args, kwargs)
+            ):
+                self.metrics.dropped += 1
+                return
+            self._drop_pending(1)
+
+        self._pending.append((args, kwargs))
+        if self._delivery_task is None or self._delivery_task.done():
+            self._delivery_task = asyncio.create_task(self._deliver_pending())
+
+    def _drop_pending(self, count: int):
+        """Drops up to `count` pending notifications, from the oldest one."""
+        kept = deque()
+        while self._pending:
+            args, kwargs = self._pending.popleft()
+            if count > 0 and not self._publisher.must_deliver(args, kwargs):
+                self.metrics.dropped += 1
+                count -= 1
+            else:
+                kept.append((args, kwargs))
+        self._pending = kept
+
+    def close(self):
+        """Discards the pending notifications."""
+        self._pending.clear()
+
+    async def _deliver_pending(self):
+        while self._pending:
+            args, kwargs = self._pending.popleft()
+            subscriber = self._subscriber_ref()
+            if subscriber is None:
+                self._pending.clear()
+                return
+
+            start = time.monotonic()
+            try:
+                result = subscriber(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(f"An error occurred notifying subscriber {subscriber}.")
+            self._record_delivery(subscriber, time.monotonic() - start)
+
+    def _record_delivery(self, subscriber: Callable, seconds: float):
+        self.metrics.delivered += 1
+        self.metrics.total_seconds += seconds
+        self.metrics.max_seconds = max(self.metrics.max_seconds, seconds)
+        if seconds > self._publisher.time_budget:
+            self.metrics.slow_deliveries += 1
+            if self.metrics.slow_deliveries == 1:
+                logger.warning(
+                    f"Subscriber {subscriber} took {seconds:.3f} seconds to handle "
+                    f"a notification, over the {self._publisher.time_budget:.3f} seconds budget."
+                )
+
+
 class Publisher:
-    """Simple generic implementation of the publish-subscribe pattern."""
+    """
+    Simple generic implementation of the publish-subscribe pattern.
+
+    By default, subscribers are notified straight away. Subscribers can opt
+    in to queued delivery instead (or the publisher can default to it), in
+    which case their notifications are queued and delivered by a task per
+    subscriber, so that notifying never waits for them and a slow
+    subscriber does not delay the other ones. The queues are bounded: the
+    overflow policy decides which notifications are dropped when a
+    subscriber falls behind, except for the ones the `must_deliver`
+    predicate flags as such.
+
+    Subscribers can be registered weakly, in which case they are unregistered
+    automatically once garbage collected.
+    """
+    DEFAULT_MAX_QUEUE_SIZE = 32
+    # Seconds a subscriber is expected to take, at most, to handle a notification.
+    DEFAULT_TIME_BUDGET = 0.05
 
-    def __init__(self, subscribers: Optional[List[Callable]] = None):
-        self._subscribers = subscribers or []
+    def __init__(  # pylint: disable=too-many-arguments
+            self, subscribers: Optional[List[Callable]] = None,
+            queued: bool = False,
+            max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+            overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+            time_budget: float = DEFAULT_TIME_BUDGET,
+            must_deliver: Optional[MustDeliverPredicate] = None
+    ):
+        """
+        :param queued: whether subscribers use queued delivery by default.
+        :param max_queue_size: maximum number of pending notifications per queued subscriber.
+        :param overflow_policy: default overflow policy of queued subscribers.
+        :param time_budget: seconds a queued subscriber is expected to take,
+            at most, to handle a notification.
+        :param must_deliver: predicate returning whether a notification, given
+            its args and kwargs, must be delivered to queued subscribers even
+            if they fall behind. By default, any notification can be dropped.
+        """
+        # Subscriber references by key, in registration order.
+        self._subscribers: Dict[Hashable, SubscriberRef] = {}
         self._pending_tasks = set()
+        self.queued = queued
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.time_budget = time_budget
+        self.must_deliver: MustDeliverPredicate = must_deliver or (lambda args, kwargs: False)
+        self._queues: Dict[Hashable, _SubscriberQueue] = {}
+
+        for subscriber in subscribers or []:
+            self.register(subscriber)
 
-    def register(self, subscriber: Callable):
+    def register(
+            self, subscriber: Callable, weak: bool = False,
+            queued: Optional[bool] = None, overflow_policy: Optional[OverflowPolicy] = None
+    ):
         """
         Registers a subscriber to be notified of new updates.
 
         The subscribers are not expected to block, as they will be notified
         sequentially, one after the other in the order in which they were
-        registered.
+        registered (unless they use queued delivery).
 
         :param subscriber: callback that will be called with the expected
             args/kwargs whenever there is an update.
+        :param weak: whether to hold a weak reference to the subscriber (or, if
+            it's a bound method, to its instance), so that it's unregistered
+            once it's garbage collected instead of being kept alive.
+        :param queued: whether notifications are queued and delivered to the
+            subscriber by a task. By default, the publisher `queued` attribute.
+        :param overflow_policy: overflow policy of the subscriber queue. By
+            default, the publisher `overflow_policy` attribute.
         :raises ValueError: if the subscriber is not callable.
         """
         if not callable(subscriber):
             raise ValueError(f"Subscriber to register is not callable: {subscriber}")
 
-        if subscriber not in self._subscribers:
-            self._subscribers.append(subscriber)
+        key = _get_subscriber_key(subscriber)
+        if key in self._subscribers:
+            return
+
+        self._subscribers[key] = self._create_subscriber_ref(key, subscriber, weak)
+        if queued is None:
+            queued = self.queued
+        if queued:
+            self._queues[key] = _SubscriberQueue(
+                self._subscribers[key], self, overflow_policy or self.overflow_policy
+            )
+
+    def _create_subscriber_ref(
+            self, key: Hashable, subscriber: Callable, weak: bool
+    ) -> SubscriberRef:
+        if not weak:
+            return _StrongRef(subscriber)
+
+        def on_garbage_collected(_ref, publisher_ref=weakref.ref(self)):
+            publisher = publisher_ref()
+            if publisher is not None:
+                publisher._remove(key)  # pylint: disable=protected-access
+
+        if inspect.ismethod(subscriber):
+            return weakref.WeakMethod(subscriber, on_garbage_collected)
+        return weakref.ref(subscriber, on_garbage_collected)
 
     def unregister(self, subscriber: Callable):
         """
@@ -60,8 +288,13 @@ class Publisher:
 
         :param subscriber: the subscriber to be unregistered.
         """
-        if subscriber in self._subscribers:
-            self._subscribers.remove(subscriber)
+        self._remove(_get_subscriber_key(subscriber))
+
+    def _remove(self, key: Hashable):
+        self._subscribers.pop(key, None)
+        queue = self._queues.pop(key, None)
+        if queue:
+            queue.close()
 
     def notify(self, *args, **kwargs):
         """
@@ -76,7 +309,15 @@ class Publisher:
             :type connection_status: ConnectionStateEnum
 
         """
-        for subscriber in self._subscribers:
+        for key, subscriber_ref in list(self._subscribers.items()):
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.put(args, kwargs)
+                continue
+
+            subscriber = subscriber_ref()
+            if subscriber is None:
+                continue
             try:
                 if inspect.iscoroutinefunction(subscriber):
                     notification_task = asyncio.create_task(subscriber(*args, **kwargs))
@@ -87,13 +328,30 @@ class Publisher:
             except Exception:  # pylint: disable=broad-except
                 logger.exception(f"An error occurred notifying subscriber {subscriber}.")
 
+    async def wait_for_deliveries(self):
+        """Waits until the notifications queued so far were delivered to queued subscribers."""
+        delivery_tasks = [
+            queue.delivery_task for queue in self._queues.values() if queue.delivery_task
+        ]
+        await asyncio.gather(*delivery_tasks)
+
+    def get_subscriber_metrics(self) -> Dict[Callable, SubscriberMetrics]:
+        """Returns the delivery metrics of each queued subscriber."""
+        metrics = {}
+        for key, queue in self._queues.items():
+            subscriber = self._subscribers[key]()
+            if subscriber is not None:
+                metrics[subscriber] = queue.metrics
+        return metrics
+
     def _on_notification_task_done(self, task: asyncio.Task):
         self._pending_tasks.discard(task)
         task.result()
 
     def is_subscriber_registered(self, subscriber: Callable) -> bool:
         """Returns whether a subscriber is registered or not."""
-        return subscriber in self._subscribers
+        subscriber_ref = self._subscribers.get(_get_subscriber_key(subscriber))
+        return subscriber_ref is not None and subscriber_ref() is not None
 
     @property
     def number_of_subscribers(self) -> int:
@@ -21,7 +21,9 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Optional, ClassVar
 
@@ -30,6 +32,7 @@ from proton.vpn.connection import events
 from proton.vpn.connection.enum import ConnectionStateEnum, KillSwitchSetting
 from proton.vpn.connection.events import EventContext
 from proton.vpn.connection.exceptions import ConcurrentConnectionsError
+from proton.vpn.connection.timeline import ConnectionTimeline
 from proton.vpn.killswitch.interface import KillSwitch
 
 
@@ -51,12 +54,18 @@ class StateContext:
             attribute could be None is on the initial state, if there is not
             already an existing VPN connection.
         reconnection: optional VPN connection to connect to as soon as stopping the current one.
+        kill_switch_engaged: whether the kill switch was left enabled by a previous
+            state. It's carried across the states a server switch goes through,
+            so that the kill switch is not enabled again when it's already in place.
+        timeline: optional timeline where the state records the tasks it runs.
         kill_switch: kill switch implementation.
         kill_switch_setting: on, off, permanent.
     """
     event: events.Event = field(default_factory=events.Initialized)
     connection: Optional["VPNConnection"] = None
     reconnection: Optional["VPNConnection"] = None
+    kill_switch_engaged: bool = False
+    timeline: Optional[ConnectionTimeline] = field(default=None, compare=False, repr=False)
     kill_switch: ClassVar[KillSwitch] = None
     kill_switch_setting: ClassVar[KillSwitchSetting] = None
 
@@ -139,6 +148,12 @@ class State(ABC):
     async def run_tasks(self) -> Optional[events.Event]:
         """Tasks to be run when this state instance becomes the current VPN state."""
 
+    def _track(self, task_name: str):
+        """Records how long the task run within the context takes in the timeline, if any."""
+        if isinstance(self.context.timeline, ConnectionTimeline):
+            return self.context.timeline.track(task_name)
+        return nullcontext()
+
     @property
     def forwarded_port(self) -> Optional[int]:
         """Returns the forwarded port if it exists."""
@@ -154,36 +169,64 @@ class Disconnected(State):
 
     def _on_event(self, event: events.Event):
         if isinstance(event, events.Up):
-            return Connecting(StateContext(event=event, connection=event.context.connection))
+            return Connecting(StateContext(
+                event=event, connection=event.context.connection,
+                kill_switch_engaged=self.context.kill_switch_engaged
+            ))
 
         return self
 
     async def run_tasks(self):
-        # When the state machine is in disconnected state, a VPN connection
-        # may have not been created yet.
-        if self.context.connection:
-            await self.context.connection.remove_persistence()
-
+        # Removing the persisted connection parameters is file I/O, independent
+        # of the kill switch, so both are done concurrently.
         if self.context.reconnection:
-            # The Kill switch is enabled to avoid leaks when switching servers, even when
-            # the kill switch setting is off.
-            await self.context.kill_switch.enable()
+            await asyncio.gather(
+                self._remove_persistence(), self._enable_reconnection_kill_switch()
+            )
 
             # When a reconnection is expected, an Up event is returned to start a new connection.
             # straight away.
             return events.Up(EventContext(connection=self.context.reconnection))
 
+        await asyncio.gather(self._remove_persistence(), self._apply_kill_switch_setting())
+        return None
+
+    async def _remove_persistence(self):
+        # When the state machine is in disconnected state, a VPN connection
+        # may have not been created yet.
+        if self.context.connection:
+            with self._track("remove_persistence"):
+                await self.context.connection.remove_persistence()
+
+    async def _enable_reconnection_kill_switch(self):
+        # The Kill switch is enabled to avoid leaks when switching servers, even when
+        # the kill switch setting is off. When switching from a connection with
+        # the kill switch already in place, it's kept as it is instead.
+        if self.context.kill_switch_engaged:
+            return
+
+        with self._track("kill_switch.enable"):
+            await self.context.kill_switch.enable()
+        self.context.kill_switch_engaged = True
+
+    async def _apply_kill_switch_setting(self):
         if self.context.kill_switch_setting == KillSwitchSetting.PERMANENT:
             # This is an abstraction leak of the network manager KS.
             # The only reason for enabling permanent KS here is to switch from the
             # routed KS to the full KS if the user cancels the connection while in
             # Connecting state. Otherwise, the full KS should already be there.
-            await self.context.kill_switch.enable(permanent=True)
-        else:
+            with self._track("kill_switch.enable"):
+                await self.context.kill_switch.enable(permanent=True)
+            self.context.kill_switch_engaged = True
+            return
+
+        # Kill switch calls are never done concurrently, since backends
+        # are not required to support it.
+        with self._track("kill_switch.disable"):
             await self.context.kill_switch.disable()
+        with self._track("kill_switch.disable_ipv6_leak_protection"):
             await self.context.kill_switch.disable_ipv6_leak_protection()
-
-        return None
+        self.context.kill_switch_engaged = False
 
 
 class Connecting(State):
@@ -211,7 +254,8 @@ class Connecting(State):
                 StateContext(
                     event=event,
                     connection=self.context.connection,
-                    reconnection=event.context.connection
+                    reconnection=event.context.connection,
+                    kill_switch_engaged=self.context.kill_switch_engaged
                 )
             )
 
@@ -229,12 +273,19 @@ class Connecting(State):
         # is to avoid leaks when switching servers, even with the kill switch turned off.
         # However, when the kill switch setting is off, the kill switch has to be removed when
         # reaching the connected state.
-        await self.context.kill_switch.enable(
-            self.context.connection.server,
-            permanent=permanent_ks
-        )
+        # Note that the kill switch has to be in place before the connection is started,
+        # otherwise traffic could leak while the tunnel is being set up. Even when
+        # switching servers with the kill switch already engaged, it has to be
+        # enabled again to let the traffic to the new server through.
+        with self._track("kill_switch.enable"):
+            await self.context.kill_switch.enable(
+                self.context.connection.server,
+                permanent=permanent_ks
+            )
+        self.context.kill_switch_engaged = True
 
-        await self.context.connection.start()
+        with self._track("connection.start"):
+            await self.context.connection.start()
 
 
 class Connected(State):
@@ -256,7 +307,8 @@ class Connected(State):
                 StateContext(
                     event=event,
                     connection=self.context.connection,
-                    reconnection=event.context.connection
+                    reconnection=event.context.connection,
+                    kill_switch_engaged=self.context.kill_switch_engaged
                 )
             )
 
@@ -271,17 +323,31 @@ class Connected(State):
         return self
 
     async def run_tasks(self):
+        # Persisting the connection parameters is file I/O, independent of
+        # the kill switch, so both are done concurrently.
+        await asyncio.gather(self._apply_kill_switch_setting(), self._add_persistence())
+
+    async def _apply_kill_switch_setting(self):
         if self.context.kill_switch_setting == KillSwitchSetting.OFF:
-            await self.context.kill_switch.enable_ipv6_leak_protection()
-            await self.context.kill_switch.disable()
+            # IPv6 leak protection has to be enabled before the kill switch
+            # is disabled, so that IPv6 traffic can't leak in between.
+            with self._track("kill_switch.enable_ipv6_leak_protection"):
+                await self.context.kill_switch.enable_ipv6_leak_protection()
+            with self._track("kill_switch.disable"):
+                await self.context.kill_switch.disable()
+            self.context.kill_switch_engaged = False
         else:
             # This is specific to the routing table KS implementation and should be removed.
             # At this point we switch from the routed KS to the full-on KS.
-            await self.context.kill_switch.enable(
-                permanent=(self.context.kill_switch_setting == KillSwitchSetting.PERMANENT)
-            )
+            with self._track("kill_switch.enable"):
+                await self.context.kill_switch.enable(
+                    permanent=(self.context.kill_switch_setting == KillSwitchSetting.PERMANENT)
+                )
+            self.context.kill_switch_engaged = True
 
-        await self.context.connection.add_persistence()
+    async def _add_persistence(self):
+        with self._track("add_persistence"):
+            await self.context.connection.add_persistence()
 
 
 class Disconnecting(State):
@@ -306,7 +372,8 @@ class Disconnecting(State):
                 StateContext(
                     event=event,
                     connection=event.context.connection,
-                    reconnection=self.context.reconnection
+                    reconnection=self.context.reconnection,
+                    kill_switch_engaged=self.context.kill_switch_engaged
                 )
             )
 
@@ -319,7 +386,8 @@ class Disconnecting(State):
         return self
 
     async def run_tasks(self):
-        await self.context.connection.stop()
+        with self._track("connection.stop"):
+            await self.context.connection.stop()
 
 
 class Error(State):
@@ -337,7 +405,8 @@ class Error(State):
                 StateContext(
                     event=event,
                     connection=self.context.connection,
-                    reconnection=event.context.connection
+                    reconnection=event.context.connection,
+                    kill_switch_engaged=self.context.kill_switch_engaged
                 )
             )
 
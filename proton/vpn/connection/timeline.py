@@ -0,0 +1,154 @@
+"""
+Timeline of the states and tasks a VPN connection goes through.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+STATE_ENTRY = "state"
+TASK_ENTRY = "task"
+
+
+@dataclass
+class TimelineEntry:
+    """
+    State reached, or task run, during a connection attempt.
+
+    Attributes:
+        kind: either "state" or "task".
+        name: name of the state or task.
+        start: seconds elapsed since the start of the timeline.
+        duration: seconds spent in the state or running the task. It's None
+            while the state is the current one or the task is running.
+        failed: whether the task raised an exception.
+    """
+    kind: str
+    name: str
+    start: float
+    duration: Optional[float] = None
+    failed: bool = False
+
+    def to_dict(self) -> dict:
+        """Returns the entry as a dictionary, suitable for structured logs."""
+        return {
+            "kind": self.kind, "name": self.name, "start": self.start,
+            "duration": self.duration, "failed": self.failed
+        }
+
+
+class ConnectionTimeline:
+    """
+    Records, with monotonic timestamps, when each state is reached and how
+    long each task run by the states takes, from the moment a connection
+    (or disconnection) is requested until the connection settles in a
+    state where it waits for user input again (connected, disconnected or error).
+
+    The time between the end of the tasks of a state and the next state is
+    the time spent waiting for the VPN backend (e.g. waiting for the
+    connected event after starting the connection).
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._started_at = clock()
+        self._finished_at: Optional[float] = None
+        self._entries: List[TimelineEntry] = []
+        self._current_state_entry: Optional[TimelineEntry] = None
+
+    @property
+    def entries(self) -> List[TimelineEntry]:
+        """States and tasks recorded so far, in chronological order."""
+        return list(self._entries)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the connection settled in its final state or not."""
+        return self._finished_at is not None
+
+    @property
+    def duration(self) -> float:
+        """Seconds elapsed since the start of the timeline until it finished (or now)."""
+        end = self._finished_at if self._finished_at is not None else self._clock()
+        return end - self._started_at
+
+    def enter_state(self, state_name: str):
+        """Records that the specified state was reached."""
+        now = self._elapsed()
+        if self._current_state_entry:
+            self._current_state_entry.duration = now - self._current_state_entry.start
+        self._current_state_entry = TimelineEntry(STATE_ENTRY, state_name, now)
+        self._entries.append(self._current_state_entry)
+
+    @contextmanager
+    def track(self, task_name: str) -> Iterator[TimelineEntry]:
+        """Records how long the code run within the context takes."""
+        entry = TimelineEntry(TASK_ENTRY, task_name, self._elapsed())
+        self._entries.append(entry)
+        try:
+            yield entry
+        except BaseException:
+            entry.failed = True
+            raise
+        finally:
+            entry.duration = self._elapsed() - entry.start
+
+    def finish(self):
+        """Records that the connection settled in the current state."""
+        if self._finished_at is None:
+            self._finished_at = self._clock()
+
+    def state_durations(self) -> Dict[str, float]:
+        """Returns the total seconds spent in each state the connection left."""
+        durations: Dict[str, float] = {}
+        for entry in self._entries:
+            if entry.kind == STATE_ENTRY and entry.duration is not None:
+                durations[entry.name] = durations.get(entry.name, 0) + entry.duration
+        return durations
+
+    def to_dict(self) -> dict:
+        """Returns the timeline as a dictionary, suitable for structured logs."""
+        return {
+            "duration": self.duration,
+            "finished": self.finished,
+            "entries": [entry.to_dict() for entry in self._entries],
+        }
+
+    def __str__(self):
+        # e.g. "Connecting +0ms (kill_switch.enable 12ms, connection.start 30ms)
+        # -> Connected +850ms (add_persistence 3ms), total: 853ms"
+        states = []
+        for entry in self._entries:
+            if entry.kind == STATE_ENTRY:
+                states.append([f"{entry.name} +{entry.start * 1000:.0f}ms", []])
+            elif states:
+                duration = "running" if entry.duration is None \
+                    else f"{entry.duration * 1000:.0f}ms"
+                states[-1][1].append(
+                    f"{entry.name} {duration}{' failed' if entry.failed else ''}"
+                )
+        return " -> ".join(
+            f"{state} ({', '.join(tasks)})" if tasks else state
+            for state, tasks in states
+        ) + f", total: {self.duration * 1000:.0f}ms"
+
+    def _elapsed(self) -> float:
+        return self._clock() - self._started_at
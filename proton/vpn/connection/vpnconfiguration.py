@@ -24,7 +24,6 @@ import ipaddress
 import tempfile
 import os
 
-from jinja2 import Environment, BaseLoader
 from proton.utils.environment import ExecutionEnvironment
 
 from proton.vpn.connection.constants import \
@@ -145,11 +144,7 @@ class OVPNConfig(VPNConfiguration):
             j2_values["cert"] = self._vpncredentials.pubkey_credentials.certificate_pem
             j2_values["priv_key"] = self._vpncredentials.pubkey_credentials.openvpn_private_key
 
-        template =\
-            (Environment(loader=BaseLoader, autoescape=True)  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.flask.security.xss.audit.direct-use-of-jinja2.direct-use-of-jinja2
-                .from_string(OPENVPN_V2_TEMPLATE))
-
-        return template.render(j2_values)
+        return _render_template(OPENVPN_V2_TEMPLATE, j2_values)
 
 
 class OpenVPNTCPConfig(OVPNConfig):
@@ -181,7 +176,15 @@ class WireguardConfig(VPNConfiguration):
             "wg_server_pk": self._vpnserver.x25519pk,
         }
 
-        template =\
-            (Environment(loader=BaseLoader, autoescape=True)  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.flask.security.xss.audit.direct-use-of-jinja2.direct-use-of-jinja2
-                .from_string(WIREGUARD_TEMPLATE))
-        return template.render(j2_values)
+        return _render_template(WIREGUARD_TEMPLATE, j2_values)
+
+
+def _render_template(template: str, values: dict) -> str:
+    # jinja2 is only needed when generating configuration files, so it's
+    # imported lazily to keep it out of the import time of the package.
+    from jinja2 import Environment, BaseLoader  # pylint: disable=import-outside-toplevel
+    return (
+        Environment(loader=BaseLoader, autoescape=True)  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.flask.security.xss.audit.direct-use-of-jinja2.direct-use-of-jinja2
+        .from_string(template)
+        .render(values)
+    )
@@ -21,6 +21,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
 import copy
+import dataclasses
 
 from proton.vpn.core.connection import VPNConnector
 from proton.vpn.core.refresher.scheduler import Scheduler
@@ -30,6 +31,8 @@ from proton.vpn.core.session_holder import SessionHolder, ClientTypeMetadata
 from proton.vpn.session.dataclasses import LoginResult, BugReportForm
 from proton.vpn.session.account import VPNAccount
 from proton.vpn.session import FeatureFlags
+from proton.vpn.session.api_metrics import APIMetrics
+from proton.vpn.session.utils import get_api_metrics
 
 from proton.vpn.core.usage import UsageReporting
 
@@ -184,10 +187,19 @@ class ProtonVPNAPI:  # pylint: disable=too-many-public-methods
         """The last feature flags fetched from the REST API."""
         return self._session_holder.session.feature_flags
 
-    async def submit_bug_report(self, bug_report: BugReportForm):
+    async def submit_bug_report(
+            self, bug_report: BugReportForm, include_connection_history: bool = False
+    ):
         """
         Submits the specified bug report to customer support.
-        """
+        :param include_connection_history: whether to attach the most recent
+            VPN connection state transitions to the bug report.
+        """
+        if include_connection_history and self._vpn_connector:
+            bug_report = dataclasses.replace(bug_report, attachments=[
+                *bug_report.attachments,
+                self._vpn_connector.transition_history.to_attachment()
+            ])
         return await self._session_holder.session.submit_bug_report(bug_report)
 
     async def logout(self):
@@ -202,6 +214,14 @@ class ProtonVPNAPI:  # pylint: disable=too-many-public-methods
         vpn_connector = await self.get_vpn_connector()
         await vpn_connector.disconnect()
 
+    @property
+    def api_metrics(self) -> APIMetrics:
+        """
+        Returns the metrics collected for the requests to Proton's REST API.
+        Set `api_metrics.log_requests` to also write them to the logs.
+        """
+        return get_api_metrics()
+
     @property
     def usage_reporting(self) -> UsageReporting:
         """Returns the usage reporting instance to send anonymous crash reports."""
@@ -20,30 +20,202 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import asyncio
+import fcntl
+import hashlib
 import json
 import os
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from itertools import islice
 from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Tuple
+
+from proton.utils.environment import VPNExecutionEnvironment
 from proton.vpn import logging
 
 
 logger = logging.getLogger(__name__)
 
+_JSON_ENCODER = json.JSONEncoder(indent=4)
+_JSON_TOKENS_PER_CHUNK = 16 * 1024
+
+# Identifies a version of a file: modification time, size and inode. Since
+# files are replaced atomically, the inode changes on every write.
+FileSignature = Tuple[int, int, int]
+
+
+class CachePath:  # pylint: disable=too-few-public-methods
+    """
+    Class attribute holding the path of a file in the VPN cache directory.
+
+    The path is only resolved the first time it's accessed, so that
+    importing a module does not require evaluating the execution environment.
+    """
+    def __init__(self, filename: str):
+        self._filename = filename
+        self._path: Optional[Path] = None
+
+    def __get__(self, instance, owner) -> Path:
+        if self._path is None:
+            self._path = Path(VPNExecutionEnvironment().path_cache) / self._filename
+        return self._path
+
+
+@contextmanager
+def staged_write(filepath: Path, chunks: Iterable[bytes]) -> Iterator[Callable[[], None]]:
+    """
+    Writes the content, given in chunks, to a temporary file next to the
+    specified one, and yields a function committing it: the temporary file
+    is then synced to disk and replaces the specified file, so that a crash
+    mid-write never leaves it truncated.
+
+    The temporary file is removed if the content is not committed.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=filepath.parent, prefix=f".{filepath.name}.", delete=False
+    ) as file:
+        committed = False
+
+        def commit():
+            nonlocal committed
+            file.flush()
+            os.fsync(file.fileno())
+            os.replace(file.name, filepath)
+            committed = True
+
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+            yield commit
+        finally:
+            if not committed:
+                os.remove(file.name)
+
+
+def write_atomically(filepath: Path, chunks: Iterable[bytes]):
+    """
+    Writes the content, given in chunks, to the specified file. See :func:`staged_write`.
+    """
+    with staged_write(filepath, chunks) as commit:
+        commit()
+
+
+def get_file_signature(filepath: Path) -> Optional[FileSignature]:
+    """Returns the signature of the file, or None if it does not exist."""
+    try:
+        return _to_file_signature(os.stat(filepath))
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def file_lock(lock_filepath: Path):
+    """
+    Exclusive advisory lock shared between processes, held while in the context.
+    It must only be held briefly, since acquiring it blocks.
+    """
+    lock_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_filepath, "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def refresh_lock(
+    lock_filepath: Path, timeout: float, poll_interval: float = 0.1
+) -> AsyncIterator[bool]:
+    """
+    Lock electing a single process to refresh a shared cache, which can be
+    held across network requests.
+
+    While another process holds the lock, it waits without blocking the
+    event loop until the lock is released, up to `timeout` seconds.
+
+    :returns: whether the lock was acquired or not.
+    """
+    lock_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_filepath, "a", encoding="utf-8") as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    logger.warning(
+                        f"Timed out waiting for the refresh of \"{lock_filepath.name}\" "
+                        "by another process.", category="cache", event="lock"
+                    )
+                    acquired = False
+                    break
+                await asyncio.sleep(poll_interval)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 
 class CacheHandler:
-    """Used to save, load, and remove cache files."""
+    """
+    Used to save, load, and remove cache files.
+
+    Cache files can be shared by several processes: writes are serialized
+    with an advisory file lock, and `changed_on_disk` tells whether another
+    process wrote the cache file since it was last loaded/saved.
+    """
+    REFRESH_LOCK_TIMEOUT = 30  # seconds
+
     def __init__(self, filepath: str):
         self._fp = Path(filepath)
+        # Hash of the content last written to/read from the cache file.
+        self._content_hash: Optional[str] = None
+        # Signature of the cache file last written/read.
+        self._file_signature: Optional[FileSignature] = None
 
     @property
     def exists(self):
         """True if the cache file exists and False otherwise."""
         return self._fp.is_file()
 
+    @property
+    def changed_on_disk(self) -> bool:
+        """
+        True if the cache file exists and was written by someone else since
+        it was last loaded/saved, and False otherwise.
+        """
+        file_signature = get_file_signature(self._fp)
+        return file_signature is not None and file_signature != self._file_signature
+
     def save(self, newdata: dict):
-        """Save data to cache file."""
-        self._fp.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._fp, "w", encoding="utf-8") as f:  # pylint: disable=C0103
-            json.dump(newdata, f, indent=4)  # pylint: disable=C0103
+        """
+        Save data to cache file.
+
+        The write is skipped if the cache file already has the same content.
+        """
+        # The content is streamed to a temporary file while it's hashed,
+        # instead of being held in memory at once.
+        content_hash = hashlib.sha256()
+        with staged_write(self._fp, _hashed(_encode_json(newdata), content_hash)) as commit:
+            with file_lock(self._lock_path):
+                unchanged = (
+                    content_hash.hexdigest() == self._content_hash
+                    and not self._changed_since_last_access()
+                )
+                if unchanged:
+                    return
+
+                commit()
+                self._content_hash = content_hash.hexdigest()
+                self._file_signature = get_file_signature(self._fp)
 
     def load(self):
         """Load data from cache file, if it exists."""
@@ -51,8 +223,15 @@ class CacheHandler:
             return None
 
         try:
-            with open(self._fp, "r", encoding="utf-8") as f:  # pylint: disable=C0103
-                return json.load(f)  # pylint: disable=C0103
+            with open(self._fp, "rb") as f:  # pylint: disable=C0103
+                file_signature = _to_file_signature(os.fstat(f.fileno()))
+                content = f.read()
+            data = json.loads(content.decode("utf-8"))
+            self._content_hash = hashlib.sha256(content).hexdigest()
+            self._file_signature = file_signature
+            return data
+        except FileNotFoundError:
+            return None
         except (json.decoder.JSONDecodeError, UnicodeDecodeError):
             filename = os.path.basename(self._fp)
             logger.warning(
@@ -63,5 +242,46 @@ class CacheHandler:
 
     def remove(self):
         """ Remove cache from disk."""
-        if self.exists:
-            os.remove(self._fp)
+        self._content_hash = None
+        self._file_signature = None
+        with file_lock(self._lock_path):
+            if self.exists:
+                os.remove(self._fp)
+
+    def refresh_lock(self, timeout: Optional[float] = None):
+        """
+        Returns an async context manager electing a single process to refresh
+        the cache file. See :func:`refresh_lock`.
+        """
+        return refresh_lock(
+            self._fp.with_name(f".{self._fp.name}.refresh.lock"),
+            timeout=self.REFRESH_LOCK_TIMEOUT if timeout is None else timeout
+        )
+
+    @property
+    def _lock_path(self) -> Path:
+        return self._fp.with_name(f".{self._fp.name}.lock")
+
+    def _changed_since_last_access(self) -> bool:
+        return get_file_signature(self._fp) != self._file_signature
+
+
+def _to_file_signature(stat_result: os.stat_result) -> FileSignature:
+    return stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino
+
+
+def _encode_json(data: dict) -> Iterator[bytes]:
+    """Encodes the data as JSON, in chunks of `_JSON_TOKENS_PER_CHUNK` tokens."""
+    tokens = _JSON_ENCODER.iterencode(data)
+    while True:
+        chunk = "".join(islice(tokens, _JSON_TOKENS_PER_CHUNK))
+        if not chunk:
+            return
+        yield chunk.encode("utf-8")
+
+
+def _hashed(chunks: Iterable[bytes], content_hash) -> Iterator[bytes]:
+    """Yields the chunks, updating the hash with them."""
+    for chunk in chunks:
+        content_hash.update(chunk)
+        yield chunk
@@ -24,34 +24,51 @@ from __future__ import annotations
 import asyncio
 import copy
 import threading
-from typing import Optional, runtime_checkable, Protocol
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, runtime_checkable, Protocol
 
 from proton.loader import Loader
 from proton.loader.loader import PluggableComponent
 
 from proton.vpn.connection.persistence import ConnectionPersistence
+from proton.vpn.core.quick_connect import build_vpn_server
 from proton.vpn.core.refresher import VPNDataRefresher
 from proton.vpn.core.session_holder import SessionHolder
 from proton.vpn.core.settings import SettingsPersistence
-from proton.vpn.killswitch.interface import KillSwitch
+from proton.vpn.core.state_stream import StateStream
+from proton.vpn.core.transition_history import TransitionHistory
+from proton.vpn.killswitch.interface import KillSwitch, CachingKillSwitch
 
 from proton.vpn import logging
 from proton.vpn.connection import (
-    events, states, VPNConnection, VPNServer, ProtocolPorts,
+    events, states, VPNConnection, VPNServer,
     VPNCredentials, Settings
 )
 from proton.vpn.connection.enum import KillSwitchSetting, ConnectionStateEnum
-from proton.vpn.connection.publisher import Publisher
+from proton.vpn.connection.publisher import OverflowPolicy, Publisher
 from proton.vpn.connection.states import StateContext
+from proton.vpn.connection.timeline import ConnectionTimeline
 from proton.vpn.session.client_config import ClientConfig
 from proton.vpn.session.dataclasses import VPNLocation
-from proton.vpn.session.servers import LogicalServer, ServerFeatureEnum
+from proton.vpn.session.servers import LogicalServer
+from proton.vpn.session.utils import preempt_background_api_requests
 from proton.vpn.core.usage import UsageReporting
 from proton.vpn.connection.exceptions import FeatureSyntaxError, FeatureError
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _PendingEvent:
+    """Connection event waiting to be processed."""
+    event: events.Event
+    # Futures of the callers waiting for the event to be processed, including
+    # the ones whose events were superseded by this one.
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
 @runtime_checkable
 class VPNStateSubscriber(Protocol):  # pylint: disable=too-few-public-methods
     """Subscriber to connection status updates."""
@@ -63,6 +80,13 @@ class VPNStateSubscriber(Protocol):  # pylint: disable=too-few-public-methods
         """
 
 
+def _is_settled_state_notification(args: tuple, _kwargs: dict) -> bool:
+    """Returns whether a state notification must be delivered even to lagging subscribers."""
+    return bool(args) and isinstance(
+        args[0], (states.Connected, states.Disconnected, states.Error)
+    )
+
+
 class VPNConnector:  # pylint: disable=too-many-instance-attributes
     """
     Allows connecting/disconnecting to/from Proton VPN servers, as well as querying
@@ -72,7 +96,16 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
     Multiple simultaneous VPN connections are not allowed. If a connection
     already exists when a new one is requested then the current one is brought
     down before starting the new one.
+
+    Connection events are queued and processed one at a time by a single
+    consumer task. Connection requests (`events.Up`) that were not processed
+    yet are superseded by newer ones, so that switching servers rapidly
+    converges to the last requested server instead of connecting to each
+    one of them in turn.
     """
+    # Maximum number of connection events waiting to be processed. Once reached,
+    # new events wait until there is space in the queue.
+    MAX_PENDING_EVENTS = 32
 
     @classmethod
     async def get(  # pylint: disable=too-many-arguments
@@ -108,9 +141,23 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         self._settings_persistence = settings_persistence
         self._connection_persistence = connection_persistence or ConnectionPersistence()
         self._current_state = state
+        # Whether the tasks of the current state are done. A state is only
+        # considered reached, by waiters and subscribers, once they are.
+        self._current_state_reached = True
         self._kill_switch = kill_switch
-        self._publisher = publisher or Publisher()
-        self._lock = asyncio.Lock()
+        # Subscribers are notified synchronously unless they opt in to queued
+        # delivery, in which case they only receive the latest transitional
+        # state if they fall behind, but never miss a settled state.
+        self._publisher = publisher or Publisher(
+            overflow_policy=OverflowPolicy.COALESCE, must_deliver=_is_settled_state_notification
+        )
+        self._pending_events: Deque[_PendingEvent] = deque()
+        self._pending_event_slots = asyncio.Semaphore(self.MAX_PENDING_EVENTS)
+        self._event_consumer: Optional[asyncio.Task] = None
+        self._timeline: Optional[ConnectionTimeline] = None
+        self._state_streams: "weakref.WeakSet[StateStream]" = weakref.WeakSet()
+        self._state_waiters: Dict[ConnectionStateEnum, Set[asyncio.Future]] = {}
+        self._transition_history = TransitionHistory()
         self._background_tasks = set()
         self._usage_reporting = usage_reporting
 
@@ -153,6 +200,13 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         if isinstance(self.current_state, states.Disconnected):
             self._set_ks_impl(settings)
 
+    @staticmethod
+    def _invalidate_kill_switch_cache():
+        # Other processes sharing the kill switch backend (e.g. another
+        # frontend) may have changed the kill switch in the meantime.
+        if isinstance(StateContext.kill_switch, CachingKillSwitch):
+            StateContext.kill_switch.invalidate()
+
     async def update_credentials(self):
         """
         Updates the credentials of the current connection.
@@ -170,6 +224,7 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         applies them to the current connection whenever that's possible.
         """
         self._set_ks_setting(settings)
+        self._invalidate_kill_switch_cache()
         await self._apply_kill_switch_setting(KillSwitchSetting(settings.killswitch))
         if self.current_connection:
 
@@ -185,15 +240,18 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
             await kill_switch.enable(permanent=True)
             # Since full KS already prevents IPv6 leaks:
             await kill_switch.disable_ipv6_leak_protection()
+            kill_switch_engaged = True
 
         elif kill_switch_setting == KillSwitchSetting.ON:
             if isinstance(self._current_state, states.Disconnected):
                 await kill_switch.disable()
                 await kill_switch.disable_ipv6_leak_protection()
+                kill_switch_engaged = False
             else:
                 await kill_switch.enable(permanent=False)
                 # Since full KS already prevents IPv6 leaks:
                 await kill_switch.disable_ipv6_leak_protection()
+                kill_switch_engaged = True
 
         elif kill_switch_setting == KillSwitchSetting.OFF:
             if isinstance(self._current_state, states.Disconnected):
@@ -202,10 +260,15 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
             else:
                 await kill_switch.enable_ipv6_leak_protection()
                 await kill_switch.disable()
+            kill_switch_engaged = False
 
         else:
             raise RuntimeError(f"Unexpected kill switch setting: {kill_switch_setting}")
 
+        # Keeps track of the kill switch state so that server switches don't skip
+        # enabling a kill switch that is not in place anymore.
+        self._current_state.context.kill_switch_engaged = kill_switch_engaged
+
     async def _get_current_connection(self) -> Optional[VPNConnection]:
         """
         :return: the current VPN connection or None if there isn't one.
@@ -255,6 +318,8 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         settings = await self.get_settings()
         StateContext.kill_switch_setting = KillSwitchSetting(settings.killswitch)
         self._set_ks_impl(settings)
+        # The kill switch may have been changed while the app was not running.
+        self._invalidate_kill_switch_cache()
 
         connection = state.context.connection
         if connection:
@@ -274,6 +339,19 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         """Returns the state of the current VPN connection."""
         return self._current_state
 
+    @property
+    def timeline(self) -> Optional[ConnectionTimeline]:
+        """
+        Returns the timeline of the ongoing connection attempt or, if the
+        connection already settled, the one of the last connection attempt.
+        """
+        return self._timeline
+
+    @property
+    def transition_history(self) -> TransitionHistory:
+        """Returns the history of the most recent connection state transitions."""
+        return self._transition_history
+
     @property
     def current_connection(self) -> Optional[VPNConnection]:
         """Returns the current VPN connection or None if there isn't one."""
@@ -310,25 +388,7 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         can be used to establish a VPN connection with
         :class:`proton.vpn.vpnconnection.VPNConnection`.
         """
-        physical_server = logical_server.get_random_physical_server()
-        has_ipv6_support = ServerFeatureEnum.IPV6 in logical_server.features
-        return VPNServer(
-            server_ip=physical_server.entry_ip,
-            domain=physical_server.domain,
-            x25519pk=physical_server.x25519_pk,
-            openvpn_ports=ProtocolPorts(
-                udp=client_config.openvpn_ports.udp,
-                tcp=client_config.openvpn_ports.tcp
-            ),
-            wireguard_ports=ProtocolPorts(
-                udp=client_config.wireguard_ports.udp,
-                tcp=client_config.wireguard_ports.tcp
-            ),
-            server_id=logical_server.id,
-            server_name=logical_server.name,
-            has_ipv6_support=has_ipv6_support,
-            label=physical_server.label
-        )
+        return build_vpn_server(logical_server, client_config)
 
     def get_available_protocols_for_backend(
             self, backend_name: str
@@ -356,9 +416,14 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
             category="CONN", subcategory="CONNECT", event="START"
         )
 
+        # Background API requests (e.g. a server list download) should not
+        # compete for bandwidth with the connection being established.
+        preempt_background_api_requests()
+
         # Sets the settings to be applied when establishing the next connection.
         settings = await self.get_settings()
         self._set_ks_setting(settings)
+        self._invalidate_kill_switch_cache()
 
         protocol = protocol or settings.protocol
 
@@ -386,11 +451,14 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
 
     async def disconnect(self):
         """Disconnects the current VPN connection, if any."""
+        self._invalidate_kill_switch_cache()
         await self._on_connection_event(
             events.Down(events.EventContext(connection=self.current_connection))
         )
 
-    def register(self, subscriber: VPNStateSubscriber):
+    def register(
+            self, subscriber: VPNStateSubscriber, weak: bool = False, queued: bool = False
+    ):
         """
         Registers a new subscriber to connection status updates.
 
@@ -398,13 +466,67 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         be called passing it the new connection status whenever it changes.
 
         :param subscriber: Subscriber to register.
+        :param weak: whether the subscriber should be unregistered automatically
+            once garbage collected, instead of being kept alive by the connector.
+        :param queued: whether state updates should be delivered to the
+            subscriber by a dedicated task, so that a slow subscriber doesn't
+            delay state transitions. A queued subscriber falling behind skips
+            intermediate Connecting/Disconnecting states, but it always
+            receives the Connected, Disconnected and Error states.
         """
         if not isinstance(subscriber, VPNStateSubscriber):
             raise ValueError(
                 "The specified subscriber does not implement the "
                 f"{VPNStateSubscriber.__name__} protocol."
             )
-        self._publisher.register(subscriber.status_update)
+        self._publisher.register(subscriber.status_update, weak=weak, queued=queued)
+
+    def states(
+            self, max_buffered_states: int = StateStream.DEFAULT_MAX_BUFFERED_STATES
+    ) -> StateStream:
+        """
+        Returns an async iterator over the connection states reached from now on.
+
+        Unlike subscribers registered with `register`, streams receive every state
+        as soon as it's reached. If the consumer falls behind by more than
+        `max_buffered_states`, the oldest states are dropped.
+        The stream should be closed once it's not needed anymore.
+        """
+        stream = StateStream(self._state_streams.discard, max_buffered_states)
+        self._state_streams.add(stream)
+        return stream
+
+    async def wait_for(
+            self, state: ConnectionStateEnum, timeout: Optional[float] = None
+    ) -> states.State:
+        """
+        Waits until the connection reaches the specified state, returning straight
+        away if it's the current one. Like for subscribers, a state is reached
+        once its tasks are done (e.g. the kill switch is applied).
+
+        :returns: the state reached.
+        :raises asyncio.TimeoutError: if the state was not reached before the timeout.
+        """
+        if (
+            self._current_state_reached
+            and self.current_state and self.current_state.type == state
+        ):
+            return self.current_state
+
+        future = asyncio.get_running_loop().create_future()
+        self._state_waiters.setdefault(state, set()).add(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._state_waiters.get(state, set()).discard(future)
+
+    def _notify_state_waiters(self, new_state: states.State):
+        for stream in list(self._state_streams):
+            stream.push(new_state)
+
+        for future in self._state_waiters.pop(new_state.type, set()):
+            if not future.done():
+                future.set_result(new_state)
 
     def unregister(self, subscriber: VPNStateSubscriber):
         """
@@ -440,16 +562,71 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
     async def _on_connection_event(self, event: events.Event):
         """
         Callback called when a connection event happens.
+
+        The event is queued and this method returns once it was processed
+        or, if it was superseded by a newer event, once the newer event was
+        processed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._pending_event_slots.acquire()
+
+        pending_event = _PendingEvent(event, [future])
+        if isinstance(event, events.Up):
+            self._supersede_pending_up_events(pending_event)
+        self._pending_events.append(pending_event)
+
+        if self._event_consumer is None or self._event_consumer.done():
+            self._event_consumer = asyncio.create_task(self._process_pending_events())
+
+        await future
+
+    def _supersede_pending_up_events(self, pending_up_event: _PendingEvent):
         """
-        # The following lock guaranties that each new event is processed only
-        # when the previous event was fully processed.
-        async with self._lock:
-            triggered_events = 0
-            while event:
-                triggered_events += 1
-                if triggered_events > 99:
-                    raise RuntimeError("Maximum number of chained connection events was reached.")
-                event = await self._handle_on_event(event)
+        Removes the connection requests waiting to be processed, since the
+        new one supersedes them. Their callers will wait for the new one instead.
+        """
+        for pending_event in list(self._pending_events):
+            if not isinstance(pending_event.event, events.Up):
+                continue
+
+            self._pending_events.remove(pending_event)
+            self._pending_event_slots.release()
+            pending_up_event.futures[:0] = pending_event.futures
+
+            superseded_connection = pending_event.event.context.connection
+            if superseded_connection:
+                superseded_connection.unregister(self._on_connection_event)
+
+            logger.info(
+                "Pending connection request superseded by a newer one.",
+                category="CONN", subcategory="CONNECT", event="SUPERSEDED"
+            )
+
+    async def _process_pending_events(self):
+        """Processes the queued events in order, until there are none left."""
+        while self._pending_events:
+            pending_event = self._pending_events.popleft()
+            self._pending_event_slots.release()
+
+            try:
+                await self._process_event(pending_event.event)
+            except Exception as error:  # pylint: disable=broad-except
+                for future in pending_event.futures:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for future in pending_event.futures:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def _process_event(self, event: events.Event):
+        """Processes the event, as well as the events chained to it."""
+        triggered_events = 0
+        while event:
+            triggered_events += 1
+            if triggered_events > 99:
+                raise RuntimeError("Maximum number of chained connection events was reached.")
+            event = await self._handle_on_event(event)
 
     async def _update_state(self, new_state) -> Optional[events.Event]:
         if new_state is self.current_state:
@@ -457,6 +634,8 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
 
         old_state = self._current_state
         self._current_state = new_state
+        self._current_state_reached = False
+        self._record_transition(new_state)
 
         logger.info(
             f"{type(self._current_state).__name__}"
@@ -469,7 +648,10 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
             # Unregister from connection event updates once the connection ended.
             self._current_state.context.connection.unregister(self._on_connection_event)
 
+        self._record_state_in_timeline(new_state)
         new_event = await self._current_state.run_tasks()
+        self._current_state_reached = True
+        self._notify_state_waiters(new_state)
         self._publisher.notify(new_state)
 
         if (
@@ -478,8 +660,43 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         ):
             self._set_ks_impl(await self.get_settings())
 
+        if new_event is None and isinstance(
+            new_state, (states.Connected, states.Disconnected, states.Error)
+        ):
+            self._finish_timeline()
+
         return new_event
 
+    def _record_transition(self, new_state: states.State):
+        event = new_state.context.event
+        connection = new_state.context.connection
+        error = event.context.error if event else None
+        self._transition_history.record(
+            new_state.type,
+            event_type=type(event) if event else None,
+            server_id=connection.server_id if connection else None,
+            error_type=type(error) if error else None
+        )
+
+    def _record_state_in_timeline(self, new_state: states.State):
+        """
+        Records the new state in the timeline of the current connection attempt,
+        starting a new timeline if the previous connection attempt already settled.
+        """
+        if self._timeline is None or self._timeline.finished:
+            self._timeline = ConnectionTimeline()
+        self._timeline.enter_state(type(new_state).__name__)
+        new_state.context.timeline = self._timeline
+
+    def _finish_timeline(self):
+        """Logs the timeline once the connection settled in a state waiting for user input."""
+        self._timeline.finish()
+        logger.info(
+            f"Timeline: {self._timeline}",
+            category="CONN", event="TIMELINE",
+            extra={"connection_timeline": self._timeline.to_dict()}
+        )
+
     def _on_state_change(self, state: states.State):
         """Updates the user location when the connection is established."""
         if not isinstance(state, states.Connected):
@@ -509,7 +726,16 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
         """
         protocol = settings.protocol
         kill_switch_backend = KillSwitch.get(protocol=protocol)
-        StateContext.kill_switch = self._kill_switch or kill_switch_backend()
+
+        current_kill_switch = StateContext.kill_switch
+        if isinstance(current_kill_switch, CachingKillSwitch) and (
+            current_kill_switch.backend is self._kill_switch if self._kill_switch
+            else type(current_kill_switch.backend) is kill_switch_backend
+        ):
+            # Same backend as before: the kill switch state cached so far is still valid.
+            return
+
+        StateContext.kill_switch = CachingKillSwitch(self._kill_switch or kill_switch_backend())
 
     def _is_free_tier(self, user_tier: int) -> bool:
         return user_tier == 0
@@ -531,6 +757,9 @@ class VPNConnector:  # pylint: disable=too-many-instance-attributes
 class Subscriber:
     """
     Connection subscriber implementation that allows blocking until a certain state is reached.
+
+    Async code should use `VPNConnector.wait_for` or `VPNConnector.states` instead,
+    which don't block a thread.
     """
     def __init__(self):
         self.state: ConnectionStateEnum = None
@@ -542,8 +771,13 @@ class Subscriber:
         :param state: new state.
         """
         self.state = state.type
+        # The event of the current state stays set until the state changes, so
+        # that waiting for the current state returns straight away instead of
+        # missing it.
+        for state_type, event in self.events.items():
+            if state_type != self.state:
+                event.clear()
         self.events[self.state].set()
-        self.events[self.state].clear()
 
     def wait_for_state(self, state: ConnectionStateEnum, timeout: int = None):
         """
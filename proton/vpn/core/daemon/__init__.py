@@ -0,0 +1,32 @@
+"""
+Optional daemon sharing a single VPN data plane (session, server list,
+VPN data refreshes and VPN connection) between all the local frontends.
+
+The daemon is started with `python -m proton.vpn.core.daemon.server` and
+frontends attach to it with :class:`VPNDaemonClient`.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from proton.vpn.core.daemon.client import VPNDaemonClient
+from proton.vpn.core.daemon.protocol import (
+    DaemonError, DaemonNotRunningError, DaemonAlreadyRunningError
+)
+
+__all__ = [
+    "VPNDaemonClient", "DaemonError", "DaemonNotRunningError", "DaemonAlreadyRunningError"
+]
@@ -0,0 +1,214 @@
+"""
+Thin client of the Proton VPN core daemon.
+
+It does not import the session, server list or connection modules, so
+frontends attached to the daemon don't pay for loading them.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import inspect
+import itertools
+from typing import Any, Callable, Dict, List, Optional
+
+from proton.vpn import logging
+from proton.vpn.core.daemon import protocol
+
+logger = logging.getLogger(__name__)
+
+
+class VPNDaemonClient:
+    """
+    Client of :class:`proton.vpn.core.daemon.server.VPNDaemon`.
+
+    Usage:
+        async with VPNDaemonClient() as client:
+            await client.subscribe(on_state_changed)
+            await client.connect(country="CH")
+    """
+    def __init__(self, socket_path: Optional[str] = None):
+        self._socket_path = socket_path or protocol.get_default_socket_path()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._request_ids = itertools.count(1)
+        self._pending_requests: Dict[int, asyncio.Future] = {}
+        self._state_callback: Optional[Callable[[dict], Any]] = None
+        self._states: Optional[asyncio.Queue] = None
+        self._state_callback_task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        """
+        Opens the connection to the daemon.
+        :raises DaemonNotRunningError: if the daemon socket could not be reached.
+        """
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(
+                self._socket_path, limit=protocol.MAX_MESSAGE_SIZE
+            )
+        except (FileNotFoundError, ConnectionError) as error:
+            raise protocol.DaemonNotRunningError(
+                f"VPN daemon not reachable at {self._socket_path}: {error}"
+            ) from error
+        self._states = asyncio.Queue()
+        self._state_callback_task = asyncio.create_task(self._run_state_callbacks())
+        self._read_task = asyncio.create_task(self._read_messages())
+
+    async def close(self):
+        """Closes the connection to the daemon."""
+        for task in (self._read_task, self._state_callback_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._read_task = self._state_callback_task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._reader = self._writer = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def request(self, method: str, **params) -> Any:
+        """
+        Sends a request to the daemon and waits for its result.
+        :raises DaemonError: if the daemon returned an error.
+        """
+        if not self._writer:
+            raise protocol.DaemonNotRunningError("Not connected to the VPN daemon.")
+
+        request_id = next(self._request_ids)
+        response = asyncio.get_running_loop().create_future()
+        self._pending_requests[request_id] = response
+        try:
+            self._writer.write(protocol.encode(protocol.build_request(request_id, method, params)))
+            await self._writer.drain()
+            return await response
+        finally:
+            self._pending_requests.pop(request_id, None)
+
+    async def ping(self) -> dict:
+        """Checks that the daemon is responsive and returns its protocol version."""
+        return await self.request("ping")
+
+    async def status(self) -> dict:
+        """Returns the login status and the VPN connection state."""
+        return await self.request("status")
+
+    async def countries(self) -> List[dict]:
+        """Returns the countries with VPN servers."""
+        return await self.request("countries")
+
+    async def servers(self, country: Optional[str] = None) -> List[dict]:
+        """Returns the VPN servers, optionally only the ones in the specified country."""
+        return await self.request("servers", country=country)
+
+    async def server(self, server_id: Optional[str] = None, server_name: Optional[str] = None):
+        """Returns the VPN server with the specified id or name."""
+        return await self.request("server", server_id=server_id, server_name=server_name)
+
+    async def fastest(self, country: Optional[str] = None) -> dict:
+        """Returns the fastest VPN server, optionally in the specified country."""
+        return await self.request("fastest", country=country)
+
+    async def connect(  # pylint: disable=too-many-arguments
+        self, server_id: Optional[str] = None, server_name: Optional[str] = None,
+        country: Optional[str] = None, protocol_name: Optional[str] = None,
+        backend: Optional[str] = None
+    ) -> dict:
+        """
+        Connects to the specified VPN server or, if not specified, to the
+        fastest one (optionally in the specified country).
+        :returns: the server being connected to.
+        """
+        return await self.request(
+            "connect", server_id=server_id, server_name=server_name, country=country,
+            protocol=protocol_name, backend=backend
+        )
+
+    async def disconnect(self):
+        """Disconnects the current VPN connection, if any."""
+        return await self.request("disconnect")
+
+    async def subscribe(self, callback: Callable[[dict], Any]) -> dict:
+        """
+        Subscribes to VPN connection state updates.
+        :param callback: function or coroutine function called with every new
+            state, in order. It's called outside of the loop reading messages
+            from the daemon, so it can do requests to the daemon.
+        :returns: the current state.
+        """
+        self._state_callback = callback
+        return await self.request("subscribe")
+
+    async def unsubscribe(self):
+        """Unsubscribes from VPN connection state updates."""
+        await self.request("unsubscribe")
+        self._state_callback = None
+
+    async def _read_messages(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                await self._dispatch(protocol.decode(line))
+        except (ConnectionError, ValueError):
+            logger.warning("Error reading from the VPN daemon.", exc_info=True)
+        finally:
+            for response in self._pending_requests.values():
+                if not response.done():
+                    response.set_exception(protocol.DaemonNotRunningError(
+                        "Connection to the VPN daemon was closed."
+                    ))
+
+    async def _run_state_callbacks(self):
+        while True:
+            state = await self._states.get()
+            if not self._state_callback:
+                continue
+            try:
+                result = self._state_callback(state)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error in VPN daemon state callback.")
+
+    async def _dispatch(self, message: dict):
+        if "event" in message:
+            if message["event"] == "state" and self._state_callback:
+                self._states.put_nowait(message["data"])
+            return
+
+        response = self._pending_requests.get(message.get("id"))
+        if not response or response.done():
+            return
+
+        if "error" in message:
+            response.set_exception(protocol.DaemonError(
+                message["error"]["message"], error_type=message["error"]["type"]
+            ))
+        else:
+            response.set_result(message.get("result"))
@@ -0,0 +1,113 @@
+"""
+Wire protocol between the Proton VPN core daemon and its clients.
+
+Messages are JSON objects, one per line (newline-delimited JSON):
+ - requests: {"id": 1, "method": "connect", "params": {"server_name": "CH#1"}}
+ - responses: {"id": 1, "result": ...} or {"id": 1, "error": {"type": ..., "message": ...}}
+ - events, pushed to subscribed clients: {"event": "state", "data": {...}}
+
+This module only depends on the standard library, so that thin clients
+can talk to the daemon without importing the rest of the package.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+PROTOCOL_VERSION = 1
+
+# Maximum size of a message, which also bounds the memory used per client.
+MAX_MESSAGE_SIZE = 4 * 1024 * 1024
+
+SOCKET_FILENAME = "protonvpn-core.sock"
+
+
+class DaemonError(Exception):
+    """
+    Error returned by the daemon when processing a request.
+
+    It does not inherit from the package exceptions, since those would
+    pull in the proton-core session module.
+    """
+    def __init__(self, message: str, error_type: str = "DaemonError"):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class DaemonNotRunningError(DaemonError):
+    """The daemon socket could not be reached."""
+
+
+class DaemonAlreadyRunningError(DaemonError):
+    """Another daemon is already listening on the socket."""
+
+
+def get_default_socket_path() -> str:
+    """
+    Returns the path of the daemon socket: a file in the user runtime
+    directory or, if not available, a per-user file in the temp directory.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_FILENAME)
+
+    return os.path.join(tempfile.gettempdir(), f"{os.getuid()}-{SOCKET_FILENAME}")
+
+
+def encode(message: dict) -> bytes:
+    """Serializes a message into a line."""
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    """
+    Deserializes a line into a message.
+    :raises ValueError: if the line is not a valid message.
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError(f"Invalid message: {line!r}")
+    return message
+
+
+def build_request(request_id: int, method: str, params: Optional[dict] = None) -> dict:
+    """Builds a request message."""
+    return {"id": request_id, "method": method, "params": params or {}}
+
+
+def build_result(request_id: Optional[int], result: Any) -> dict:
+    """Builds a successful response message."""
+    return {"id": request_id, "result": result}
+
+
+def build_error(request_id: Optional[int], error: Exception) -> dict:
+    """Builds an error response message."""
+    return {
+        "id": request_id,
+        "error": {
+            "type": getattr(error, "error_type", type(error).__name__),
+            "message": str(error),
+        },
+    }
+
+
+def build_event(event: str, data: Any) -> dict:
+    """Builds an event message."""
+    return {"event": event, "data": data}
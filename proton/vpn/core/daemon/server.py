@@ -0,0 +1,371 @@
+"""
+Daemon hosting a single ProtonVPNAPI instance shared by all the local frontends.
+
+Usage:
+    python -m proton.vpn.core.daemon.server [--socket PATH]
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import signal
+import socket
+import stat
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from proton.vpn import logging
+from proton.vpn.core.api import ProtonVPNAPI
+from proton.vpn.core.connection import VPNConnector
+from proton.vpn.core.daemon import protocol
+from proton.vpn.core.quick_connect import QuickConnectCandidate
+from proton.vpn.core.session_holder import ClientTypeMetadata
+from proton.vpn.connection import states
+from proton.vpn.session.exceptions import ServerNotFoundError
+from proton.vpn.session.servers.logicals import ServerList
+from proton.vpn.session.servers.types import LogicalServer
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[["_DaemonClient", dict], Awaitable]
+
+
+class _DaemonClient:  # pylint: disable=too-few-public-methods
+    """Connection from a frontend to the daemon."""
+    # Events are not sent to clients that don't read them fast enough.
+    MAX_WRITE_BUFFER_SIZE = protocol.MAX_MESSAGE_SIZE
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.subscribed = False
+
+    def send(self, message: dict) -> bool:
+        """
+        Queues the message to be sent to the client.
+        :returns: False if the client is too slow reading messages, in which
+            case the message is dropped.
+        """
+        if self.writer.transport.get_write_buffer_size() > self.MAX_WRITE_BUFFER_SIZE:
+            return False
+        self.writer.write(protocol.encode(message))
+        return True
+
+
+class VPNDaemon:
+    """
+    Hosts ProtonVPNAPI once per machine and exposes it to the local frontends
+    over a Unix socket, so that the server list, the VPN data refreshes and
+    the VPN connection are shared by all of them instead of being paid for
+    by each one.
+
+    Only the user who started the daemon can connect to its socket.
+    """
+    def __init__(self, api: ProtonVPNAPI, socket_path: Optional[str] = None):
+        self._api = api
+        self._socket_path = socket_path or protocol.get_default_socket_path()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[_DaemonClient] = set()
+        self._vpn_connector: Optional[VPNConnector] = None
+        self._handlers: Dict[str, Handler] = {
+            "ping": self._ping,
+            "status": self._status,
+            "countries": self._countries,
+            "servers": self._servers,
+            "server": self._server_info,
+            "fastest": self._fastest,
+            "connect": self._connect,
+            "disconnect": self._disconnect,
+            "subscribe": self._subscribe,
+            "unsubscribe": self._unsubscribe,
+        }
+
+    @property
+    def socket_path(self) -> str:
+        """Path of the Unix socket the daemon listens on."""
+        return self._socket_path
+
+    async def start(self):
+        """
+        Loads the VPN data, if logged in, and starts listening for clients.
+        :raises DaemonAlreadyRunningError: if another daemon is listening on the socket.
+        :raises DaemonError: if the socket path exists and is not a socket.
+        """
+        await self._remove_stale_socket()
+
+        self._vpn_connector = await self._api.get_vpn_connector()
+        self._vpn_connector.register(self)
+        if self._api.is_user_logged_in():
+            await self._api.refresher.enable()
+
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, sock=self._create_socket(),
+            limit=protocol.MAX_MESSAGE_SIZE
+        )
+
+        logger.info(f"VPN daemon listening on {self._socket_path}.")
+
+    async def stop(self):
+        """Stops listening and disconnects the clients."""
+        if self._vpn_connector:
+            self._vpn_connector.unregister(self)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self._clients):
+            client.writer.close()
+        self._clients.clear()
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+        await self._api.refresher.disable()
+
+    async def _remove_stale_socket(self):
+        try:
+            mode = os.lstat(self._socket_path).st_mode
+        except FileNotFoundError:
+            return
+
+        if not stat.S_ISSOCK(mode):
+            raise protocol.DaemonError(
+                f"Unable to listen on {self._socket_path}: the file exists and is not a socket."
+            )
+
+        try:
+            _, writer = await asyncio.open_unix_connection(self._socket_path)
+        except ConnectionError:
+            # Left behind by a daemon that did not stop cleanly.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._socket_path)
+            return
+
+        writer.close()
+        raise protocol.DaemonAlreadyRunningError(
+            f"Another VPN daemon is already listening on {self._socket_path}."
+        )
+
+    def _create_socket(self) -> socket.socket:
+        # The socket only accepts connections once the server starts
+        # listening on it, after its permissions were restricted.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self._socket_path)
+            os.chmod(self._socket_path, 0o600)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def status_update(self, state: states.State):
+        """Called by the VPN connector whenever the connection state changes."""
+        event = protocol.build_event("state", self._serialize_state(state))
+        for client in list(self._clients):
+            if client.subscribed and not client.send(event):
+                logger.warning("Disconnecting VPN daemon client not reading its events.")
+                client.writer.close()
+                self._clients.discard(client)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = _DaemonClient(writer)
+        self._clients.add(client)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._process_request(client, line)
+                client.writer.write(protocol.encode(response))
+                await client.writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError is raised when a line exceeds the maximum message size.
+            logger.warning("VPN daemon client connection error.", exc_info=True)
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+    async def _process_request(self, client: _DaemonClient, line: bytes) -> dict:
+        request_id = None
+        try:
+            request = protocol.decode(line)
+            request_id = request.get("id")
+            handler = self._handlers.get(request.get("method"))
+            if not handler:
+                raise protocol.DaemonError(
+                    f"Unknown method: {request.get('method')}", error_type="UnknownMethod"
+                )
+            result = await handler(client, request.get("params") or {})
+            return protocol.build_result(request_id, result)
+        except Exception as error:  # pylint: disable=broad-except
+            if not isinstance(error, (protocol.DaemonError, ServerNotFoundError)):
+                logger.exception("Unexpected error processing VPN daemon request.")
+            return protocol.build_error(request_id, error)
+
+    async def _ping(self, _client: _DaemonClient, _params: dict):
+        return {"protocol_version": protocol.PROTOCOL_VERSION}
+
+    async def _status(self, _client: _DaemonClient, _params: dict):
+        logged_in = self._api.is_user_logged_in()
+        return {
+            "logged_in": logged_in,
+            "vpn_data_ready": logged_in and self._api.refresher.is_vpn_data_ready,
+            "user_tier": self._api.user_tier if logged_in and self._api.vpn_session_loaded
+            else None,
+            "connection": self._serialize_state(self._vpn_connector.current_state),
+        }
+
+    async def _countries(self, _client: _DaemonClient, _params: dict) -> List[dict]:
+        return [
+            {"code": country.code, "name": country.name, "server_count": len(country.servers)}
+            for country in self._get_server_list().group_by_country()
+        ]
+
+    async def _servers(self, _client: _DaemonClient, params: dict) -> List[dict]:
+        country_code = params.get("country")
+        return [
+            _serialize_server(server) for server in self._get_server_list()
+            if not country_code or server.exit_country == country_code.upper()
+        ]
+
+    async def _server_info(self, _client: _DaemonClient, params: dict) -> dict:
+        return _serialize_server(self._find_server(params))
+
+    async def _fastest(self, _client: _DaemonClient, params: dict) -> dict:
+        return _serialize_server(self._find_fastest_server(params.get("country")))
+
+    async def _connect(self, _client: _DaemonClient, params: dict) -> dict:
+        candidate = None
+        if params.get("server_id") or params.get("server_name"):
+            logical_server = self._find_server(params)
+        else:
+            candidate = self._find_quick_connect_candidate(params.get("country"))
+            logical_server = candidate.logical_server if candidate \
+                else self._find_fastest_server(params.get("country"))
+
+        vpn_server = candidate.vpn_server if candidate \
+            else self._vpn_connector.get_vpn_server(logical_server, self._api.client_config)
+        await self._vpn_connector.connect(
+            vpn_server, protocol=params.get("protocol"), backend=params.get("backend")
+        )
+        return _serialize_server(logical_server)
+
+    async def _disconnect(self, _client: _DaemonClient, _params: dict):
+        await self._vpn_connector.disconnect()
+
+    async def _subscribe(self, client: _DaemonClient, _params: dict) -> dict:
+        client.subscribed = True
+        return self._serialize_state(self._vpn_connector.current_state)
+
+    async def _unsubscribe(self, client: _DaemonClient, _params: dict):
+        client.subscribed = False
+
+    def _get_server_list(self) -> ServerList:
+        if not self._api.is_user_logged_in() or not self._api.vpn_session_loaded:
+            raise protocol.DaemonError("Log in required.", error_type="NotLoggedIn")
+        return self._api.server_list
+
+    def _find_server(self, params: dict) -> LogicalServer:
+        server_list = self._get_server_list()
+        if params.get("server_id"):
+            return server_list.get_by_id(params["server_id"])
+        if params.get("server_name"):
+            return server_list.get_by_name(params["server_name"])
+        raise protocol.DaemonError(
+            "Either server_id or server_name is required.", error_type="InvalidParams"
+        )
+
+    def _find_quick_connect_candidate(
+            self, country_code: Optional[str]
+    ) -> Optional[QuickConnectCandidate]:
+        self._get_server_list()  # Makes sure the user is logged in.
+        candidates = self._api.refresher.get_quick_connect_candidates()
+        if not candidates:
+            return None
+        return next(iter(candidates.get(country_code)), None)
+
+    def _find_fastest_server(self, country_code: Optional[str]) -> LogicalServer:
+        candidate = self._find_quick_connect_candidate(country_code)
+        if candidate:
+            return candidate.logical_server
+
+        server_list = self._get_server_list()
+        if country_code:
+            return server_list.get_fastest_in_country(country_code.upper())
+        return server_list.get_fastest()
+
+    @staticmethod
+    def _serialize_state(state: states.State) -> dict:
+        connection = state.context.connection if state.context else None
+        return {
+            "state": state.type.name,
+            "server_id": connection.server_id if connection else None,
+            "server_name": connection.server_name if connection else None,
+        }
+
+
+def _serialize_server(server: LogicalServer) -> dict:
+    return {
+        "id": server.id,
+        "name": server.name,
+        "entry_country": server.entry_country,
+        "exit_country": server.exit_country,
+        "city": server.city,
+        "tier": int(server.tier),
+        "load": server.load,
+        "score": server.score,
+        "enabled": server.enabled,
+        "features": [feature.name for feature in server.features],
+    }
+
+
+async def run(client_type_metadata: ClientTypeMetadata, socket_path: Optional[str] = None):
+    """Runs the daemon until it's interrupted."""
+    daemon = VPNDaemon(ProtonVPNAPI(client_type_metadata), socket_path)
+    await daemon.start()
+
+    stop_requested = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, stop_requested.set)
+
+    try:
+        await stop_requested.wait()
+    finally:
+        await daemon.stop()
+
+
+def main():
+    """Daemon entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument(
+        "--socket", default=None,
+        help=f"Path of the Unix socket (default: {protocol.get_default_socket_path()})."
+    )
+    parser.add_argument(
+        "--client-type", default="daemon", help="Client type reported to the API."
+    )
+    parser.add_argument(
+        "--client-version", default="0.0.0", help="Client version reported to the API."
+    )
+    args = parser.parse_args()
+    asyncio.run(run(
+        ClientTypeMetadata(type=args.client_type, version=args.client_version), args.socket
+    ))
+
+
+if __name__ == "__main__":
+    main()
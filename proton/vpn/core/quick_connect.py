@@ -0,0 +1,166 @@
+"""
+Ready-to-use VPN servers for the most common connection intents.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from proton.vpn.connection import VPNServer, ProtocolPorts
+from proton.vpn.session.client_config import ClientConfig
+from proton.vpn.session.exceptions import ServerNotFoundError
+from proton.vpn.session.servers.logicals import ServerList
+from proton.vpn.session.servers.types import LogicalServer, PhysicalServer, ServerFeatureEnum
+
+
+def build_vpn_server(
+        logical_server: LogicalServer, client_config: ClientConfig,
+        physical_server: Optional[PhysicalServer] = None
+) -> VPNServer:
+    """
+    :return: a :class:`proton.vpn.vpnconnection.interfaces.VPNServer` that
+    can be used to establish a VPN connection with
+    :class:`proton.vpn.vpnconnection.VPNConnection`.
+    :param physical_server: physical server to connect to. By default, a
+        random enabled physical server of the logical server is used.
+    """
+    physical_server = physical_server or logical_server.get_random_physical_server()
+    has_ipv6_support = ServerFeatureEnum.IPV6 in logical_server.features
+    return VPNServer(
+        server_ip=physical_server.entry_ip,
+        domain=physical_server.domain,
+        x25519pk=physical_server.x25519_pk,
+        openvpn_ports=ProtocolPorts(
+            udp=client_config.openvpn_ports.udp,
+            tcp=client_config.openvpn_ports.tcp
+        ),
+        wireguard_ports=ProtocolPorts(
+            udp=client_config.wireguard_ports.udp,
+            tcp=client_config.wireguard_ports.tcp
+        ),
+        server_id=logical_server.id,
+        server_name=logical_server.name,
+        has_ipv6_support=has_ipv6_support,
+        label=physical_server.label
+    )
+
+
+@dataclass
+class QuickConnectCandidate:
+    """Server to quick connect to, together with the VPN server ready to connect to it."""
+    logical_server: LogicalServer
+    vpn_server: VPNServer
+
+
+# Intent key: (exit country code, required feature).
+_IntentKey = Tuple[Optional[str], Optional[ServerFeatureEnum]]
+
+_EXCLUDED_FROM_QUICK_CONNECT = ServerFeatureEnum.SECURE_CORE | ServerFeatureEnum.TOR
+
+
+class QuickConnectCandidates:
+    """
+    Ranked, ready-to-use VPN servers for the most common connection intents:
+    the fastest servers overall, the fastest servers in each country, and
+    the fastest P2P and Secure Core servers.
+
+    They are computed for a given server list and client configuration,
+    so that, once computed, quick connecting is a dictionary lookup.
+    Candidates are selected with the same criteria as
+    `ServerList.get_fastest`: enabled servers within the user tier, by score.
+    """
+    DEFAULT_CANDIDATES_PER_INTENT = 3
+    FEATURE_INTENTS = (ServerFeatureEnum.P2P, ServerFeatureEnum.SECURE_CORE)
+
+    def __init__(
+            self, server_list: ServerList, client_config: ClientConfig,
+            candidates_per_intent: int = DEFAULT_CANDIDATES_PER_INTENT
+    ):
+        self._server_list = server_list
+        self._client_config = client_config
+        self._candidates: Dict[_IntentKey, List[QuickConnectCandidate]] = {}
+        self._compute(candidates_per_intent)
+
+    def is_computed_for(self, server_list: ServerList, client_config: ClientConfig) -> bool:
+        """Returns whether the candidates were computed for the specified server list and
+        client configuration."""
+        return server_list is self._server_list and client_config is self._client_config
+
+    def get(
+            self, country_code: Optional[str] = None, feature: Optional[ServerFeatureEnum] = None
+    ) -> List[QuickConnectCandidate]:
+        """
+        Returns the candidates for the specified intent, from the fastest to the slowest.
+        :param country_code: country to connect to. By default, any country.
+        :param feature: feature required (only P2P and Secure Core are supported).
+            By default, no feature is required.
+        """
+        if country_code and feature:
+            raise ValueError("Candidates by country and feature are not computed.")
+        return self._candidates.get((country_code.upper() if country_code else None, feature), [])
+
+    def get_fastest(
+            self, country_code: Optional[str] = None, feature: Optional[ServerFeatureEnum] = None
+    ) -> QuickConnectCandidate:
+        """
+        Returns the fastest candidate for the specified intent.
+        :raises ServerNotFoundError: if there isn't any.
+        """
+        candidates = self.get(country_code, feature)
+        if not candidates:
+            raise ServerNotFoundError("No server available for quick connect.")
+        return candidates[0]
+
+    def _compute(self, candidates_per_intent: int):
+        # Servers are ranked once, and then each one of them is added to the
+        # candidates of the intents it matches, until they are complete.
+        user_tier = self._server_list.user_tier
+        ranked_servers = sorted(
+            (server for server in self._server_list if server.tier <= user_tier),
+            key=lambda server: server.score
+        )
+
+        for server in ranked_servers:
+            features = server.to_dict().get("Features", 0)
+            intent_keys = []
+            if not features & _EXCLUDED_FROM_QUICK_CONNECT:
+                intent_keys.append((None, None))
+                intent_keys.append(((server.exit_country or "").upper(), None))
+            for feature in self.FEATURE_INTENTS:
+                excluded = _EXCLUDED_FROM_QUICK_CONNECT & ~feature
+                if features & feature and not features & excluded:
+                    intent_keys.append((None, feature))
+
+            intent_keys = [
+                key for key in intent_keys
+                if len(self._candidates.get(key, ())) < candidates_per_intent
+            ]
+            if not intent_keys or not server.enabled:
+                continue
+
+            try:
+                candidate = QuickConnectCandidate(
+                    server, build_vpn_server(server, self._client_config)
+                )
+            except ServerNotFoundError:
+                continue  # No enabled physical servers.
+
+            for key in intent_keys:
+                self._candidates.setdefault(key, []).append(candidate)
@@ -16,6 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from proton.vpn.core.refresher.server_list_refresher import RefreshDemand
 from proton.vpn.core.refresher.vpn_data_refresher import VPNDataRefresher
 
-__all__ = ["VPNDataRefresher"]
+__all__ = ["VPNDataRefresher", "RefreshDemand"]
@@ -0,0 +1,194 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import Callable, Optional, Tuple, List
+
+from proton.vpn import logging
+from proton.vpn.core.refresher.scheduler import RunAgain
+from proton.vpn.core.session_holder import SessionHolder
+from proton.vpn.session.exceptions import BackgroundRequestPreemptedError
+from proton.vpn.session.rate_limiter import background_requests
+from proton.vpn.session.retry_policy import (
+    RetryPolicy, generate_backoff_value, get_retry_after, is_retryable_error
+)
+
+__all__ = ["BaseRefresher", "sort_by_dependencies", "generate_backoff_value"]
+
+logger = logging.getLogger(__name__)
+
+
+class BaseRefresher(ABC):
+    """
+    Base class for the services in charge of keeping a piece of VPN data
+    up to date by periodically fetching it from Proton's REST API.
+
+    Subclasses declare:
+     - NAME: name of the refreshed data, used to identify the refresher and in logs.
+     - DEPENDS_ON: names of the refreshers this refresher depends on. Whenever
+       the data of any of them is updated, the data refreshed by this refresher
+       is considered stale and refreshed as soon as possible.
+
+    Refreshes failing due to transient API errors are retried following the
+    refresher retry policy: exponential backoff with jitter, capped by
+    `max_retry_delay`, but never sooner than the API asked for.
+    """
+    NAME: str = None
+    DEPENDS_ON: Tuple[str, ...] = ()
+    # Delay, in seconds, before running again a refresh that was preempted.
+    PREEMPTED_REFRESH_DELAY = 10
+
+    def __init__(self, session_holder: SessionHolder):
+        if self.NAME is None:
+            raise TypeError(f"Undefined attribute \"NAME\" in {type(self).__name__}")
+
+        self._session_holder = session_holder
+        self._retry_policy = RetryPolicy()
+        self._dependency_updated = False
+        self.data_updated_callback: Optional[Callable[[BaseRefresher], None]] = None
+
+    @property
+    def _session(self):
+        return self._session_holder.session
+
+    @property
+    def refreshes_in_background(self) -> bool:
+        """
+        Returns whether the next refresh does background API requests, which
+        yield to interactive ones and can be preempted.
+        """
+        return True
+
+    @property
+    @abstractmethod
+    def initial_refresh_delay(self) -> float:
+        """Returns the initial delay before the first refresh."""
+
+    @property
+    @abstractmethod
+    def max_retry_delay(self) -> float:
+        """Returns the maximum delay, in seconds, before retrying a failed refresh."""
+
+    @abstractmethod
+    async def _refresh(self, force: bool) -> float:
+        """
+        Refreshes the data.
+
+        :param force: whether the data should be refreshed even if it did not
+            expire yet, because one of the dependencies was updated.
+        :returns: the delay in seconds until the next refresh.
+        """
+
+    def on_dependency_updated(self, dependency_name: str):
+        """
+        Signals that the data of one of the dependencies was updated, so the
+        data of this refresher should be refreshed on the next run.
+        """
+        logger.info(f"{self.NAME.capitalize()} is stale since {dependency_name} was updated.")
+        self._dependency_updated = True
+
+    async def refresh(self) -> RunAgain:
+        """Refreshes the data and returns when the next refresh should happen."""
+        force = self._dependency_updated
+        self._dependency_updated = False
+        try:
+            request_context = (
+                background_requests() if self.refreshes_in_background else nullcontext()
+            )
+            with request_context:
+                next_refresh_delay = await self._refresh(force=force)
+            self._retry_policy.record_success()
+        except BackgroundRequestPreemptedError:
+            logger.info(f"{self.NAME.capitalize()} refresh preempted.")
+            self._dependency_updated = self._dependency_updated or force
+            next_refresh_delay = self.PREEMPTED_REFRESH_DELAY
+        except Exception as error:
+            if not is_retryable_error(error):
+                logger.error(  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.lang.best-practice.logging-error-without-handling.logging-error-without-handling
+                    f"{self.NAME.capitalize()} refresh failed unexpectedly. "
+                    f"Stopping {self.NAME} refresh."
+                )
+                raise
+
+            logger.warning(f"{self.NAME.capitalize()} refresh failed: {error}")
+            self._dependency_updated = self._dependency_updated or force
+            self._retry_policy.record_failure(retry_after=get_retry_after(error))
+            next_refresh_delay = self._get_retry_delay()
+
+        logger_prefix = "Next"
+        if self._retry_policy.failed_attempts:
+            logger_prefix = f"Attempt {self._retry_policy.failed_attempts} for"
+
+        logger.info(
+            f"{logger_prefix} {self.NAME} refresh scheduled in "
+            f"{timedelta(seconds=next_refresh_delay)}"
+        )
+
+        return RunAgain.after_seconds(next_refresh_delay)
+
+    def _get_retry_delay(self) -> float:
+        return max(
+            min(self._retry_policy.get_next_delay(), self.max_retry_delay),
+            self._retry_policy.seconds_until_retry_allowed
+        )
+
+    def _notify_data_updated(self):
+        """Notifies that the refreshed data was updated."""
+        if callable(self.data_updated_callback):
+            self.data_updated_callback(self)  # pylint: disable=not-callable
+
+
+def sort_by_dependencies(refreshers: List[BaseRefresher]) -> List[BaseRefresher]:
+    """
+    Returns the refreshers sorted so that each refresher comes after the
+    refreshers it depends on. Otherwise, the original order is kept.
+
+    :raises ValueError: if a dependency is unknown or if there is a dependency cycle.
+    """
+    refreshers_by_name = {refresher.NAME: refresher for refresher in refreshers}
+    sorted_refreshers = []
+    visiting = set()
+    visited = set()
+
+    def visit(refresher: BaseRefresher):
+        if refresher.NAME in visited:
+            return
+        if refresher.NAME in visiting:
+            raise ValueError(f"Dependency cycle detected on {refresher.NAME} refresher.")
+
+        visiting.add(refresher.NAME)
+        for dependency_name in refresher.DEPENDS_ON:
+            if dependency_name not in refreshers_by_name:
+                raise ValueError(
+                    f"Unknown dependency of {refresher.NAME} refresher: {dependency_name}."
+                )
+            visit(refreshers_by_name[dependency_name])
+        visiting.remove(refresher.NAME)
+
+        visited.add(refresher.NAME)
+        sorted_refreshers.append(refresher)
+
+    for refresher in refreshers:
+        visit(refresher)
+
+    return sorted_refreshers
+
@@ -16,56 +16,32 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from datetime import timedelta
-
-from proton.vpn.core.refresher.scheduler import RunAgain
-from proton.vpn.core.session_holder import SessionHolder
+from proton.vpn.core.refresher.base_refresher import BaseRefresher
 from proton.vpn.session import FeatureFlags
 
-from proton.vpn import logging
-from proton.session.exceptions import (
-    ProtonAPINotReachable, ProtonAPINotAvailable,
-)
-
-logger = logging.getLogger(__name__)
-
-# pylint: disable=R0801
-
 
-class FeatureFlagsRefresher:
+class FeatureFlagsRefresher(BaseRefresher):
     """
-    Service in charge of refreshing VPN client configuration data.
+    Service in charge of refreshing VPN feature flags.
     """
-    def __init__(self, session_holder: SessionHolder):
-        self._session_holder = session_holder
-
-    @property
-    def _session(self):
-        return self._session_holder.session
+    NAME = "feature flags"
 
     @property
     def initial_refresh_delay(self):
         """Returns the initial delay before the first refresh."""
         return self._session.feature_flags.seconds_until_expiration
 
-    async def refresh(self) -> RunAgain:
+    @property
+    def max_retry_delay(self) -> float:
+        """Returns the maximum delay, in seconds, before retrying a failed refresh."""
+        return FeatureFlags.get_refresh_interval_in_seconds()
+
+    async def _refresh(self, force: bool) -> float:
         """Fetches the new features from the REST API."""
-        try:
-            feature_flags = await self._session.fetch_feature_flags()
-            next_refresh_delay = feature_flags.seconds_until_expiration
-        except (ProtonAPINotReachable, ProtonAPINotAvailable) as error:
-            logger.warning(f"Feature flag refresh failed: {error}")
-            next_refresh_delay = FeatureFlags.get_refresh_interval_in_seconds()
-        except Exception:
-            logger.error(  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.lang.best-practice.logging-error-without-handling.logging-error-without-handling
-                "Feature flag refresh failed unexpectedly."
-                "Stopping feature flag refresh."
-            )
-            raise
+        previous_feature_flags = self._session.feature_flags
+        feature_flags = await self._session.fetch_feature_flags()
 
-        logger.info(
-            f"Next feature flag refresh scheduled in "
-            f"{timedelta(seconds=next_refresh_delay)}"
-        )
+        if not previous_feature_flags or feature_flags.differs_from(previous_feature_flags):
+            self._notify_data_updated()
 
-        return RunAgain.after_seconds(next_refresh_delay)
+        return feature_flags.seconds_until_expiration
@@ -16,74 +16,251 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import time
 from datetime import timedelta
+from enum import IntEnum
 from typing import Callable, Optional
 
-from proton.session.exceptions import (
-    ProtonAPINotReachable, ProtonAPINotAvailable,
-)
-
 from proton.vpn import logging
-from proton.vpn.core.refresher.scheduler import RunAgain
+from proton.vpn.core.refresher.base_refresher import BaseRefresher
+from proton.vpn.core.quick_connect import QuickConnectCandidates
+from proton.vpn.core.refresher.feature_flags_refresher import FeatureFlagsRefresher
 from proton.vpn.core.session_holder import SessionHolder
 from proton.vpn.session.servers.logicals import ServerList
 
 logger = logging.getLogger(__name__)
 
 
-class ServerListRefresher:
+class RefreshDemand(IntEnum):
+    """
+    Demand for fresh server loads, as declared by the frontend.
+
+    The higher the value, the fresher the server loads need to be.
+    """
+    IDLE = 0  # E.g. the app is minimized, either connected or not.
+    UI_VISIBLE = 1  # E.g. the user is browsing the server list.
+    CONNECT_IMMINENT = 2  # E.g. the user is about to quick connect.
+
+
+class AdaptiveLoadsRefreshInterval:
+    """
+    Adapts the server loads refresh interval to the observed churn, that is
+    the fraction of servers whose score or status changed between two
+    consecutive server loads updates.
+
+    When churn is high, the interval is shortened so that the loads used
+    for server selection stay fresh. When churn is low, the interval is
+    increased to save bandwidth and CPU. The interval is always kept
+    within the configured bounds.
+    """
+    HIGH_CHURN_THRESHOLD = 0.2
+    LOW_CHURN_THRESHOLD = 0.05
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        min_interval: float = 5 * 60,
+        max_interval: float = 60 * 60,
+        initial_interval: float = ServerList.LOADS_REFRESH_INTERVAL,
+        high_churn_threshold: float = HIGH_CHURN_THRESHOLD,
+        low_churn_threshold: float = LOW_CHURN_THRESHOLD,
+        step_factor: float = 1.5
+    ):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(
+                f"Invalid loads refresh interval bounds: [{min_interval}, {max_interval}]"
+            )
+        if step_factor <= 1:
+            raise ValueError(f"Step factor should be greater than 1: {step_factor}")
+
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._high_churn_threshold = high_churn_threshold
+        self._low_churn_threshold = low_churn_threshold
+        self._step_factor = step_factor
+        self._interval = self._clamp(initial_interval)
+
+    @property
+    def interval(self) -> float:
+        """Current loads refresh interval in seconds (before randomization)."""
+        return self._interval
+
+    def update(self, churn: Optional[float]) -> float:
+        """
+        Updates the refresh interval given the churn observed after the last
+        server loads update.
+
+        :param churn: fraction of servers whose score or status changed,
+            or None if it's unknown.
+        :returns: the new loads refresh interval in seconds.
+        """
+        if churn is None:
+            return self._interval
+
+        if churn >= self._high_churn_threshold:
+            self._interval = self._clamp(self._interval / self._step_factor)
+        elif churn <= self._low_churn_threshold:
+            self._interval = self._clamp(self._interval * self._step_factor)
+
+        return self._interval
+
+    def _clamp(self, interval: float) -> float:
+        return max(self._min_interval, min(interval, self._max_interval))
+
+
+class ServerListRefresher(BaseRefresher):
     """
     Service in charge of refreshing the VPN server list/loads.
+
+    How often server loads are refreshed depends on the current refresh demand:
+     - IDLE: loads are refreshed lazily, the adaptive loads refresh interval
+       being multiplied by IDLE_INTERVAL_FACTOR.
+     - UI_VISIBLE: loads are refreshed following the adaptive loads refresh interval.
+     - CONNECT_IMMINENT: loads are refreshed eagerly, unless they were refreshed
+       less than EAGER_REFRESH_MAX_LOADS_AGE seconds ago.
+
+    After each server list/loads refresh, the quick connect candidates are
+    recomputed, so that they are ready by the time the user connects.
     """
-    def __init__(self, session_holder: SessionHolder):
-        self._session_holder = session_holder
+    NAME = "server list"
+    # The server list is fetched differently depending on the feature flags.
+    DEPENDS_ON = (FeatureFlagsRefresher.NAME,)
+
+    IDLE_INTERVAL_FACTOR = 4
+    EAGER_REFRESH_MAX_LOADS_AGE = 60  # seconds
+
+    def __init__(
+        self, session_holder: SessionHolder,
+        loads_refresh_interval: AdaptiveLoadsRefreshInterval = None
+    ):
+        super().__init__(session_holder)
+        self._loads_refresh_interval = loads_refresh_interval or AdaptiveLoadsRefreshInterval()
+        self._demand = RefreshDemand.UI_VISIBLE
+        self._last_loads_refresh_time: Optional[float] = None
         self.server_list_updated_callback: Optional[Callable] = None
         self.server_loads_updated_callback: Optional[Callable] = None
+        self._quick_connect_candidates: Optional[QuickConnectCandidates] = None
 
     @property
-    def _session(self):
-        return self._session_holder.session
+    def demand(self) -> RefreshDemand:
+        """Returns the current demand for fresh server loads."""
+        return self._demand
+
+    @demand.setter
+    def demand(self, demand: RefreshDemand):
+        """Sets the current demand for fresh server loads."""
+        if demand != self._demand:
+            logger.info(f"Server loads refresh demand changed to {demand.name}.")
+        self._demand = demand
+
+    def get_quick_connect_candidates(self) -> Optional[QuickConnectCandidates]:
+        """
+        Returns the quick connect candidates for the current server list and
+        client configuration, computing them if they were not yet.
+        :returns: None if the server list or the client configuration are not available.
+        """
+        server_list = self._session.server_list
+        client_config = self._session.client_config
+        if server_list is None or client_config is None:
+            return None
+
+        candidates = self._quick_connect_candidates
+        if candidates is None or not candidates.is_computed_for(server_list, client_config):
+            candidates = self._update_quick_connect_candidates(server_list)
+        return candidates
+
+    def _update_quick_connect_candidates(
+            self, server_list: ServerList
+    ) -> Optional[QuickConnectCandidates]:
+        client_config = self._session.client_config
+        self._quick_connect_candidates = None
+        if client_config is None:
+            return None
+
+        try:
+            self._quick_connect_candidates = QuickConnectCandidates(server_list, client_config)
+        except Exception:  # pylint: disable=broad-except
+            # Candidates are only a shortcut: quick connect falls back to
+            # selecting the server at connection time.
+            logger.exception("Unable to compute quick connect candidates.")
+        return self._quick_connect_candidates
+
+    @property
+    def refreshes_in_background(self) -> bool:
+        """
+        Returns whether the next refresh does background API requests.
+
+        Refreshes done because a connection is imminent are interactive, so
+        that they are not preempted once the user actually connects.
+        """
+        return self._demand != RefreshDemand.CONNECT_IMMINENT
 
     @property
     def initial_refresh_delay(self):
         """Returns the initial delay before the first refresh."""
         return self._session.server_list.seconds_until_expiration
 
-    async def refresh(self) -> RunAgain:
+    @property
+    def max_retry_delay(self) -> float:
+        """Returns the maximum delay, in seconds, before retrying a failed refresh."""
+        return ServerList.get_loads_refresh_interval_in_seconds()
+
+    async def _refresh(self, force: bool) -> float:
         """Refreshes the server list/loads if expired, else schedules a future refresh."""
-        try:
-            if self._session.server_list.expired:
-                server_list = await self._session.fetch_server_list()
-                self._notify_server_list()
-                next_refresh_delay = server_list.seconds_until_expiration
-            elif self._session.server_list.loads_expired:
-                server_list = await self._session.update_server_loads()
-                self._notify_server_loads()
-                next_refresh_delay = server_list.seconds_until_expiration
-            else:
-                next_refresh_delay = self._session.server_list.seconds_until_expiration
-        except (ProtonAPINotReachable, ProtonAPINotAvailable) as error:
-            logger.warning(f"Server list refresh failed: {error}")
-            next_refresh_delay = ServerList.get_loads_refresh_interval_in_seconds()
-        except Exception:
-            logger.error(  # noqa: E501 # pylint: disable=line-too-long # nosemgrep: python.lang.best-practice.logging-error-without-handling.logging-error-without-handling
-                "Server list refresh failed unexpectedly. "
-                "Stopping server list refresh."
-            )
-            raise
+        if force or self._session.server_list.expired:
+            server_list = await self._session.fetch_server_list()
+            self._update_quick_connect_candidates(server_list)
+            self._notify_server_list()
+        elif self._loads_refresh_required():
+            server_list = await self._session.update_server_loads()
+            self._last_loads_refresh_time = time.time()
+            self._adapt_loads_refresh_interval(server_list)
+            self._update_quick_connect_candidates(server_list)
+            self._notify_server_loads()
+        else:
+            server_list = self._session.server_list
+
+        return server_list.seconds_until_expiration
+
+    def _loads_refresh_required(self) -> bool:
+        if self._session.server_list.loads_expired:
+            return True
 
-        # Let the scheduler know that this method should be run again after a delay.
-        logger.info(
-            f"Next server list refresh scheduled in "
-            f"{timedelta(seconds=next_refresh_delay)}"
-        )
+        if self._last_loads_refresh_time is None:
+            # The loads were not refreshed by this process yet (e.g. they were
+            # loaded from cache), so they are only considered stale on demand.
+            return self._demand == RefreshDemand.CONNECT_IMMINENT
 
-        return RunAgain.after_seconds(next_refresh_delay)
+        loads_age = time.time() - self._last_loads_refresh_time
+        if self._demand == RefreshDemand.CONNECT_IMMINENT:
+            return loads_age > self.EAGER_REFRESH_MAX_LOADS_AGE
+        if self._demand == RefreshDemand.UI_VISIBLE:
+            # Loads might have been scheduled to expire lazily while idle.
+            return loads_age > self._loads_refresh_interval.interval
+
+        return False
+
+    def _adapt_loads_refresh_interval(self, server_list: ServerList):
+        previous_interval = self._loads_refresh_interval.interval
+        new_interval = self._loads_refresh_interval.update(server_list.loads_churn)
+
+        if self._demand == RefreshDemand.IDLE:
+            server_list.set_loads_refresh_interval(new_interval * self.IDLE_INTERVAL_FACTOR)
+        else:
+            server_list.set_loads_refresh_interval(new_interval)
+
+        if new_interval != previous_interval:
+            logger.info(
+                f"Server loads churn was {server_list.loads_churn:.1%}. Loads refresh "
+                f"interval changed from {timedelta(seconds=previous_interval)} "
+                f"to {timedelta(seconds=new_interval)}."
+            )
 
     def _notify_server_loads(self):
+        self._notify_data_updated()
         if callable(self.server_loads_updated_callback):
             self.server_loads_updated_callback()  # pylint: disable=not-callable
 
     def _notify_server_list(self):
+        self._notify_data_updated()
         if callable(self.server_list_updated_callback):
             self.server_list_updated_callback()  # pylint: disable=not-callable
@@ -23,14 +23,16 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from datetime import timedelta
-from typing import Callable, Optional
+from typing import Callable, Optional, Dict
 
 from proton.vpn import logging
+from proton.vpn.core.quick_connect import QuickConnectCandidates
+from proton.vpn.core.refresher.base_refresher import BaseRefresher, sort_by_dependencies
 from proton.vpn.core.refresher.certificate_refresher import CertificateRefresher
 from proton.vpn.core.refresher.client_config_refresher import ClientConfigRefresher
 from proton.vpn.core.refresher.feature_flags_refresher import FeatureFlagsRefresher
 from proton.vpn.core.refresher.scheduler import Scheduler
-from proton.vpn.core.refresher.server_list_refresher import ServerListRefresher
+from proton.vpn.core.refresher.server_list_refresher import ServerListRefresher, RefreshDemand
 from proton.vpn.core.session_holder import SessionHolder
 from proton.vpn.session.client_config import ClientConfig
 from proton.vpn.session import FeatureFlags
@@ -46,6 +48,10 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
           to be able to establish VPN connection,
         - keeping it up to date and
         - notifying subscribers when VPN data has been updated.
+
+    Refreshers are scheduled after the refreshers they depend on. Whenever
+    the data of a refresher is updated, the refreshers depending on it are
+    rescheduled to run as soon as possible.
     """
     def __init__(  # pylint: disable=too-many-arguments
         self,
@@ -70,10 +76,16 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
         self._feature_flags_refresher = feature_flags_refresher or FeatureFlagsRefresher(
             session_holder
         )
-        self._client_config_refresh_task_id = None
-        self._server_list_refresher_task_id = None
-        self._certificate_refresher_task_id = None
-        self._feature_flags_refresher_task_id = None
+        self._refreshers = sort_by_dependencies([
+            self._client_config_refresher,
+            self._server_list_refresher,
+            self._certificate_refresher,
+            self._feature_flags_refresher,
+        ])
+        self._task_ids: Dict[str, int] = {}
+
+        for refresher in self._refreshers:
+            refresher.data_updated_callback = self._on_refresher_data_updated
 
     def set_error_callback(self, error_callback: Callable[[Exception], None] = None):
         """Sets the error callback to be called when an error occurs while executing a task."""
@@ -106,6 +118,13 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
         """
         return self._session.server_list
 
+    def get_quick_connect_candidates(self) -> Optional[QuickConnectCandidates]:
+        """
+        Returns ready-to-use servers to quick connect to, computed after each
+        server list/loads refresh, or None if the VPN data is not ready.
+        """
+        return self._server_list_refresher.get_quick_connect_candidates()
+
     @property
     def client_config(self) -> ClientConfig:
         """Returns the VPN client configuration."""
@@ -119,10 +138,25 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
     def force_refresh_certificate(self):
         """Force refresh certificate on demand."""
         logger.info("Force refresh certificate.")
-        self._scheduler.cancel_task(self._certificate_refresher_task_id)
-        self._certificate_refresher_task_id = self._scheduler.run_soon(
-            self._certificate_refresher.refresh
-        )
+        self._reschedule_soon(self._certificate_refresher)
+
+    def set_refresh_demand(self, demand: RefreshDemand):
+        """
+        Lets the frontend declare how much it needs fresh server loads.
+
+        Server loads are refreshed lazily while the demand is IDLE and eagerly
+        when a connection is imminent. Whenever the demand increases, the
+        server list refresh is re-evaluated straight away.
+        """
+        previous_demand = self._server_list_refresher.demand
+        self._server_list_refresher.demand = demand
+
+        if demand <= previous_demand or self._server_list_refresher.NAME not in self._task_ids:
+            return
+
+        self._reschedule_soon(self._server_list_refresher)
+        if self._scheduler.is_started:
+            self._scheduler.run_tasks_ready_to_fire()
 
     @property
     def is_vpn_data_ready(self) -> bool:
@@ -145,17 +179,8 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
 
     async def disable(self):
         """Stops retrieving data periodically from Proton's REST API."""
-        self._scheduler.cancel_task(self._client_config_refresh_task_id)
-        self._client_config_refresh_task_id = None
-
-        self._scheduler.cancel_task(self._server_list_refresher_task_id)
-        self._server_list_refresher_task_id = None
-
-        self._scheduler.cancel_task(self._certificate_refresher_task_id)
-        self._certificate_refresher_task_id = None
-
-        self._scheduler.cancel_task(self._feature_flags_refresher_task_id)
-        self._feature_flags_refresher_task_id = None
+        for refresher in self._refreshers:
+            self._scheduler.cancel_task(self._task_ids.pop(refresher.NAME, None))
 
         await self._scheduler.stop()
         logger.info(
@@ -168,43 +193,30 @@ class VPNDataRefresher:  # pylint: disable=too-many-instance-attributes
             "VPN data refresher service enabled.",
             category="app", subcategory="vpn_data_refresher", event="enable"
         )
-        self._client_config_refresh_task_id = self._scheduler.run_after(
-            self._client_config_refresher.initial_refresh_delay,
-            self._client_config_refresher.refresh
-        )
-        logger.info(
-            f"Next client config refresh scheduled in "
-            f"{timedelta(seconds=self._client_config_refresher.initial_refresh_delay)}"
-        )
+        for refresher in self._refreshers:
+            self._task_ids[refresher.NAME] = self._scheduler.run_after(
+                refresher.initial_refresh_delay,
+                refresher.refresh
+            )
+            logger.info(
+                f"Next {refresher.NAME} refresh scheduled in "
+                f"{timedelta(seconds=refresher.initial_refresh_delay)}"
+            )
 
-        self._server_list_refresher_task_id = self._scheduler.run_after(
-            self._server_list_refresher.initial_refresh_delay,
-            self._server_list_refresher.refresh
-        )
-        logger.info(
-            f"Next server list refresh scheduled in "
-            f"{timedelta(seconds=self._server_list_refresher.initial_refresh_delay)}"
-        )
+        self._scheduler.start()
 
-        self._certificate_refresher_task_id = self._scheduler.run_after(
-            self._certificate_refresher.initial_refresh_delay,
-            self._certificate_refresher.refresh
-        )
-        logger.info(
-            f"Next certificate refresh scheduled in "
-            f"{timedelta(seconds=self._certificate_refresher.initial_refresh_delay)}"
-        )
+    def _reschedule_soon(self, refresher: BaseRefresher):
+        self._scheduler.cancel_task(self._task_ids.get(refresher.NAME))
+        self._task_ids[refresher.NAME] = self._scheduler.run_soon(refresher.refresh)
 
-        self._feature_flags_refresher_task_id = self._scheduler.run_after(
-            self._feature_flags_refresher.initial_refresh_delay,
-            self._feature_flags_refresher.refresh
-        )
-        logger.info(
-            f"Next feature flags refresh scheduled in "
-            f"{timedelta(seconds=self._feature_flags_refresher.initial_refresh_delay)}"
-        )
+    def _on_refresher_data_updated(self, updated_refresher: BaseRefresher):
+        if updated_refresher.NAME not in self._task_ids:
+            return
 
-        self._scheduler.start()
+        for refresher in self._refreshers:
+            if updated_refresher.NAME in refresher.DEPENDS_ON:
+                refresher.on_dependency_updated(updated_refresher.NAME)
+                self._reschedule_soon(refresher)
 
     async def _refresh_vpn_session_and_then_enable(self):
         logger.warning("Reloading VPN session...")
@@ -23,9 +23,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 import platform
-from typing import Optional
-
-import distro
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from proton.sso import ProtonSSO
 from proton.vpn import logging
@@ -36,8 +35,22 @@ from proton.vpn.session.utils import to_semver_build_metadata_format
 logger = logging.getLogger(__name__)
 
 CPU_ARCHITECTURE = to_semver_build_metadata_format(platform.machine())
-DISTRIBUTION_ID = distro.id()
-DISTRIBUTION_VERSION = distro.version()
+
+
+@lru_cache(maxsize=None)
+def _get_distribution() -> Tuple[str, str]:
+    """Returns the distribution id and version, which are only looked up once."""
+    import distro  # pylint: disable=import-outside-toplevel
+    return distro.id(), distro.version()
+
+
+def __getattr__(name: str):
+    # Looking up the distribution is slow, so it's only done when required.
+    if name == "DISTRIBUTION_ID":
+        return _get_distribution()[0]
+    if name == "DISTRIBUTION_VERSION":
+        return _get_distribution()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -54,10 +67,11 @@ class SessionHolder:
         self, client_type_metadata: ClientTypeMetadata,
         session: VPNSession = None
     ):
+        distribution_id, distribution_version = _get_distribution()
         self._proton_sso = ProtonSSO(
             appversion=self._get_app_version_header_value(client_type_metadata),
             user_agent=f"ProtonVPN/{client_type_metadata.version} "
-                       f"(Linux; {DISTRIBUTION_ID}/{DISTRIBUTION_VERSION})"
+                       f"(Linux; {distribution_id}/{distribution_version})"
         )
         self._session = session
 
@@ -43,10 +43,19 @@ class NetShield(IntEnum):  # pylint: disable=missing-class-docstring
     BLOCK_ADS_AND_TRACKING = 2
 
 
-SETTINGS = os.path.join(
-    VPNExecutionEnvironment().path_config,
-    "settings.json"
-)
+def _get_settings_path() -> str:
+    return os.path.join(
+        VPNExecutionEnvironment().path_config,
+        "settings.json"
+    )
+
+
+def __getattr__(name: str):
+    # The settings path is resolved lazily, so that importing this module
+    # does not require evaluating the execution environment.
+    if name == "SETTINGS":
+        return _get_settings_path()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 DEFAULT_PROTOCOL = "openvpn-udp"
@@ -266,7 +275,7 @@ class Settings:
 class SettingsPersistence:
     """Persists user settings"""
     def __init__(self, cache_handler: CacheHandler = None):
-        self._cache_handler = cache_handler or CacheHandler(SETTINGS)
+        self._cache_handler = cache_handler or CacheHandler(_get_settings_path())
         self._settings = None
         self._settings_are_default = True
 
@@ -0,0 +1,284 @@
+"""
+Single-file snapshot of the cached VPN session data.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from proton.utils.environment import VPNExecutionEnvironment
+from proton.vpn import logging
+from proton.vpn.core.cache_handler import (
+    CacheHandler, FileSignature, file_lock, get_file_signature, refresh_lock, write_atomically
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "session_snapshot.bin"
+
+
+class SnapshotStore:
+    """
+    Stores several cache entries in a single snapshot file.
+
+    The snapshot file starts with a table of contents, a JSON line with
+    the offset and length of each entry, followed by the JSON-serialized
+    entries. The whole file is read at once, the first time an entry is
+    required, but each entry is only parsed when it's loaded.
+
+    Every change rewrites the snapshot to a temporary file which then
+    atomically replaces the previous one. Changes made within `batch()`
+    are written together, so the entries in the snapshot are always
+    consistent with each other, even if the process crashes mid-refresh.
+
+    The snapshot can be shared by several processes: writes are serialized
+    with an advisory file lock, and the snapshot is read again, while holding
+    the lock, before the entries changed by this process are merged into it.
+    This way, entries changed by other processes are never overwritten with
+    stale copies.
+    """
+    FORMAT_VERSION = 1
+    REFRESH_LOCK_TIMEOUT = CacheHandler.REFRESH_LOCK_TIMEOUT
+
+    def __init__(self, filepath: str):
+        self._fp = Path(filepath)
+        self._entries: Optional[Dict[str, bytes]] = None  # Serialized entries, by name.
+        self._file_signature: Optional[FileSignature] = None
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        # Entries changed by this process which were not written yet, by
+        # name. Removed entries are set to None.
+        self._pending_changes: Dict[str, Optional[bytes]] = {}
+
+    def entry(self, name: str, legacy_filepath: Optional[str] = None) -> "SnapshotEntry":
+        """
+        Returns a view of the entry with the same interface as `CacheHandler`.
+        :param name: name of the entry.
+        :param legacy_filepath: path of the cache file the entry used to be
+            stored in, which is loaded while the entry is not in the snapshot.
+        """
+        return SnapshotEntry(self, name, legacy_filepath)
+
+    def contains(self, name: str) -> bool:
+        """Returns whether the snapshot contains the entry or not."""
+        with self._lock:
+            return name in self._get_entries()
+
+    def load(self, name: str) -> Optional[dict]:
+        """Loads the entry, if it exists."""
+        with self._lock:
+            serialized_entry = self._get_entries().get(name)
+
+        if serialized_entry is None:
+            return None
+
+        try:
+            return json.loads(serialized_entry)
+        except ValueError:
+            logger.warning(
+                msg=f"Unable to decode snapshot entry \"{name}\"",
+                category="cache", event="load", exc_info=True
+            )
+            return None
+
+    def save(self, name: str, data: dict):
+        """Saves the entry, unless it did not change."""
+        serialized_entry = json.dumps(data).encode("utf-8")
+        with self._lock:
+            entries = self._get_entries()
+            if entries.get(name) == serialized_entry:
+                return
+            entries[name] = serialized_entry
+            self._pending_changes[name] = serialized_entry
+            self._write()
+
+    def remove(self, name: str):
+        """Removes the entry, if it exists."""
+        with self._lock:
+            if self._get_entries().pop(name, None) is not None:
+                self._pending_changes[name] = None
+                self._write()
+
+    @property
+    def changed_on_disk(self) -> bool:
+        """True if the snapshot was replaced by another process since it was last read/written."""
+        file_signature = get_file_signature(self._fp)
+        return file_signature is not None and file_signature != self._file_signature
+
+    def refresh_lock(self, name: str, timeout: Optional[float] = None):
+        """
+        Returns an async context manager electing a single process to refresh
+        the entry. See :func:`proton.vpn.core.cache_handler.refresh_lock`.
+        """
+        return refresh_lock(
+            self._fp.with_name(f".{self._fp.name}.{name}.refresh.lock"),
+            timeout=self.REFRESH_LOCK_TIMEOUT if timeout is None else timeout
+        )
+
+    @contextmanager
+    def batch(self):
+        """Defers writing the snapshot until all changes made within the context are done."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._pending_changes:
+                    self._write()
+
+    def _get_entries(self) -> Dict[str, bytes]:
+        if self._entries is None or self.changed_on_disk:
+            self._entries = self._read()
+            self._apply_pending_changes()
+        return self._entries
+
+    def _apply_pending_changes(self):
+        for name, serialized_entry in self._pending_changes.items():
+            if serialized_entry is None:
+                self._entries.pop(name, None)
+            else:
+                self._entries[name] = serialized_entry
+
+    def _read(self) -> Dict[str, bytes]:
+        try:
+            with open(self._fp, "rb") as file:
+                stat_result = os.fstat(file.fileno())
+                content = file.read()
+        except FileNotFoundError:
+            return {}
+
+        self._file_signature = (
+            stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino
+        )
+
+        try:
+            table_of_contents, payload = content.split(b"\n", 1)
+            table_of_contents = json.loads(table_of_contents)
+            if table_of_contents["version"] != self.FORMAT_VERSION:
+                raise ValueError(f"Unsupported snapshot version: {table_of_contents['version']}")
+
+            entries = {}
+            for name, (offset, length) in table_of_contents["entries"].items():
+                if offset + length > len(payload):
+                    raise ValueError(f"Snapshot entry \"{name}\" is truncated")
+                entries[name] = payload[offset:offset + length]
+            return entries
+        except (ValueError, KeyError, TypeError):
+            logger.warning(
+                msg=f"Unable to decode snapshot file \"{self._fp.name}\"",
+                category="cache", event="load", exc_info=True
+            )
+            return {}
+
+    def _write(self):
+        if self._batch_depth > 0:
+            return  # Written once the batch is done.
+
+        with file_lock(self._fp.with_name(f".{self._fp.name}.lock")):
+            # Other processes may have replaced the snapshot since it was read.
+            self._entries = self._read()
+            self._apply_pending_changes()
+
+            table_of_contents = {"version": self.FORMAT_VERSION, "entries": {}}
+            offset = 0
+            for name, serialized_entry in self._entries.items():
+                table_of_contents["entries"][name] = (offset, len(serialized_entry))
+                offset += len(serialized_entry)
+
+            write_atomically(
+                self._fp,
+                [json.dumps(table_of_contents).encode("utf-8") + b"\n", *self._entries.values()]
+            )
+            self._file_signature = get_file_signature(self._fp)
+            self._pending_changes.clear()
+
+
+class SnapshotEntry:
+    """Entry of a snapshot, with the same interface as `CacheHandler`."""
+    def __init__(self, store: SnapshotStore, name: str, legacy_filepath: Optional[str] = None):
+        self._store = store
+        self._name = name
+        self._legacy_cache = CacheHandler(legacy_filepath) if legacy_filepath else None
+
+    @property
+    def exists(self):
+        """True if the entry exists and False otherwise."""
+        return self._store.contains(self._name) or bool(
+            self._legacy_cache and self._legacy_cache.exists
+        )
+
+    @property
+    def changed_on_disk(self) -> bool:
+        """True if the snapshot was replaced by another process since it was last read/written."""
+        return self._store.changed_on_disk
+
+    def refresh_lock(self, timeout: Optional[float] = None):
+        """Returns an async context manager electing a single process to refresh the entry."""
+        return self._store.refresh_lock(self._name, timeout)
+
+    def save(self, newdata: dict):
+        """Saves the entry to the snapshot."""
+        self._store.save(self._name, newdata)
+        if self._legacy_cache:
+            # The legacy cache file is superseded by the snapshot entry.
+            self._legacy_cache.remove()
+
+    def load(self):
+        """Loads the entry, falling back to the legacy cache file if it's not in the snapshot."""
+        if self._store.contains(self._name):
+            return self._store.load(self._name)
+
+        if self._legacy_cache:
+            return self._legacy_cache.load()
+
+        return None
+
+    def remove(self):
+        """Removes the entry from the snapshot."""
+        self._store.remove(self._name)
+        if self._legacy_cache:
+            self._legacy_cache.remove()
+
+
+_session_snapshot_store: Optional[SnapshotStore] = None
+
+
+def enable_session_snapshot_store(filepath: Optional[str] = None) -> SnapshotStore:
+    """
+    Makes VPN sessions created from now on store their cached data
+    (server list, client configuration and feature flags) in a single
+    snapshot file, instead of a file each.
+    :param filepath: path of the snapshot file. By default, it's stored
+        in the VPN cache directory.
+    """
+    global _session_snapshot_store  # pylint: disable=global-statement
+    _session_snapshot_store = SnapshotStore(
+        filepath or os.path.join(VPNExecutionEnvironment().path_cache, SNAPSHOT_FILENAME)
+    )
+    return _session_snapshot_store
+
+
+def get_session_snapshot_store() -> Optional[SnapshotStore]:
+    """Returns the snapshot store used by VPN sessions, if it was enabled."""
+    return _session_snapshot_store
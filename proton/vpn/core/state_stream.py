@@ -0,0 +1,87 @@
+"""
+Async iterator over the VPN connection states.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque
+
+if TYPE_CHECKING:
+    from proton.vpn.connection.states import State
+
+
+class StateStream:
+    """
+    Async iterator over the connection states reached since it was created.
+
+    States are buffered until they are consumed. The buffer is bounded:
+    once full, the oldest state is dropped to make room for the new one.
+
+    Usage:
+        async with vpn_connector.states() as states:
+            async for state in states:
+                ...
+    """
+    DEFAULT_MAX_BUFFERED_STATES = 32
+
+    def __init__(
+            self, on_close: Callable[[StateStream], None],
+            max_buffered_states: int = DEFAULT_MAX_BUFFERED_STATES
+    ):
+        self._on_close = on_close
+        self._buffer: Deque[State] = deque(maxlen=max_buffered_states)
+        self._new_state = asyncio.Event()
+        self._closed = False
+        self.dropped_states = 0
+
+    def push(self, state: State):
+        """Adds a new state to the stream."""
+        if self._closed:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped_states += 1
+        self._buffer.append(state)
+        self._new_state.set()
+
+    def close(self):
+        """Stops receiving states. Iteration stops once the buffered states are consumed."""
+        if self._closed:
+            return
+        self._closed = True
+        self._new_state.set()
+        self._on_close(self)
+
+    def __aiter__(self) -> StateStream:
+        return self
+
+    async def __anext__(self) -> State:
+        while not self._buffer:
+            if self._closed:
+                raise StopAsyncIteration
+            self._new_state.clear()
+            await self._new_state.wait()
+        return self._buffer.popleft()
+
+    async def __aenter__(self) -> StateStream:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
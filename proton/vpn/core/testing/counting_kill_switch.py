@@ -0,0 +1,65 @@
+"""
+Kill switch backend recording its calls instead of changing the system.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import Counter
+from typing import List, Tuple
+
+from proton.vpn.killswitch.interface import KillSwitch
+
+
+class CountingKillSwitch(KillSwitch):
+    """
+    Kill switch backend that records the calls it receives instead of
+    changing the system, optionally simulating the latency of each call.
+    """
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.calls: List[Tuple] = []
+
+    @property
+    def call_counts(self) -> Counter:
+        """Number of calls received, by method name."""
+        return Counter(call[0] for call in self.calls)
+
+    async def enable(self, vpn_server=None, permanent=False):
+        await self._record("enable", vpn_server, permanent)
+
+    async def disable(self):
+        await self._record("disable")
+
+    async def enable_ipv6_leak_protection(self, permanent=False):
+        await self._record("enable_ipv6_leak_protection", permanent)
+
+    async def disable_ipv6_leak_protection(self):
+        await self._record("disable_ipv6_leak_protection")
+
+    async def _record(self, method_name, *args):
+        self.calls.append((method_name, *args))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @staticmethod
+    def _get_priority() -> int:
+        return 0
+
+    @staticmethod
+    def _validate():
+        return True
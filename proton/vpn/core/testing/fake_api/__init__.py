@@ -0,0 +1,24 @@
+"""
+In-process fake Proton VPN REST API, for integration tests and benchmarks.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from proton.vpn.core.testing.fake_api.server import FakeAPIServer
+from proton.vpn.core.testing.fake_api.client import LoopbackAPIClient, LoopbackAPIResponse
+
+__all__ = ["FakeAPIServer", "LoopbackAPIClient", "LoopbackAPIResponse"]
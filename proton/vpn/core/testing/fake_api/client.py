@@ -0,0 +1,133 @@
+"""
+HTTP client talking to the fake Proton VPN REST API over the loopback interface.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from proton.session.exceptions import ProtonAPIError, ProtonAPINotReachable
+
+from proton.vpn.core.testing.fake_api.server import HOST
+
+NOT_MODIFIED_STATUS = 304
+
+
+@dataclass
+class LoopbackAPIResponse:
+    """Raw API response, with the same interface as the one returned by proton-core."""
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    json: Optional[dict] = None
+
+    def find_first_header(self, name: str, default=None):
+        """Returns the value of the first header with the specified name."""
+        return next(
+            (value for key, value in self.headers.items() if key.lower() == name.lower()),
+            default
+        )
+
+
+class LoopbackAPIClient:
+    """
+    Minimal HTTP/1.1 client exposing the same `async_api_request` method as
+    `proton.session.Session`, so that it can stand in for it when talking to
+    `FakeAPIServer`. JSON is really serialized, sent over a socket and parsed.
+    """
+    def __init__(self, port: int, host: str = HOST):
+        self._host = host
+        self._port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def async_api_request(  # pylint: disable=too-many-arguments
+        self, endpoint, jsondata=None, data=None, additional_headers=None,
+        method=None, params=None, no_condition_check=False, return_raw=False
+    ):
+        """Does a request to the fake API. Same signature as proton-core's."""
+        # pylint: disable=unused-argument
+        async with self._lock:
+            response = await self._send(
+                method or ("POST" if jsondata is not None else "GET"),
+                endpoint, jsondata, additional_headers or {}
+            )
+
+        if return_raw and response.status_code in (200, NOT_MODIFIED_STATUS):
+            return response
+
+        if response.status_code != 200:
+            raise ProtonAPIError(response.status_code, response.headers, response.json or {
+                "Code": response.status_code, "Error": "Unexpected response"
+            })
+
+        return response.json
+
+    async def close(self):
+        """Closes the connection to the fake API."""
+        if self._writer:
+            writer = self._writer
+            self._reader = self._writer = None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _send(self, method, endpoint, jsondata, headers) -> LoopbackAPIResponse:
+        payload = json.dumps(jsondata).encode() if jsondata is not None else b""
+        lines = [f"{method} {endpoint} HTTP/1.1", f"Host: {self._host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(payload)}")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+        try:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(
+                    self._host, self._port
+                )
+            self._writer.write(request)
+            await self._writer.drain()
+            return await self._read_response()
+        except (ConnectionError, asyncio.IncompleteReadError) as error:
+            await self.close()
+            raise ProtonAPINotReachable(f"Fake API not reachable: {error}") from error
+
+    async def _read_response(self) -> LoopbackAPIResponse:
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the fake API.")
+
+        status_code = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = (await self._reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, value = line.split(":", 1)
+            headers[name.strip()] = value.strip()
+
+        content_length = int(headers.get("Content-Length", 0))
+        body = await self._reader.readexactly(content_length) if content_length else b""
+        return LoopbackAPIResponse(
+            status_code=status_code,
+            headers=headers,
+            json=json.loads(body) if body else None
+        )
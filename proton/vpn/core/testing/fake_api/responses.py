@@ -0,0 +1,111 @@
+"""
+Static responses of the fake Proton VPN REST API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+VPN_SETTINGS = {
+    "Code": 1000,
+    "VPN": {
+        "ExpirationTime": 1,
+        "Name": "test",
+        "Password": "passwordtest",
+        "GroupID": "testgroup",
+        "Status": 1,
+        "PlanName": "free",
+        "PlanTitle": "mock_title",
+        "MaxTier": 0,
+        "MaxConnect": 2,
+        "Groups": [
+            "vpnfree"
+        ],
+        "NeedConnectionAllocation": False
+    },
+    "Services": 5,
+    "Subscribed": 0,
+    "Delinquent": 0,
+    "HasPaymentMethod": 1,
+    "Credit": 17091,
+    "Currency": "EUR",
+    "Warnings": []
+}
+
+CERTIFICATE = {
+    "Code": 1000,
+    "SerialNumber": "154197323",
+    "ClientKeyFingerprint": (
+        "a3CzIFFDKF5w4CtPDaz8mWZWzljRb+SqGTkvktCqznMhUemScDonoinYDz8ncOfQ"
+        "w7WI0Ek5aombSVSITnQDTw=="
+    ),
+    "ClientKey": (
+        "-----BEGIN PUBLIC KEY-----\n"
+        "MCowBQYDK2VwAyEAAoqBxaQgj21lzBd9YG0iotoSoHLXQDYS2LdDtiE6Jtk=\n"
+        "-----END PUBLIC KEY-----"
+    ),
+    "Certificate": (
+        "-----BEGIN CERTIFICATE-----\n"
+        "MIICJjCCAdigAwIBAgIECTDdSzAFBgMrZXAwMTEvMC0GA1UEAwwmUHJvdG9uVlBO\n"
+        "IENsaWVudCBDZXJ0aWZpY2F0ZSBBdXRob3JpdHkwHhcNMjIwMTIwMjAyOTIxWhcN\n"
+        "MjIwMTIxMjAyOTIyWjAUMRIwEAYDVQQDDAkxNTQxOTczMjMwKjAFBgMrZXADIQAC\n"
+        "ioHFpCCPbWXMF31gbSKi2hKgctdANhLYt0O2ITom2aOCAS0wggEpMB0GA1UdDgQW\n"
+        "BBS/pHNS2Vf2irz16Cu8uw07PZHJ9zATBgwrBgEEAYO7aQEAAAAEAwIBADATBgwr\n"
+        "BgEEAYO7aQEAAAEEAwIBATBQBgwrBgEEAYO7aQEAAAIEQDA+BAh2cG5iYXNpYwQY\n"
+        "dnBuLWF1dGhvcml6ZWQtZm9yLWNoLTMyBBh2cG4tYXV0aG9yaXplZC1mb3ItY2gt\n"
+        "MzMwDgYDVR0PAQH/BAQDAgeAMAwGA1UdEwEB/wQCMAAwEwYDVR0lBAwwCgYIKwYB\n"
+        "BQUHAwIwWQYDVR0jBFIwUIAUs+HMEJai+CKly9zPRAZGLOuSzgWhNaQzMDExLzAt\n"
+        "BgNVBAMMJlByb3RvblZQTiBDbGllbnQgQ2VydGlmaWNhdGUgQXV0aG9yaXR5ggEB\n"
+        "MAUGAytlcANBAKK+E6d7Rxn7X1u4s4AtJuD3kj6UjBEC3cFr3+A+tiV/THc19Qkr\n"
+        "666A5Ass0n2LsjENVnAJ9VQ6x5lg7011sQk=\n"
+        "-----END CERTIFICATE-----\n"
+    ),
+    "ExpirationTime": 1642796962,
+    "RefreshTime": 1642775362,
+    "Mode": "session",
+    "DeviceName": "",
+    "ServerPublicKeyMode": "EC",
+    "ServerPublicKey": (
+        "-----BEGIN PUBLIC KEY-----\n"
+        "MCowBQYDK2VwAyEANm3aIvkeaMO9ctcIeEfM4K1ME3bU9feum5sWQ3Sdx+o=\n"
+        "-----END PUBLIC KEY-----\n"
+    )
+}
+
+LOCATION = {
+    "Code": 1000,
+    "IP": "83.76.246.115",
+    "Lat": 46.1952,
+    "Long": 6.1436,
+    "Country": "CH",
+    "ISP": "World-Connect Services SARL"
+}
+
+SESSIONS = {
+    "Code": 1000,
+    "Sessions": [
+        {
+            "SessionID": "9A35C20A09AC0833157B320C408CD679",
+            "ExitIP": "1.2.3.4",
+            "Protocol": "openvpn"
+        },
+        {
+            "SessionID": "9A35C20A09AC0833157B320C408CD67A",
+            "ExitIP": "5.6.7.8",
+            "Protocol": "openvpn"
+        }
+    ]
+}
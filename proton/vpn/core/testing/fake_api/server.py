@@ -0,0 +1,232 @@
+"""
+Fake Proton VPN REST API served over HTTP on the loopback interface.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from proton.vpn.session.feature_flags_fetcher import DEFAULT as DEFAULT_FEATURE_FLAGS
+
+from proton.vpn.core.testing.fake_api import responses
+from proton.vpn.core.testing.fleet import generate_fleet, generate_loads
+
+HOST = "127.0.0.1"
+
+Handler = Callable[[dict, Optional[dict]], Tuple[int, Dict[str, str], Optional[dict]]]
+
+
+@dataclass
+class InjectedError:
+    """Error to be returned instead of the normal response."""
+    status_code: int
+    retry_after: Optional[float] = None
+
+
+class FakeAPIServer:  # pylint: disable=too-many-instance-attributes
+    """
+    asyncio-based fake of the Proton VPN REST API, listening on the
+    loopback interface only.
+
+    It serves the routes used by this library from a synthetic fleet, honours
+    If-Modified-Since on /vpn/v1/logicals and allows injecting latency and
+    errors, so that the real serialization and I/O costs can be measured.
+
+    Usage:
+        async with FakeAPIServer(fleet_size=5000) as server:
+            client = LoopbackAPIClient(server.port)
+            ...
+    """
+    def __init__(self, fleet_size: int = 100, seed: int = 0, latency: float = 0):
+        """
+        :param fleet_size: number of logical servers in the fleet.
+        :param seed: seed used to generate the fleet and its loads.
+        :param latency: delay, in seconds, added to every response.
+        """
+        self.latency = latency
+        self.request_count: Counter = Counter()
+        self._seed = seed
+        self._logicals = generate_fleet(fleet_size, seed)
+        self._loads_generation = 0
+        self._last_modified = formatdate(time.time(), usegmt=True)
+        self._injected_errors: Dict[str, Deque[InjectedError]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._routes: Dict[str, Handler] = {
+            "/vpn/v2": self._static_response(responses.VPN_SETTINGS),
+            "/vpn/v1/certificate": self._static_response(responses.CERTIFICATE),
+            "/vpn/v1/location": self._static_response(responses.LOCATION),
+            "/vpn/v1/sessions": self._static_response(responses.SESSIONS),
+            "/vpn/v1/logicals": self._logicals_response,
+            "/vpn/v1/loads": self._loads_response,
+            "/vpn/v2/clientconfig": self._client_config_response,
+            "/feature/v2/frontend": lambda headers, body: (200, {}, DEFAULT_FEATURE_FLAGS),
+        }
+
+    @property
+    def port(self) -> int:
+        """Port the server is listening on."""
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def logicals(self) -> List[dict]:
+        """Logical servers of the fleet."""
+        return self._logicals
+
+    def set_fleet(self, logicals: List[dict]):
+        """Replaces the fleet, which also updates its Last-Modified time."""
+        self._logicals = logicals
+        # Make sure Last-Modified changes even within the same second.
+        self._last_modified = formatdate(time.time() + 1, usegmt=True)
+
+    def inject_error(
+        self, route: str, status_code: int, count: int = 1, retry_after: Optional[float] = None
+    ):
+        """
+        Makes the next `count` requests to the route fail with the specified status code.
+        """
+        errors = self._injected_errors.setdefault(route, deque())
+        errors.extend(InjectedError(status_code, retry_after) for _ in range(count))
+
+    async def start(self):
+        """Starts listening on a random port of the loopback interface."""
+        self._server = await asyncio.start_server(self._handle_connection, HOST, 0)
+
+    async def stop(self):
+        """Stops listening and closes the open connections."""
+        self._server.close()
+        for connection in self._connections:
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                status_code, headers, body = await self._dispatch(*request)
+                writer.write(_serialize_response(status_code, headers, body))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            self._connections.discard(connection)
+
+    async def _dispatch(self, path: str, headers: dict, body: Optional[dict]):
+        route = urlsplit(path).path
+        self.request_count[route] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        injected_errors = self._injected_errors.get(route)
+        if injected_errors:
+            error = injected_errors.popleft()
+            response_headers = {}
+            if error.retry_after is not None:
+                response_headers["Retry-After"] = str(int(error.retry_after))
+            return error.status_code, response_headers, {
+                "Code": error.status_code, "Error": "Injected error"
+            }
+
+        handler = self._routes.get(route)
+        if handler is None:
+            return 404, {}, {"Code": 404, "Error": f"Unknown route: {route}"}
+
+        return handler(headers, body)
+
+    def _logicals_response(self, headers: dict, _body: Optional[dict]):
+        response_headers = {"Last-Modified": self._last_modified}
+        if headers.get("if-modified-since") == self._last_modified:
+            return 304, response_headers, None
+
+        return 200, response_headers, {"Code": 1000, "LogicalServers": self._logicals}
+
+    def _loads_response(self, _headers: dict, _body: Optional[dict]):
+        self._loads_generation += 1
+        loads = generate_loads(self._logicals, seed=self._seed + self._loads_generation)
+        return 200, {}, {"Code": 1000, "LogicalServers": loads}
+
+    @staticmethod
+    def _client_config_response(_headers: dict, _body: Optional[dict]):
+        return 200, {}, {
+            "Code": 1000,
+            "DefaultPorts": {
+                "OpenVPN": {"UDP": [80, 51820, 4569, 1194, 5060], "TCP": [443, 7770, 8443]},
+                "WireGuard": {"UDP": [443, 88, 1224, 51820, 500, 4500], "TCP": [443]},
+            },
+            "HolesIPs": ["62.112.9.168", "104.245.144.186"],
+            "ServerRefreshInterval": 10,
+            "FeatureFlags": {"NetShield": True, "PortForwarding": True, "ModerateNAT": True},
+            "SmartProtocol": {"OpenVPN": True, "WireGuard": True},
+        }
+
+    @staticmethod
+    def _static_response(data: dict) -> Handler:
+        return lambda headers, body: (200, {}, data)
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    _method, path, _version = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, value = line.split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+
+    body = None
+    content_length = int(headers.get("content-length", 0))
+    if content_length:
+        body = json.loads(await reader.readexactly(content_length))
+
+    return path, headers, body
+
+
+def _serialize_response(status_code: int, headers: Dict[str, str], body: Optional[dict]) -> bytes:
+    payload = json.dumps(body).encode() if body is not None else b""
+    lines = [f"HTTP/1.1 {status_code} Fake", f"Content-Length: {len(payload)}"]
+    if payload:
+        lines.append("Content-Type: application/json")
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
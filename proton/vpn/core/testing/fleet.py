@@ -0,0 +1,172 @@
+"""
+Synthetic VPN server fleets, used by the benchmarks and served by the fake API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+import random
+from collections import Counter
+from typing import List, Tuple
+
+from proton.vpn.session.servers.types import ServerFeatureEnum
+
+# Exit countries with their relative weight in the fleet, roughly
+# mimicking the real distribution: a few big countries and a long tail.
+COUNTRY_WEIGHTS = (
+    ("US", 30), ("DE", 10), ("NL", 9), ("GB", 8), ("CH", 7), ("FR", 6), ("CA", 6),
+    ("JP", 4), ("SE", 4), ("AU", 3), ("ES", 3), ("IT", 3), ("SG", 2), ("BR", 2),
+    ("IS", 1), ("AR", 1), ("MX", 1), ("ZA", 1), ("IN", 1), ("HK", 1), ("NO", 1),
+    ("PL", 1), ("RO", 1), ("TW", 1), ("IL", 1), ("AT", 1), ("BE", 1), ("DK", 1),
+)
+FREE_COUNTRIES = ("US", "NL", "JP", "PL", "RO", "MX", "CA", "NO", "CH", "SG")
+SECURE_CORE_COUNTRIES = ("CH", "IS", "SE")
+CITIES_PER_COUNTRY = 5
+
+# Probability of each feature on standard servers.
+FEATURE_PROBABILITIES = (
+    (ServerFeatureEnum.P2P, 0.35),
+    (ServerFeatureEnum.STREAMING, 0.4),
+    (ServerFeatureEnum.IPV6, 0.5),
+    (ServerFeatureEnum.TOR, 0.02),
+)
+
+
+def generate_fleet(  # pylint: disable=too-many-arguments,too-many-locals
+    size: int, seed: int = 0,
+    secure_core_ratio: float = 0.08,
+    free_ratio: float = 0.05,
+    disabled_ratio: float = 0.02,
+    physicals_per_server: Tuple[int, int] = (1, 3),
+) -> List[dict]:
+    """
+    Generates the logical servers of a realistic synthetic fleet, as returned
+    by the /vpn/v1/logicals route.
+
+    :param size: number of logical servers.
+    :param seed: the same seed always generates the same fleet.
+    :param secure_core_ratio: ratio of Secure Core servers. Their entry
+        country is one of the Secure Core countries.
+    :param free_ratio: ratio of servers available on the free tier.
+    :param disabled_ratio: ratio of servers under maintenance.
+    :param physicals_per_server: minimum and maximum number of physical
+        servers behind each logical server.
+    """
+    rng = random.Random(seed)
+    countries = [country for country, _ in COUNTRY_WEIGHTS]
+    weights = [weight for _, weight in COUNTRY_WEIGHTS]
+    server_numbers: Counter = Counter()
+    logicals = []
+    physical_index = 0
+
+    for index in range(size):
+        features = 0
+        secure_core = rng.random() < secure_core_ratio
+        free = not secure_core and rng.random() < free_ratio
+        if free:
+            exit_country = rng.choice(FREE_COUNTRIES)
+        else:
+            exit_country = rng.choices(countries, weights)[0]
+
+        entry_country = exit_country
+        if secure_core:
+            features |= ServerFeatureEnum.SECURE_CORE
+            entry_country = rng.choice(SECURE_CORE_COUNTRIES)
+        elif not free:
+            for feature, probability in FEATURE_PROBABILITIES:
+                if rng.random() < probability:
+                    features |= feature
+
+        server_numbers[(entry_country, exit_country, free)] += 1
+        number = server_numbers[(entry_country, exit_country, free)]
+        if secure_core:
+            name = f"{entry_country}-{exit_country}#{number}"
+        elif free:
+            name = f"{exit_country}-FREE#{number}"
+        else:
+            name = f"{exit_country}#{number}"
+
+        city_number = rng.randrange(CITIES_PER_COUNTRY)
+        domain = f"node-{exit_country.lower()}-{index:05d}.protonvpn.net"
+        enabled = int(rng.random() >= disabled_ratio)
+
+        physicals = []
+        for _ in range(rng.randint(*physicals_per_server)):
+            physicals.append(_generate_physical(rng, physical_index, domain, enabled))
+            physical_index += 1
+
+        logicals.append({
+            "ID": f"logical-{index}",
+            "Name": name,
+            "EntryCountry": entry_country,
+            "ExitCountry": exit_country,
+            "Domain": domain,
+            "Tier": 0 if free else 2,
+            "Features": int(features),
+            "Region": None,
+            "City": f"{exit_country} City {city_number}",
+            "Score": round(rng.uniform(1, 20), 4),
+            "HostCountry": None,
+            "Location": {
+                "Lat": round(rng.uniform(-60, 60), 4),
+                "Long": round(rng.uniform(-180, 180), 4),
+            },
+            "Status": enabled,
+            "Load": rng.randint(0, 100),
+            "Servers": physicals,
+        })
+
+    return logicals
+
+
+def generate_loads(logicals: List[dict], seed: int = 0, churn: float = 0.3) -> List[dict]:
+    """
+    Generates server loads for the specified logical servers, as returned
+    by the /vpn/v1/loads route.
+
+    :param logicals: logical servers the loads are generated for.
+    :param seed: the same seed always generates the same loads.
+    :param churn: ratio of servers whose load and score change.
+    """
+    rng = random.Random(seed)
+    loads = []
+    for logical in logicals:
+        load = logical["Load"]
+        score = logical["Score"]
+        if rng.random() < churn:
+            load = rng.randint(0, 100)
+            score = round(rng.uniform(1, 20), 4)
+        loads.append({
+            "ID": logical["ID"], "Load": load, "Score": score, "Status": logical["Status"]
+        })
+
+    return loads
+
+
+def _generate_physical(rng: random.Random, index: int, domain: str, enabled: int) -> dict:
+    ip_address = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+    return {
+        "ID": f"physical-{index}",
+        "EntryIP": ip_address,
+        "ExitIP": ip_address,
+        "Domain": domain,
+        "Status": enabled,
+        "Generation": 0,
+        "Label": str(index % 4),
+        "ServicesDownReason": None,
+        "X25519PublicKey": base64.b64encode(rng.randbytes(32)).decode(),
+    }
@@ -0,0 +1,129 @@
+"""
+Fixed-size history of the most recent VPN connection state transitions.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import io
+import time
+from datetime import datetime, timezone
+from typing import IO, List, Optional
+
+HISTORY_ATTACHMENT_NAME = "connection_history.txt"
+
+
+class TransitionRecord:  # pylint: disable=too-few-public-methods
+    """
+    State transition, as stored in the history.
+
+    Types are stored as they are, instead of their names, so that recording
+    a transition does not format anything.
+    """
+    __slots__ = ("timestamp", "state_type", "event_type", "server_id", "error_type")
+
+    def __init__(self):
+        self.timestamp: float = 0
+        self.state_type = None
+        self.event_type: Optional[type] = None
+        self.server_id: Optional[str] = None
+        self.error_type: Optional[type] = None
+
+    def to_dict(self) -> dict:
+        """Returns the transition as a dictionary of plain values."""
+        return {
+            "timestamp": self.timestamp,
+            "state": self.state_type.name if self.state_type is not None else None,
+            "event": self.event_type.__name__ if self.event_type else None,
+            "server_id": self.server_id,
+            "error": self.error_type.__name__ if self.error_type else None,
+        }
+
+
+class TransitionHistory:
+    """
+    Ring buffer with the most recent state transitions.
+
+    All records are allocated upfront and overwritten in place once the
+    buffer is full, so recording a transition does not allocate memory.
+    """
+    DEFAULT_CAPACITY = 300
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError(f"Invalid transition history capacity: {capacity}")
+        self._records = [TransitionRecord() for _ in range(capacity)]
+        self._next_index = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of transitions kept."""
+        return len(self._records)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(  # pylint: disable=too-many-arguments
+            self, state_type, event_type: Optional[type] = None,
+            server_id: Optional[str] = None, error_type: Optional[type] = None,
+            timestamp: Optional[float] = None
+    ):
+        """Records a new transition, overwriting the oldest one if the history is full."""
+        record = self._records[self._next_index]
+        record.timestamp = time.time() if timestamp is None else timestamp
+        record.state_type = state_type
+        record.event_type = event_type
+        record.server_id = server_id
+        record.error_type = error_type
+
+        self._next_index = (self._next_index + 1) % len(self._records)
+        if self._size < len(self._records):
+            self._size += 1
+
+    def get_transitions(self, limit: Optional[int] = None) -> List[dict]:
+        """
+        Returns the recorded transitions, from the oldest to the most recent one.
+        :param limit: if specified, only the most recent `limit` transitions are returned.
+        """
+        size = self._size if limit is None else min(limit, self._size)
+        start = self._next_index - size
+        return [self._records[index].to_dict() for index in range(start, start + size)]
+
+    def clear(self):
+        """Forgets all the recorded transitions."""
+        self._next_index = 0
+        self._size = 0
+
+    def to_text(self) -> str:
+        """Returns the transitions in a human-readable format, one per line."""
+        lines = []
+        for transition in self.get_transitions():
+            timestamp = datetime.fromtimestamp(transition["timestamp"], tz=timezone.utc)
+            lines.append(
+                f"{timestamp.isoformat(timespec='milliseconds')} {transition['state']} "
+                f"event={transition['event']} server_id={transition['server_id']}"
+                + (f" error={transition['error']}" if transition["error"] else "")
+            )
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_attachment(self) -> IO:
+        """Returns the transitions as a file-like object, to be attached to a bug report."""
+        attachment = io.BytesIO(self.to_text().encode("utf-8"))
+        attachment.name = HISTORY_ATTACHMENT_NAME
+        return attachment
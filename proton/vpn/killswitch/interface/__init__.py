@@ -20,5 +20,6 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from proton.vpn.killswitch.interface.killswitch import KillSwitch, KillSwitchState
+from proton.vpn.killswitch.interface.caching import CachingKillSwitch
 
-__all__ = ["KillSwitch", "KillSwitchState"]
+__all__ = ["KillSwitch", "KillSwitchState", "CachingKillSwitch"]
@@ -0,0 +1,115 @@
+"""
+Kill switch wrapper eliding the calls that would not change the kill switch state.
+
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+from proton.vpn.killswitch.interface.killswitch import KillSwitch
+
+if TYPE_CHECKING:
+    from proton.vpn.connection import VPNServer
+
+# The state applied to the backend is unknown until the first call goes through.
+_UNKNOWN = object()
+_ENABLED = object()
+_DISABLED = None
+
+
+class CachingKillSwitch(KillSwitch):
+    """
+    Wraps a kill switch backend, keeping track of the state applied to it
+    (whether the kill switch and the IPv6 leak protection are enabled or
+    not), so that redundant disable calls don't result in a round-trip to
+    the backend.
+
+    Enable calls are always forwarded: the kill switch state may be changed
+    by other processes sharing the same backend, and skipping an enable call
+    based on a stale cache would leak traffic.
+
+    The kill switch and the IPv6 leak protection are tracked independently:
+    calls affecting the same one are serialized, while calls affecting
+    different ones can run concurrently.
+
+    If a backend call fails, the state is considered unknown again, so that
+    the next call goes through.
+    """
+    def __init__(self, backend: KillSwitch):
+        self._backend = backend
+        self._kill_switch_state = _UNKNOWN
+        self._ipv6_leak_protection_state = _UNKNOWN
+        self._kill_switch_lock = asyncio.Lock()
+        self._ipv6_leak_protection_lock = asyncio.Lock()
+
+    @property
+    def backend(self) -> KillSwitch:
+        """Wrapped kill switch backend."""
+        return self._backend
+
+    def invalidate(self):
+        """
+        Forgets the state applied to the backend, so that the next calls go through.
+        It should be called when the kill switch may have been changed externally.
+        """
+        self._kill_switch_state = _UNKNOWN
+        self._ipv6_leak_protection_state = _UNKNOWN
+
+    async def enable(self, vpn_server: Optional["VPNServer"] = None, permanent: bool = False):
+        """Enables the kill switch."""
+        async with self._kill_switch_lock:
+            self._kill_switch_state = _UNKNOWN
+            await self._backend.enable(vpn_server, permanent=permanent)
+            self._kill_switch_state = _ENABLED
+
+    async def disable(self):
+        """Disables the kill switch, unless it's already disabled."""
+        async with self._kill_switch_lock:
+            if self._kill_switch_state is _DISABLED:
+                return
+            self._kill_switch_state = _UNKNOWN
+            await self._backend.disable()
+            self._kill_switch_state = _DISABLED
+
+    async def enable_ipv6_leak_protection(self, permanent: bool = False):
+        """Enables IPv6 leak protection."""
+        async with self._ipv6_leak_protection_lock:
+            self._ipv6_leak_protection_state = _UNKNOWN
+            await self._backend.enable_ipv6_leak_protection(permanent=permanent)
+            self._ipv6_leak_protection_state = _ENABLED
+
+    async def disable_ipv6_leak_protection(self):
+        """Disables IPv6 leak protection, unless it's already disabled."""
+        async with self._ipv6_leak_protection_lock:
+            if self._ipv6_leak_protection_state is _DISABLED:
+                return
+            self._ipv6_leak_protection_state = _UNKNOWN
+            await self._backend.disable_ipv6_leak_protection()
+            self._ipv6_leak_protection_state = _DISABLED
+
+    @staticmethod
+    def _get_priority() -> int:
+        # The wrapper is not a backend on its own, so it's never loaded.
+        return -1
+
+    @staticmethod
+    def _validate():
+        return False
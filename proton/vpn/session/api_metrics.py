@@ -0,0 +1,176 @@
+"""
+Instrumentation of requests to Proton's REST API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import copy
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from proton.vpn import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+CONTENT_LENGTH_HEADER = "Content-Length"
+
+
+@dataclass
+class RouteMetrics:  # pylint: disable=too-many-instance-attributes
+    """Metrics of the requests to an API route."""
+    route: str
+    request_count: int = 0
+    error_count: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+    latency_histogram: Dict[float, int] = field(
+        default_factory=lambda: dict.fromkeys(LATENCY_BUCKETS, 0)
+    )
+    response_bytes: int = 0  # Only includes the responses whose size is known.
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def average_latency(self) -> float:
+        """Average latency of the requests, in seconds."""
+        return self.total_latency / self.request_count if self.request_count else 0
+
+    @property
+    def not_modified_count(self) -> int:
+        """Number of requests answered with 304 Not Modified."""
+        return self.status_codes.get(304, 0)
+
+    def record(
+        self, latency: float, status_code: Optional[int],
+        response_size: Optional[int], error: Optional[Exception]
+    ):
+        """Records the outcome of a request."""
+        self.request_count += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        bucket = next(bucket for bucket in LATENCY_BUCKETS if latency <= bucket)
+        self.latency_histogram[bucket] += 1
+
+        if response_size is not None:
+            self.response_bytes += response_size
+        if status_code is not None:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if error is not None:
+            self.error_count += 1
+            error_type = type(error).__name__
+            self.errors[error_type] = self.errors.get(error_type, 0) + 1
+
+
+class APIMetrics:
+    """
+    Collects per-route metrics of the requests to Proton's REST API:
+    latency histograms, response sizes, status codes and errors.
+    """
+    def __init__(self, log_requests: bool = False):
+        """
+        :param log_requests: whether the outcome of each request should
+            also be written to the structured log.
+        """
+        self.log_requests = log_requests
+        self._routes: Dict[str, RouteMetrics] = {}
+
+    def record(  # pylint: disable=too-many-arguments
+        self, route: str, latency: float, response: Any = None,
+        error: Optional[Exception] = None, status_code: Optional[int] = None
+    ):
+        """
+        Records the outcome of a request.
+
+        :param route: API route. The query string is ignored.
+        :param latency: latency of the request, in seconds.
+        :param response: response returned by the API, if any.
+        :param error: error raised by the request, if any.
+        :param status_code: HTTP status code. By default, it's inferred
+            from the response or the error.
+        """
+        route = route.split("?", 1)[0]
+        status_code = status_code or _get_status_code(response, error)
+        response_size = _get_response_size(response) if error is None else None
+
+        if route not in self._routes:
+            self._routes[route] = RouteMetrics(route)
+        self._routes[route].record(latency, status_code, response_size, error)
+
+        if self.log_requests:
+            logger.info(
+                f"'{route}' status: {status_code}, latency: {latency:.3f}s, "
+                f"size: {response_size} bytes"
+                + (f", error: {type(error).__name__}" if error is not None else ""),
+                category="api", event="metrics"
+            )
+
+    def get(self, route: str) -> Optional[RouteMetrics]:
+        """Returns a copy of the metrics of the specified route, if any."""
+        metrics = self._routes.get(route.split("?", 1)[0])
+        return copy.deepcopy(metrics) if metrics else None
+
+    def snapshot(self) -> Dict[str, RouteMetrics]:
+        """Returns a copy of the metrics of all routes."""
+        return copy.deepcopy(self._routes)
+
+    @property
+    def total_response_bytes(self) -> int:
+        """Total bytes received across all routes."""
+        return sum(metrics.response_bytes for metrics in self._routes.values())
+
+    def reset(self):
+        """Discards all collected metrics."""
+        self._routes.clear()
+
+
+def _get_status_code(response: Any, error: Optional[Exception]) -> Optional[int]:
+    if error is not None:
+        return getattr(error, "http_code", None)
+
+    # Raw responses have a status code. Otherwise, the request succeeded.
+    return getattr(response, "status_code", 200)
+
+
+def _get_response_size(response: Any) -> Optional[int]:
+    # The size is only recorded when it's known without serializing the
+    # response again, which would be too expensive for large payloads like
+    # the server list.
+    if response is None or isinstance(response, dict):
+        return None
+
+    find_first_header = getattr(response, "find_first_header", None)
+    if callable(find_first_header):
+        content_length = find_first_header(CONTENT_LENGTH_HEADER, None)
+        if content_length is not None:
+            try:
+                return int(content_length)
+            except ValueError:
+                logger.warning(f"Invalid {CONTENT_LENGTH_HEADER} header: {content_length}")
+
+    if getattr(response, "status_code", None) == 304:
+        return 0
+
+    body = getattr(response, "content", None)
+    if isinstance(body, (bytes, str)):
+        return len(body)
+
+    return None
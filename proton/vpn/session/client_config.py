@@ -17,14 +17,11 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING
-from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 import random
 import time
 
-from proton.utils.environment import VPNExecutionEnvironment
-
-from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn.core.cache_handler import CacheHandler, CachePath
 from proton.vpn.session.exceptions import ClientConfigDecodeError
 from proton.vpn.session.utils import rest_api_request
 from proton.vpn.session.dataclasses.client_config import ProtocolPorts
@@ -163,15 +160,16 @@ class ClientConfigFetcher:
     Fetches and caches the client configuration from Proton's REST API.
     """
     ROUTE = "/vpn/v2/clientconfig"
-    CACHE_PATH = Path(VPNExecutionEnvironment().path_cache) / "clientconfig.json"
+    CACHE_PATH = CachePath("clientconfig.json")
 
-    def __init__(self, session: "VPNSession"):
+    def __init__(self, session: "VPNSession", cache_handler: Optional[CacheHandler] = None):
         """
         :param session: session used to retrieve the client configuration.
+        :param cache_handler: handler used to persist the client configuration.
         """
         self._session = session
         self._client_config = None
-        self._cache_file = CacheHandler(self.CACHE_PATH)
+        self._cache_file = cache_handler or CacheHandler(self.CACHE_PATH)
 
     def clear_cache(self):
         """Discards the cache, if existing."""
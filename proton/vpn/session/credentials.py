@@ -22,11 +22,9 @@ import base64
 import random
 
 from typing import Optional
-from proton.vpn.session.certificates import Certificate
 from proton.vpn.session.dataclasses import VPNCertificate
 from proton.vpn.session.exceptions import (VPNCertificateExpiredError,
                                            VPNCertificateFingerprintError)
-from proton.vpn.session.key_mgr import KeyHandler
 from proton.vpn import logging
 
 
@@ -40,6 +38,8 @@ class VPNSecrets:
         - ask for a certificate to the API with the corresponding public key.
     """
     def __init__(self, ed25519_privatekey: Optional[str] = None):
+        # Imported lazily since the crypto libraries are slow to import.
+        from proton.vpn.session.key_mgr import KeyHandler  # pylint: disable=import-outside-toplevel
         self._key_handler = (
             KeyHandler(base64.b64decode(ed25519_privatekey))
             if ed25519_privatekey
@@ -116,6 +116,10 @@ class VPNPubkeyCredentials:
         return cls.REFRESH_INTERVAL * cls._generate_random_component()
 
     def _build_certificate(self, api_certificate, secrets, strict):
+        # Imported lazily since the crypto libraries are slow to import.
+        from proton.vpn.session.certificates import (  # pylint: disable=import-outside-toplevel
+            Certificate
+        )
         fingerprint_from_secrets = secrets.proton_fingerprint_from_x25519_pk
 
         # Get fingerprint from Certificate public key
@@ -35,6 +35,7 @@ class BugReportForm:  # pylint: disable=too-many-instance-attributes
     client_version: str
     client: str
     attachments: List[IO] = field(default_factory=list)
-    os: str = generate_os_string()  # pylint: disable=invalid-name
-    os_version: str = get_distro_version()
+    # Computed on instantiation, so that importing this module doesn't load distro.
+    os: str = field(default_factory=generate_os_string)  # pylint: disable=invalid-name
+    os_version: str = field(default_factory=get_distro_version)
     client_type: str = VPN_CLIENT_TYPE
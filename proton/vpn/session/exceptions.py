@@ -16,6 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+from proton.session.exceptions import ProtonAPINotAvailable
 
 
 class VPNSessionNotLoadedError(Exception):
@@ -67,3 +68,24 @@ class ServerNotFoundError(Exception):
 
 class ClientConfigDecodeError(ValueError):
     """The client configuration could not be parsed."""
+
+
+class APICircuitOpenError(ProtonAPINotAvailable):
+    """
+    Requests to Proton's REST API are temporarily paused after
+    repeated failures.
+    """
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"API requests paused for {retry_after:.0f} seconds after repeated failures."
+        )
+        self.retry_after = retry_after
+
+
+class BackgroundRequestPreemptedError(ProtonAPINotAvailable):
+    """
+    A background request to Proton's REST API was cancelled to make room
+    for user-initiated activity. It should be rescheduled.
+    """
+    def __init__(self):
+        super().__init__("Background API request preempted.")
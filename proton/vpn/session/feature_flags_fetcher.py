@@ -18,11 +18,9 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 from typing import TYPE_CHECKING
-from pathlib import Path
 
-from proton.utils.environment import VPNExecutionEnvironment
 from proton.vpn.session.utils import RefreshCalculator, rest_api_request
-from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn.core.cache_handler import CacheHandler, CachePath
 
 if TYPE_CHECKING:
     from proton.vpn.session.api import VPNSession
@@ -136,6 +134,10 @@ class FeatureFlags:  # pylint: disable=too-few-public-methods
 
         return feature_flag_dict.get("enabled", False)
 
+    def differs_from(self, other: FeatureFlags) -> bool:
+        """Returns whether the feature flags toggles differ from the other ones."""
+        return self._api_data.get("toggles") != other._api_data.get("toggles")
+
     @property
     def is_expired(self) -> bool:
         """Returns if data has expired"""
@@ -160,7 +162,7 @@ class FeatureFlags:  # pylint: disable=too-few-public-methods
 class FeatureFlagsFetcher:
     """Fetches and caches features from Proton's REST API."""
     ROUTE = "/feature/v2/frontend"
-    CACHE_PATH = Path(VPNExecutionEnvironment().path_cache) / "features.json"
+    CACHE_PATH = CachePath("features.json")
 
     def __init__(
         self, session: "VPNSession",
@@ -18,6 +18,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 from __future__ import annotations
 
+from contextlib import nullcontext
 from typing import TYPE_CHECKING, Optional
 
 from proton.vpn import logging
@@ -33,6 +34,7 @@ from proton.vpn.session.utils import rest_api_request
 from proton.vpn.session.feature_flags_fetcher import FeatureFlagsFetcher, FeatureFlags
 
 from proton.vpn.core.settings import Features
+from proton.vpn.core.snapshot_store import SnapshotStore, get_session_snapshot_store
 
 if TYPE_CHECKING:
     from proton.vpn.session import VPNSession
@@ -58,11 +60,39 @@ class VPNSessionFetcher:
             server_list_fetcher: Optional[ServerListFetcher] = None,
             client_config_fetcher: Optional[ClientConfigFetcher] = None,
             features_fetcher: Optional[FeatureFlagsFetcher] = None,
-    ):
+            snapshot_store: Optional[SnapshotStore] = None,
+    ):  # pylint: disable=too-many-arguments
         self._session = session
-        self._server_list_fetcher = server_list_fetcher or ServerListFetcher(session)
-        self._client_config_fetcher = client_config_fetcher or ClientConfigFetcher(session)
-        self._feature_flags_fetcher = features_fetcher or FeatureFlagsFetcher(session)
+        self._snapshot_store = snapshot_store or get_session_snapshot_store()
+        self._server_list_fetcher = server_list_fetcher or ServerListFetcher(
+            session, cache_file=self._get_snapshot_entry("serverlist", ServerListFetcher)
+        )
+        self._client_config_fetcher = client_config_fetcher or ClientConfigFetcher(
+            session, cache_handler=self._get_snapshot_entry("clientconfig", ClientConfigFetcher)
+        )
+        self._feature_flags_fetcher = features_fetcher or FeatureFlagsFetcher(
+            session, cache_handler=self._get_snapshot_entry("features", FeatureFlagsFetcher)
+        )
+
+    def _get_snapshot_entry(self, name: str, fetcher_class):
+        """
+        Returns the snapshot entry the fetcher should cache its data to,
+        or None if the fetcher should use its own cache file.
+        """
+        if not self._snapshot_store:
+            return None
+
+        return self._snapshot_store.entry(name, legacy_filepath=fetcher_class.CACHE_PATH)
+
+    def batch_cache_writes(self):
+        """
+        Returns a context manager within which all cache writes are done at once,
+        if the cached data is stored in a snapshot file.
+        """
+        if not self._snapshot_store:
+            return nullcontext()
+
+        return self._snapshot_store.batch()
 
     async def fetch_vpn_info(self) -> VPNSettings:
         """Fetches client VPN information."""
@@ -146,9 +176,10 @@ class VPNSessionFetcher:
 
     def clear_cache(self):
         """Discards the cache, if existing."""
-        self._server_list_fetcher.clear_cache()
-        self._client_config_fetcher.clear_cache()
-        self._feature_flags_fetcher.clear_cache()
+        with self.batch_cache_writes():
+            self._server_list_fetcher.clear_cache()
+            self._client_config_fetcher.clear_cache()
+            self._feature_flags_fetcher.clear_cache()
 
     @staticmethod
     def _convert_features(features: Features):
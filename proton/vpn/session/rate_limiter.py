@@ -0,0 +1,184 @@
+"""
+Client-side rate limiting of requests to Proton's REST API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+from proton.vpn import logging
+
+logger = logging.getLogger(__name__)
+
+# Whether the API requests done in the current context are background ones
+# (e.g. periodic refreshes) rather than user-initiated ones.
+_background_requests: ContextVar[bool] = ContextVar("background_api_requests", default=False)
+
+
+@contextmanager
+def background_requests():
+    """
+    Flags the API requests done within this context as background requests,
+    which yield to user-initiated ones when the rate limit is close.
+    """
+    token = _background_requests.set(True)
+    try:
+        yield
+    finally:
+        _background_requests.reset(token)
+
+
+def are_background_requests() -> bool:
+    """Returns whether API requests in the current context are background ones."""
+    return _background_requests.get()
+
+
+class TokenBucket:
+    """
+    Token bucket: tokens are added at a fixed rate up to the bucket capacity,
+    and each request consumes one token.
+    """
+    def __init__(
+        self, rate: float, capacity: float,
+        time_function: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param rate: tokens added per second.
+        :param capacity: maximum number of tokens, i.e. the allowed burst.
+        :param time_function: function returning the current time.
+        """
+        self._rate = rate
+        self._capacity = capacity
+        self._time = time_function
+        self._tokens = capacity
+        self._last_refill = time_function()
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        self._refill()
+        return self._tokens
+
+    def consume(self):
+        """Consumes a token."""
+        self._refill()
+        self._tokens -= 1
+
+    def seconds_until_available(self, reserve: float = 0) -> float:
+        """Returns the seconds until a token can be consumed leaving `reserve` tokens."""
+        # The reserve can never prevent consuming tokens from a full bucket.
+        reserve = min(reserve, self._capacity - 1)
+        missing_tokens = 1 + reserve - self.tokens
+        return max(missing_tokens / self._rate, 0)
+
+    def _refill(self):
+        now = self._time()
+        self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    Caps the rate of requests to Proton's REST API, both globally and
+    per route, using token buckets.
+
+    Background requests yield to user-initiated ones: they are not allowed
+    to consume the last `background_reserve` tokens of a bucket, and they
+    wait while user-initiated requests are waiting.
+    """
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        global_rate: float = 5,
+        global_capacity: float = 10,
+        route_rate: float = 0.5,
+        route_capacity: float = 3,
+        background_reserve: float = 1,
+        route_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        time_function: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param global_rate: requests per second allowed across all routes.
+        :param global_capacity: burst allowed across all routes.
+        :param route_rate: requests per second allowed per route.
+        :param route_capacity: burst allowed per route.
+        :param background_reserve: tokens background requests are not allowed to consume.
+        :param route_limits: (rate, capacity) overrides per route.
+        :param time_function: function returning the current time.
+        """
+        self._time = time_function
+        self._global_bucket = TokenBucket(global_rate, global_capacity, time_function)
+        self._route_rate = route_rate
+        self._route_capacity = route_capacity
+        self._background_reserve = background_reserve
+        self._route_limits = route_limits or {}
+        self._route_buckets: Dict[str, TokenBucket] = {}
+        self._interactive_waiters = 0
+
+    async def acquire(self, route: str, background: Optional[bool] = None):
+        """
+        Waits until a request to the specified route is allowed.
+
+        :param route: API route. The query string is ignored.
+        :param background: whether it's a background request. By default,
+            it's inferred from the current context (see `background_requests`).
+        """
+        background = are_background_requests() if background is None else background
+        route_bucket = self._get_route_bucket(route)
+        reserve = self._background_reserve if background else 0
+
+        if not background:
+            self._interactive_waiters += 1
+        try:
+            while True:
+                delay = self._seconds_until_allowed(route_bucket, reserve, background)
+                if delay <= 0:
+                    break
+                logger.debug(f"Rate limiting request to '{route}' for {delay:.2f} seconds.")
+                await asyncio.sleep(delay)
+
+            self._global_bucket.consume()
+            route_bucket.consume()
+        finally:
+            if not background:
+                self._interactive_waiters -= 1
+
+    def _seconds_until_allowed(
+        self, route_bucket: TokenBucket, reserve: float, background: bool
+    ) -> float:
+        if background and self._interactive_waiters:
+            # Arbitrary short delay to let the waiting user-initiated requests go first.
+            return max(self._global_bucket.seconds_until_available(reserve), 0.1)
+
+        return max(
+            self._global_bucket.seconds_until_available(reserve),
+            route_bucket.seconds_until_available(reserve),
+        )
+
+    def _get_route_bucket(self, route: str) -> TokenBucket:
+        route = route.split("?", 1)[0]
+        if route not in self._route_buckets:
+            rate, capacity = self._route_limits.get(
+                route, (self._route_rate, self._route_capacity)
+            )
+            self._route_buckets[route] = TokenBucket(rate, capacity, self._time)
+        return self._route_buckets[route]
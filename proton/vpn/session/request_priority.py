@@ -0,0 +1,132 @@
+"""
+Priority lanes for requests to Proton's REST API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import asyncio
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+from proton.vpn import logging
+from proton.vpn.session.exceptions import BackgroundRequestPreemptedError
+from proton.vpn.session.rate_limiter import are_background_requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RequestPriority(IntEnum):
+    """Priority class of a request to Proton's REST API."""
+    BACKGROUND = 0  # E.g. periodic refreshes.
+    INTERACTIVE = 1  # E.g. requests initiated by the user.
+
+    @staticmethod
+    def from_context() -> RequestPriority:
+        """Returns the priority of the requests done in the current context."""
+        if are_background_requests():
+            return RequestPriority.BACKGROUND
+        return RequestPriority.INTERACTIVE
+
+
+class RequestLanes:
+    """
+    Runs API requests in two lanes depending on their priority.
+
+    Background requests are paused while interactive requests are in flight,
+    and in-flight background requests can be preempted, in which case
+    `BackgroundRequestPreemptedError` is raised to the caller so that the
+    request can be rescheduled.
+    """
+    def __init__(self):
+        self._interactive_requests_in_flight = 0
+        self._interactive_requests_done: Optional[asyncio.Event] = None
+        self._background_requests: Set[asyncio.Task] = set()
+        self._preempted_requests: Set[asyncio.Task] = set()
+
+    @property
+    def interactive_requests_in_flight(self) -> int:
+        """Number of interactive requests currently in flight."""
+        return self._interactive_requests_in_flight
+
+    @property
+    def background_requests_in_flight(self) -> int:
+        """Number of background requests currently in flight."""
+        return len(self._background_requests)
+
+    async def run(
+        self, priority: RequestPriority, request: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Runs the request in the lane matching its priority.
+
+        :param priority: priority of the request.
+        :param request: function returning the awaitable doing the request.
+        :raises BackgroundRequestPreemptedError: if the background request
+            was preempted.
+        """
+        if priority is RequestPriority.INTERACTIVE:
+            return await self._run_interactive(request)
+
+        return await self._run_background(request)
+
+    def preempt_background_requests(self):
+        """Cancels the in-flight background requests."""
+        if not self._background_requests:
+            return
+
+        logger.info(f"Preempting {len(self._background_requests)} background API requests.")
+        for task in self._background_requests:
+            self._preempted_requests.add(task)
+            task.cancel()
+
+    async def _run_interactive(self, request: Callable[[], Awaitable[T]]) -> T:
+        self._interactive_requests_in_flight += 1
+        self._get_interactive_requests_done_event().clear()
+        try:
+            return await request()
+        finally:
+            self._interactive_requests_in_flight -= 1
+            if not self._interactive_requests_in_flight:
+                self._get_interactive_requests_done_event().set()
+
+    async def _run_background(self, request: Callable[[], Awaitable[T]]) -> T:
+        if self._interactive_requests_in_flight:
+            logger.debug("Background API request paused until interactive requests are done.")
+            await self._get_interactive_requests_done_event().wait()
+
+        task = asyncio.ensure_future(request())
+        self._background_requests.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError as error:
+            if task in self._preempted_requests:
+                raise BackgroundRequestPreemptedError() from error
+            raise
+        finally:
+            self._background_requests.discard(task)
+            self._preempted_requests.discard(task)
+
+    def _get_interactive_requests_done_event(self) -> asyncio.Event:
+        # Lazily created so that it's bound to the running event loop.
+        if self._interactive_requests_done is None:
+            self._interactive_requests_done = asyncio.Event()
+            self._interactive_requests_done.set()
+        return self._interactive_requests_done
@@ -0,0 +1,285 @@
+"""
+Retry policy shared by all requests to Proton's REST API.
+
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Callable, Optional
+
+from proton.session.exceptions import (
+    ProtonAPIError, ProtonAPINotReachable, ProtonAPINotAvailable,
+)
+
+from proton.vpn import logging
+from proton.vpn.session.exceptions import APICircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_HEADER = "Retry-After"
+RETRYABLE_HTTP_CODES = (429, 502, 503, 504)
+DEFAULT_RANDOMNESS = 0.22
+
+
+class CircuitState(Enum):
+    """
+    State of the circuit breaker of a retry policy.
+
+    CLOSED: requests are allowed.
+    OPEN: requests are rejected until the reset timeout elapses.
+    HALF_OPEN: a single probe request is allowed. If it succeeds the circuit
+        is closed again, otherwise it's opened again.
+
+    Interactive requests are always allowed: while the circuit is not closed
+    they act as probes, so that the user doesn't have to wait for the reset
+    timeout once the API is reachable again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+@dataclass(eq=False)
+class RequestAttempt:
+    """Request allowed by a retry policy, to be passed back when reporting its outcome."""
+    is_probe: bool = False
+
+
+class RetryPolicy:  # pylint: disable=too-many-instance-attributes
+    """
+    Exponential backoff with jitter, a maximum cap, Retry-After awareness
+    and an optional circuit breaker.
+
+    Usage: call `start_request` before doing a request and then report the
+    outcome with `record_success` or `record_failure`, passing the attempt
+    returned by `start_request`. After a failure, `get_next_delay` returns
+    how long to wait before retrying.
+    """
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        base_delay: float = 1,
+        max_delay: Optional[float] = None,
+        randomness: float = DEFAULT_RANDOMNESS,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: float = 30,
+        time_function: Callable[[], float] = time.time
+    ):
+        """
+        :param base_delay: delay in seconds after the first failure.
+        :param max_delay: maximum backoff delay in seconds. `None` means no cap.
+        :param randomness: jitter applied to the backoff delay, as a
+            percentage of it (e.g. 0.22 means +/- 22%).
+        :param failure_threshold: number of consecutive failures after which
+            the circuit is opened. `None` disables the circuit breaker.
+        :param reset_timeout: seconds the circuit stays open before allowing
+            a probe request.
+        :param time_function: function returning the current time.
+        """
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._randomness = randomness
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._time = time_function
+
+        self._failed_attempts = 0
+        self._retry_not_before = 0.0
+        self._circuit_open_until: Optional[float] = None
+        self._probe: Optional[RequestAttempt] = None  # Half-open probe in flight.
+
+    @property
+    def failed_attempts(self) -> int:
+        """Number of consecutive failures recorded so far."""
+        return self._failed_attempts
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state of the circuit breaker."""
+        if self._circuit_open_until is None:
+            return CircuitState.CLOSED
+
+        if self._time() < self._circuit_open_until:
+            return CircuitState.OPEN
+
+        return CircuitState.HALF_OPEN
+
+    def start_request(self, interactive: bool = False) -> Optional[RequestAttempt]:
+        """
+        Returns the attempt to report the outcome of the request with, or
+        None if the request is not allowed right now.
+
+        When the circuit is half-open, only the first background caller is
+        allowed, as a probe. Interactive requests are always allowed and,
+        while the circuit is not closed, they are probes as well.
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return RequestAttempt()
+
+        if interactive:
+            return RequestAttempt(is_probe=True)
+
+        if state is CircuitState.HALF_OPEN and self._probe is None:
+            self._probe = RequestAttempt(is_probe=True)
+            return self._probe
+
+        return None
+
+    def record_success(self):
+        """Records a successful request, closing the circuit if needed."""
+        if self._circuit_open_until is not None:
+            logger.info("API circuit closed.")
+
+        self._failed_attempts = 0
+        self._retry_not_before = 0.0
+        self._circuit_open_until = None
+        self._probe = None
+
+    def release(self, attempt: RequestAttempt):
+        """
+        Releases the attempt without recording any outcome, e.g. because the
+        request was cancelled before completion.
+        """
+        if attempt is not None and attempt is self._probe:
+            self._probe = None
+
+    def record_failure(
+        self, retry_after: Optional[float] = None, attempt: Optional[RequestAttempt] = None
+    ):
+        """
+        Records a failed request.
+
+        :param retry_after: seconds the server asked to wait before retrying.
+        :param attempt: attempt returned by `start_request`. Once the circuit
+            is open, only the failure of a probe opens it again: requests that
+            were already in flight when it was opened don't.
+        """
+        now = self._time()
+        self._failed_attempts += 1
+        if retry_after:
+            self._retry_not_before = max(self._retry_not_before, now + retry_after)
+
+        probe_failed = attempt is not None and attempt.is_probe
+        self.release(attempt)
+
+        if self._failure_threshold is None:
+            return
+
+        if self._circuit_open_until is None:
+            open_circuit = self._failed_attempts >= self._failure_threshold
+        else:
+            open_circuit = probe_failed
+
+        if open_circuit:
+            self._circuit_open_until = max(now + self._reset_timeout, self._retry_not_before)
+            logger.warning(
+                f"API circuit opened after {self._failed_attempts} consecutive failures. "
+                f"Requests are paused for {self._circuit_open_until - now:.0f} seconds."
+            )
+
+    def get_next_delay(self) -> float:
+        """
+        Returns the delay, in seconds, before the next attempt.
+
+        It's the exponential backoff for the current number of failures,
+        but never shorter than what the server asked for with Retry-After
+        nor than the time left for the circuit to become half-open.
+        """
+        if not self._failed_attempts:
+            return 0
+
+        delay = generate_backoff_value(
+            self._failed_attempts - 1,
+            backoff_in_seconds=self._base_delay,
+            random_component=self._generate_random_component()
+        )
+        if self._max_delay is not None:
+            delay = min(delay, self._max_delay)
+
+        return max(delay, self.seconds_until_retry_allowed)
+
+    @property
+    def seconds_until_retry_allowed(self) -> float:
+        """Seconds until the server or the circuit breaker allow a new request."""
+        not_before = self._retry_not_before
+        if self.state is CircuitState.OPEN:
+            not_before = max(not_before, self._circuit_open_until)
+
+        return max(not_before - self._time(), 0)
+
+    def _generate_random_component(self) -> float:
+        return _generate_random_component(self._randomness)
+
+
+def generate_backoff_value(
+        number_of_failed_refresh_attempts: int, backoff_in_seconds: int = 1,
+        random_component: float = None
+) -> int:
+    """Generate and return a backoff value for when API calls fail,
+    so it can retry again without DDoS'ing the API."""
+    random_component = random_component or _generate_random_component()
+    return backoff_in_seconds * 2 ** number_of_failed_refresh_attempts * random_component
+
+
+def _generate_random_component(randomness: float = DEFAULT_RANDOMNESS) -> float:
+    """Generates random component between 1 - randomness and 1 + randomness."""
+    return 1 + randomness * (2 * random.random() - 1)  # nosec B311 # noqa: E501 # pylint: disable=line-too-long # nosemgrep: gitlab.bandit.B311
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Returns whether the error is a transient API error, after which
+    the request should be retried later.
+    """
+    if isinstance(error, (ProtonAPINotReachable, ProtonAPINotAvailable)):
+        return True
+
+    return isinstance(error, ProtonAPIError) and error.http_code in RETRYABLE_HTTP_CODES
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Returns the seconds to wait before retrying as requested by the API
+    through the Retry-After header, if any.
+    """
+    if isinstance(error, APICircuitOpenError):
+        return error.retry_after
+
+    headers = getattr(error, "http_headers", None) or {}
+    value = next(
+        (value for key, value in headers.items() if key.lower() == RETRY_AFTER_HEADER.lower()),
+        None
+    )
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid {RETRY_AFTER_HEADER} header: {value}")
+        return None
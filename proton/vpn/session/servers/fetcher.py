@@ -16,13 +16,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 import re
 
-from proton.utils.environment import VPNExecutionEnvironment
-
-from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn import logging
+from proton.vpn.core.cache_handler import CacheHandler, CachePath
 from proton.vpn.session.exceptions import ServerListDecodeError
 from proton.vpn.session.servers.types import ServerLoad
 from proton.vpn.session.servers.logicals import ServerList, PersistenceKeys
@@ -31,6 +29,8 @@ from proton.vpn.session.utils import rest_api_request
 if TYPE_CHECKING:
     from proton.vpn.session import VPNSession
 
+logger = logging.getLogger(__name__)
+
 NETZONE_HEADER = "X-PM-netzone"
 MODIFIED_SINCE_HEADER = "If-Modified-Since"
 LAST_MODIFIED_HEADER = "Last-Modified"
@@ -45,7 +45,7 @@ class ServerListFetcher:
 
     ROUTE_LOGICALS = "/vpn/v1/logicals?SecureCoreFilter=all"
     ROUTE_LOADS = "/vpn/v1/loads"
-    CACHE_PATH = Path(VPNExecutionEnvironment().path_cache) / "serverlist.json"
+    CACHE_PATH = CachePath("serverlist.json")
 
     """Fetches and caches the list of VPN servers from the REST API."""
     def __init__(
@@ -121,33 +121,51 @@ class ServerListFetcher:
         return self._server_list
 
     async def fetch(self) -> ServerList:
-        """Fetches the list of VPN servers. Warning: this is a heavy request."""
+        """
+        Fetches the list of VPN servers. Warning: this is a heavy request.
+
+        The cache file can be shared by several processes, each one with its
+        own session. Only one of them fetches the server list at a time, and
+        the others reuse it from the cache if it's still fresh.
+        """
+        async with self._cache_file.refresh_lock():
+            server_list = self._load_from_cache_if_refreshed_by_another_process()
+            if server_list and not server_list.expired:
+                return server_list
 
-        if self._session.feature_flags.get(FF_TIMESTAMPEDLOGICALS):
-            return await self.fetch_new()
+            if self._session.feature_flags.get(FF_TIMESTAMPEDLOGICALS):
+                return await self.fetch_new()
 
-        return await self.fetch_old()
+            return await self.fetch_old()
 
     async def update_loads(self) -> ServerList:
         """
         Fetches the server loads from the REST API and
-        updates the current server list with them."""
+        updates the current server list with them.
+
+        As with :meth:`fetch`, loads refreshed by another process sharing
+        the cache file are reused if they are still fresh."""
         if not self._server_list:
             raise RuntimeError(
                 "Server loads can only be updated after fetching the the full server list."
             )
 
-        response = await rest_api_request(
-            self._session,
-            self.ROUTE_LOADS,
-            additional_headers=self._build_additional_headers(),
-        )
+        async with self._cache_file.refresh_lock():
+            server_list = self._load_from_cache_if_refreshed_by_another_process()
+            if server_list and not server_list.loads_expired:
+                return server_list
 
-        server_loads = [ServerLoad(data) for data in response["LogicalServers"]]
-        self._server_list.update(server_loads)
-        self._cache_file.save(self._server_list.to_dict())
+            response = await rest_api_request(
+                self._session,
+                self.ROUTE_LOADS,
+                additional_headers=self._build_additional_headers(),
+            )
 
-        return self._server_list
+            server_loads = [ServerLoad(data) for data in response["LogicalServers"]]
+            self._server_list.update(server_loads)
+            self._cache_file.save(self._server_list.to_dict())
+
+            return self._server_list
 
     def load_from_cache(self) -> ServerList:
         """
@@ -165,6 +183,31 @@ class ServerListFetcher:
         self._server_list = ServerList.from_dict(cache)
         return self._server_list
 
+    def _load_from_cache_if_refreshed_by_another_process(self) -> Optional[ServerList]:
+        """
+        Returns the cached server list if it was written by another process
+        for the same user tier, otherwise None.
+        """
+        if not self._cache_file.changed_on_disk:
+            return None
+
+        cache = self._cache_file.load()
+        if not cache:
+            return None
+
+        try:
+            server_list = ServerList.from_dict(cache)
+        except ServerListDecodeError:
+            logger.warning("Server list written by another process could not be loaded.")
+            return None
+
+        if server_list.user_tier != self._session.vpn_account.max_tier:
+            return None
+
+        logger.info("Reusing server list refreshed by another process.")
+        self._server_list = server_list
+        return self._server_list
+
     def _build_header_netzone(self):
         truncated_ip_address = truncate_ip_address(
             self._session.vpn_account.location.IP
@@ -72,6 +72,7 @@ class ServerList:  # pylint: disable=too-many-public-methods
         self._loads_expiration_time = loads_expiration_time if loads_expiration_time is not None\
             else ServerList.get_loads_expiration_time()
         self._last_modified_time = last_modified_time or ServerList.get_epoch_time()
+        self._loads_churn: Optional[float] = None
 
         if index_servers:
             self._logicals_by_id, self._logicals_by_name = self._build_indexes(logicals)
@@ -131,22 +132,47 @@ class ServerList:  # pylint: disable=too-many-public-methods
         """The time at which the server list was fetched."""
         return self._last_modified_time
 
+    @property
+    def loads_churn(self) -> Optional[float]:
+        """
+        Fraction (between 0 and 1) of logical servers whose status changed,
+        or whose load/score changed beyond `LogicalServer` tolerances, during
+        the last server loads update, or None if the server loads were not
+        updated yet.
+        """
+        return self._loads_churn
+
     def update(self, server_loads: List[ServerLoad]):
         """Updates the server list with new server loads."""
+        number_of_changed_servers = 0
         try:
             for server_load in server_loads:
                 try:
                     logical_server = self.get_by_id(server_load.id)
-                    logical_server.update(server_load)
+                    if logical_server.update(server_load):
+                        number_of_changed_servers += 1
                 except ServerNotFoundError:
                     # Currently /vpn/loads returns some extra servers not returned by /vpn/logicals
                     logger.debug(f"Logical server was not found for update: {server_load}")
         finally:
+            self._loads_churn = (
+                number_of_changed_servers / len(self._logicals) if self._logicals else 0.0
+            )
+
             # If something unexpected happens when updating the server loads
             # it's safer to always update the loads expiration time to avoid
             # clients potentially retrying in a loop.
             self._loads_expiration_time = ServerList.get_loads_expiration_time()
 
+    def set_loads_refresh_interval(self, refresh_interval: float):
+        """
+        Reschedules the expiration of the current server loads so that they
+        expire after the specified refresh interval (randomized by +/- 22%).
+        """
+        self._loads_expiration_time = ServerList.get_loads_expiration_time(
+            refresh_interval=refresh_interval
+        )
+
     @property
     def seconds_until_expiration(self) -> float:
         """
@@ -262,20 +288,25 @@ class ServerList:  # pylint: disable=too-many-public-methods
         return cls.LOGICALS_REFRESH_INTERVAL * cls._generate_random_component()
 
     @classmethod
-    def get_loads_expiration_time(cls, start_time: int = None):
+    def get_loads_expiration_time(cls, start_time: int = None, refresh_interval: float = None):
         """
         Generates the unix time at which the server loads will expire.
         """
         start_time = start_time if start_time is not None else time.time()
-        return start_time + cls.get_loads_refresh_interval_in_seconds()
+        return start_time + cls.get_loads_refresh_interval_in_seconds(refresh_interval)
 
     @classmethod
-    def get_loads_refresh_interval_in_seconds(cls) -> float:
+    def get_loads_refresh_interval_in_seconds(cls, refresh_interval: float = None) -> float:
         """
         Calculates the amount of seconds to wait before the server list should
         be fetched again from the REST API.
+
+        :param refresh_interval: base refresh interval to be randomized. If not
+            specified, LOADS_REFRESH_INTERVAL is used.
         """
-        return cls.LOADS_REFRESH_INTERVAL * cls._generate_random_component()
+        refresh_interval = refresh_interval if refresh_interval is not None \
+            else cls.LOADS_REFRESH_INTERVAL
+        return refresh_interval * cls._generate_random_component()
 
     @classmethod
     def from_dict(
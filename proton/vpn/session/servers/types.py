@@ -123,14 +123,22 @@ class LogicalServer:  # pylint: disable=too-many-public-methods
     PhysicalServer instances away.
     """
 
+    # Load/score variations up to these tolerances are not considered a change,
+    # since scores are recomputed (and therefore vary slightly) on every update.
+    LOAD_CHANGE_TOLERANCE = 10  # Percentage points.
+    SCORE_CHANGE_TOLERANCE = 0.1  # Relative to the previous score.
+
     def __init__(self, data: Dict):
         self._data = data
 
-    def update(self, server_load: ServerLoad):
+    def update(self, server_load: ServerLoad) -> bool:
         """Internally updates the logical server:
             * Load
             * Score
             * Status
+
+        :returns: whether the status of the server changed or its load/score
+            changed beyond the tolerances.
         """
         if self.id != server_load.id:
             raise ValueError(
@@ -138,9 +146,21 @@ class LogicalServer:  # pylint: disable=too-many-public-methods
                 "the server load object"
             )
 
+        status = 1 if server_load.enabled else 0
+        previous_load = self._data.get("Load") or 0
+        previous_score = self._data.get("Score") or 0
+        changed = (
+            self._data.get("Status") != status
+            or abs((server_load.load or 0) - previous_load) > self.LOAD_CHANGE_TOLERANCE
+            or abs((server_load.score or 0) - previous_score)
+            > self.SCORE_CHANGE_TOLERANCE * abs(previous_score)
+        )
+
         self._data["Load"] = server_load.load
         self._data["Score"] = server_load.score
-        self._data["Status"] = 1 if server_load.enabled else 0
+        self._data["Status"] = status
+
+        return changed
 
     @property
     def id(self) -> str:  # pylint: disable=invalid-name
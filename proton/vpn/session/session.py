@@ -17,8 +17,9 @@ You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
+import threading
 from os.path import basename
-from typing import Optional
+from typing import Callable, Dict, Optional
 
 from proton.session import Session, FormData, FormField
 
@@ -74,12 +75,19 @@ class VPNSession(Session):
         self._server_list = server_list
         self._client_config = client_config
         self._feature_flags = feature_flags
+        # Loaders of the session data still to be read from the cache, by attribute name.
+        self._pending_cache_loads: Dict[str, Callable] = {}
+        self._pending_cache_loads_lock = threading.Lock()
         super().__init__(*args, **kwargs)
 
     @property
     def loaded(self) -> bool:
-        """:returns: whether the VPN session data was already loaded or not."""
-        return self._vpn_account and self._server_list and self._client_config
+        """
+        :returns: whether the VPN session data was already loaded or not.
+        Note that this loads the server list and the client configuration
+        from the cache, if they were not loaded yet.
+        """
+        return self.vpn_account and self.server_list and self.client_config
 
     def __setstate__(self, data):
         """This method is called when deserializing the session from the keyring."""
@@ -88,15 +96,43 @@ class VPNSession(Session):
                 self._vpn_account = VPNAccount.from_dict(data['vpn'])
 
                 # Some session data like the server list is not deserialized from the keyring data,
-                # but from plain json file due to its size.
-                self._server_list = self._fetcher.load_server_list_from_cache()
-                self._client_config = self._fetcher.load_client_config_from_cache()
-                self._feature_flags = self._fetcher.load_feature_flags_from_cache()
+                # but from plain json files due to its size. Since parsing them is expensive and
+                # many operations (e.g. logout) don't need them, they are loaded on first access.
+                with self._pending_cache_loads_lock:
+                    self._pending_cache_loads = {
+                        "_server_list": self._fetcher.load_server_list_from_cache,
+                        "_client_config": self._fetcher.load_client_config_from_cache,
+                        "_feature_flags": self._fetcher.load_feature_flags_from_cache,
+                    }
         except ValueError:
             logger.warning("VPN session could not be deserialized.", exc_info=True)
 
         super().__setstate__(data)
 
+    def _load_from_cache_if_pending(self, attribute: str):
+        """Loads the session data stored in the attribute from the cache, if still pending."""
+        if attribute not in self._pending_cache_loads:
+            return
+
+        with self._pending_cache_loads_lock:
+            load_from_cache = self._pending_cache_loads.pop(attribute, None)
+            if not load_from_cache:
+                return  # Loaded by another thread in the meantime.
+
+            try:
+                setattr(self, attribute, load_from_cache())
+            except ValueError:
+                logger.warning(
+                    f"VPN session data could not be loaded from cache: {attribute}.",
+                    exc_info=True
+                )
+
+    def _discard_pending_cache_loads(self, *attributes: str):
+        """Discards pending cache loads, since the data was replaced or removed."""
+        with self._pending_cache_loads_lock:
+            for attribute in attributes or tuple(self._pending_cache_loads):
+                self._pending_cache_loads.pop(attribute, None)
+
     def __getstate__(self):
         """This method is called to retrieve the session data to be serialized in the keyring."""
         state = super().__getstate__()
@@ -141,6 +177,7 @@ class VPNSession(Session):
         Log out and reset session data.
         """
         result = await super().async_logout(no_condition_check, additional_headers)
+        self._discard_pending_cache_loads()
         self._vpn_account = None
         self._server_list = None
         self._client_config = None
@@ -193,38 +230,46 @@ class VPNSession(Session):
 
         self._requests_lock(no_condition_check=True)
         try:
-            secrets = (
-                VPNSecrets(
-                    ed25519_privatekey=self._vpn_account.vpn_credentials
-                    .pubkey_credentials.ed_255519_private_key
+            # If the cached data is stored in a snapshot, it's all written at once.
+            with self._fetcher.batch_cache_writes():
+                secrets = (
+                    VPNSecrets(
+                        ed25519_privatekey=self._vpn_account.vpn_credentials
+                        .pubkey_credentials.ed_255519_private_key
+                    )
+                    if self._vpn_account
+                    else VPNSecrets()
                 )
-                if self._vpn_account
-                else VPNSecrets()
-            )
 
-            vpninfo, certificate, location, client_config = await asyncio.gather(
-                self._fetcher.fetch_vpn_info(),
-                self._fetcher.fetch_certificate(
-                    client_public_key=secrets.ed25519_pk_pem, features=features),
-                self._fetcher.fetch_location(),
-                self._fetcher.fetch_client_config(),
-            )
+                vpninfo, certificate, location, client_config = await asyncio.gather(
+                    self._fetcher.fetch_vpn_info(),
+                    self._fetcher.fetch_certificate(
+                        client_public_key=secrets.ed25519_pk_pem, features=features),
+                    self._fetcher.fetch_location(),
+                    self._fetcher.fetch_client_config(),
+                )
 
-            self._vpn_account = VPNAccount(
-                vpninfo=vpninfo, certificate=certificate, secrets=secrets, location=location
-            )
-            self._client_config = client_config
+                self._vpn_account = VPNAccount(
+                    vpninfo=vpninfo, certificate=certificate, secrets=secrets, location=location
+                )
+                self._discard_pending_cache_loads("_client_config")
+                self._client_config = client_config
+
+                # The feature flags must be fetched before the server list,
+                # since the server list can be fetched differently depending on
+                # what feature flags are enabled.
+                feature_flags = await self._fetcher.fetch_feature_flags()
+                self._discard_pending_cache_loads("_feature_flags")
+                self._feature_flags = feature_flags
 
-            # The feature flags must be fetched before the server list,
-            # since the server list can be fetched differently depending on
-            # what feature flags are enabled.
-            self._feature_flags = await self._fetcher.fetch_feature_flags()
+                # The cached server list is used to only download it again if it was modified.
+                self._load_from_cache_if_pending("_server_list")
 
-            # The server list should be retrieved after the VPNAccount object
-            # has been created, since it requires the location, and it should
-            # be retrieved after the feature flags have been fetched, since it
-            # depends in them for chosing the fetch method.
-            self._server_list = await self._fetcher.fetch_server_list()
+                # The server list should be retrieved after the VPNAccount object
+                # has been created, since it requires the location, and it should
+                # be retrieved after the feature flags have been fetched, since it
+                # depends in them for chosing the fetch method.
+                self._server_list = await self._fetcher.fetch_server_list()
 
         finally:
             # IMPORTANT: apart from releasing the lock, _requests_unlock triggers the
@@ -272,12 +317,15 @@ class VPNSession(Session):
         """
         Fetches the server list from the REST API.
         """
+        # The cached server list is used to only download it again if it was modified.
+        self._load_from_cache_if_pending("_server_list")
         self._server_list = await self._fetcher.fetch_server_list()
         return self._server_list
 
     @property
     def server_list(self) -> ServerList:
         """The current server list."""
+        self._load_from_cache_if_pending("_server_list")
         return self._server_list
 
     async def update_server_loads(self) -> ServerList:
@@ -285,27 +333,34 @@ class VPNSession(Session):
         Fetches the server loads from the REST API and updates the current
         server list with them.
         """
+        self._load_from_cache_if_pending("_server_list")
         self._server_list = await self._fetcher.update_server_loads()
         return self._server_list
 
     async def fetch_client_config(self) -> ClientConfig:
         """Fetches the client configuration from the REST api."""
-        self._client_config = await self._fetcher.fetch_client_config()
+        client_config = await self._fetcher.fetch_client_config()
+        self._discard_pending_cache_loads("_client_config")
+        self._client_config = client_config
         return self._client_config
 
     @property
     def client_config(self) -> ClientConfig:
         """The current client configuration."""
+        self._load_from_cache_if_pending("_client_config")
         return self._client_config
 
     async def fetch_feature_flags(self) -> FeatureFlags:
         """Fetches API features that dictates which features are to be enabled or not."""
-        self._feature_flags = await self._fetcher.fetch_feature_flags()
+        feature_flags = await self._fetcher.fetch_feature_flags()
+        self._discard_pending_cache_loads("_feature_flags")
+        self._feature_flags = feature_flags
         return self._feature_flags
 
     @property
     def feature_flags(self) -> FeatureFlags:
         """Fetches general client configuration to connect to VPN servers."""
+        self._load_from_cache_if_pending("_feature_flags")
         return self._feature_flags
 
     async def submit_bug_report(self, bug_report: BugReportForm):
@@ -16,6 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
 import re
 from typing import Optional
 
@@ -25,8 +26,12 @@ import random
 import os as sys_os
 import json
 from dataclasses import asdict
-import distro
 from proton.vpn import logging
+from proton.vpn.session.api_metrics import APIMetrics
+from proton.vpn.session.exceptions import APICircuitOpenError, BackgroundRequestPreemptedError
+from proton.vpn.session.rate_limiter import RateLimiter
+from proton.vpn.session.request_priority import RequestLanes, RequestPriority
+from proton.vpn.session.retry_policy import RetryPolicy, get_retry_after, is_retryable_error
 
 logger = logging.getLogger(__name__)
 
@@ -103,13 +108,142 @@ class RefreshCalculator:
         return 1 + self._refresh_randomness * (2 * random.random() - 1)  # nosec B311 # noqa: E501 # pylint: disable=line-too-long # nosemgrep: gitlab.bandit.B311
 
 
-async def rest_api_request(session, route, **api_request_kwargs):  # noqa: E501 pylint: disable=missing-function-docstring
-    logger.info(f"'{route}'", category="api", event="request")
-    response = await session.async_api_request(
-        route, **api_request_kwargs
+# Retry policy shared by all requests to Proton's REST API, so that a
+# failing API is not hammered by the different callers.
+_api_retry_policy = None
+# Rate limiter shared by all requests to Proton's REST API.
+_api_rate_limiter = None
+# Priority lanes shared by all requests to Proton's REST API.
+_api_request_lanes = None
+# Metrics collected for all requests to Proton's REST API.
+_api_metrics = None
+
+
+def get_api_retry_policy() -> RetryPolicy:
+    """Returns the retry policy shared by all requests to Proton's REST API."""
+    global _api_retry_policy  # pylint: disable=global-statement
+    if _api_retry_policy is None:
+        _api_retry_policy = RetryPolicy(failure_threshold=5, reset_timeout=30)
+    return _api_retry_policy
+
+
+def get_api_rate_limiter() -> RateLimiter:
+    """Returns the rate limiter shared by all requests to Proton's REST API."""
+    global _api_rate_limiter  # pylint: disable=global-statement
+    if _api_rate_limiter is None:
+        _api_rate_limiter = RateLimiter()
+    return _api_rate_limiter
+
+
+def set_api_rate_limiter(rate_limiter: RateLimiter):
+    """Replaces the rate limiter shared by all requests to Proton's REST API."""
+    global _api_rate_limiter  # pylint: disable=global-statement
+    _api_rate_limiter = rate_limiter
+
+
+def get_api_request_lanes() -> RequestLanes:
+    """Returns the priority lanes shared by all requests to Proton's REST API."""
+    global _api_request_lanes  # pylint: disable=global-statement
+    if _api_request_lanes is None:
+        _api_request_lanes = RequestLanes()
+    return _api_request_lanes
+
+
+def get_api_metrics() -> APIMetrics:
+    """Returns the metrics collected for all requests to Proton's REST API."""
+    global _api_metrics  # pylint: disable=global-statement
+    if _api_metrics is None:
+        _api_metrics = APIMetrics()
+    return _api_metrics
+
+
+def preempt_background_api_requests():
+    """
+    Cancels in-flight background requests to Proton's REST API, e.g. because
+    the user is starting a VPN connection. The callers of the preempted
+    requests get a `BackgroundRequestPreemptedError`.
+    """
+    get_api_request_lanes().preempt_background_requests()
+
+
+async def rest_api_request(
+    session, route, priority: Optional[RequestPriority] = None, **api_request_kwargs
+):
+    """
+    Does a request to Proton's REST API.
+
+    Requests are rate limited client-side. Background requests yield to
+    interactive ones: they wait while interactive requests are in flight and
+    they can be preempted. The latency, size, status code and errors of
+    each request are recorded in the API metrics (see `get_api_metrics`).
+
+    :param priority: priority of the request. By default, requests done
+        within the `background_requests` context are background requests,
+        and the rest are interactive.
+    :raises APICircuitOpenError: if background requests are paused after
+        repeated failures. Its `retry_after` attribute tells when to retry.
+        Interactive requests are never paused: they probe whether the API
+        recovered instead.
+    :raises BackgroundRequestPreemptedError: if the background request
+        was preempted.
+    """
+    priority = RequestPriority.from_context() if priority is None else priority
+    await get_api_rate_limiter().acquire(
+        route, background=priority is RequestPriority.BACKGROUND
     )
+
+    retry_policy = get_api_retry_policy()
+    attempt = retry_policy.start_request(interactive=priority is RequestPriority.INTERACTIVE)
+    if attempt is None:
+        raise APICircuitOpenError(retry_after=retry_policy.seconds_until_retry_allowed)
+
+    # The raw response is always requested so that its size can be recorded.
+    # The parsed JSON is returned unless the caller asked for the raw response.
+    return_raw = api_request_kwargs.pop("return_raw", False)
+    request_timer = _RequestTimer()
+
+    async def send_request():
+        # The lane wait is excluded from the latency.
+        request_timer.start()
+        return await session.async_api_request(route, return_raw=True, **api_request_kwargs)
+
+    logger.info(f"'{route}'", category="api", event="request")
+    try:
+        response = await get_api_request_lanes().run(priority, send_request)
+    except (BackgroundRequestPreemptedError, asyncio.CancelledError):
+        # The API is not at fault.
+        retry_policy.release(attempt)
+        raise
+    except Exception as error:
+        get_api_metrics().record(route, request_timer.elapsed, error=error)
+        if is_retryable_error(error):
+            retry_policy.record_failure(retry_after=get_retry_after(error), attempt=attempt)
+        else:
+            # The API answered, even if with an error.
+            retry_policy.record_success()
+        raise
+
+    get_api_metrics().record(route, request_timer.elapsed, response=response)
+    retry_policy.record_success()
     logger.info(f"'{route}'", category="api", event="response")
-    return response
+    return response if return_raw else response.json
+
+
+class _RequestTimer:
+    """Measures the time elapsed since the request was actually sent."""
+    def __init__(self):
+        self._start_time: Optional[float] = None
+
+    def start(self):
+        """Starts measuring."""
+        self._start_time = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds elapsed since the timer was started, or 0 if it wasn't."""
+        if self._start_time is None:
+            return 0.0
+        return time.monotonic() - self._start_time
 
 
 def to_semver_build_metadata_format(value: Optional[str]) -> Optional[str]:
@@ -134,6 +268,7 @@ def get_desktop_environment() -> str:
 
 def get_distro_variant() -> str:
     """Returns the current distro environment"""
+    import distro  # pylint: disable=import-outside-toplevel
     distro_variant = distro.os_release_attr('variant')
     return f"; {distro_variant}" if distro_variant else ""
 
@@ -143,10 +278,12 @@ def get_distro_version() -> str:
     ie:
      - Fedora: "39"/"40"
     """
+    import distro  # pylint: disable=import-outside-toplevel
     return distro.version()
 
 
 def generate_os_string() -> str:
     """Returns a string which contains information such as the distro, desktop environment
     and distro variant if it exists"""
+    import distro  # pylint: disable=import-outside-toplevel
     return f"{distro.id()} ({get_desktop_environment()}{get_distro_variant()})"
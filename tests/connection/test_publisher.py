@@ -16,9 +16,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
+import gc
+import weakref
 from unittest.mock import Mock, AsyncMock
 
-from proton.vpn.connection.publisher import Publisher
+from proton.vpn.connection.publisher import OverflowPolicy, Publisher
 import pytest
 
 
@@ -82,4 +85,173 @@ async def test_notify_catches_and_logs_exceptions_when_notifying_subscribers(cap
     # Assert that the error was logged.
     errors = [record for record in caplog.records if record.levelname == "ERROR"]
     assert errors
-    assert errors[0].msg.startswith("An error occurred notifying subscriber")
\ No newline at end of file
+    assert errors[0].msg.startswith("An error occurred notifying subscriber")
+
+
+@pytest.mark.asyncio
+async def test_notify_in_queued_mode_does_not_wait_for_subscribers():
+    subscriber = Mock()
+    publisher = Publisher(subscribers=[subscriber], queued=True)
+
+    publisher.notify("foo")
+
+    subscriber.assert_not_called()
+    await publisher.wait_for_deliveries()
+    subscriber.assert_called_once_with("foo")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("overflow_policy, expected_deliveries", [
+    (OverflowPolicy.DROP_OLDEST, ["first", "third"]),
+    (OverflowPolicy.DROP_NEWEST, ["first", "second"]),
+    (OverflowPolicy.COALESCE, ["first", "third"]),
+])
+async def test_notify_in_queued_mode_applies_overflow_policy_to_subscribers_lagging_behind(
+        overflow_policy, expected_deliveries
+):
+    deliveries = []
+    resume_delivery = asyncio.Event()
+
+    async def slow_subscriber(value):
+        deliveries.append(value)
+        await resume_delivery.wait()
+
+    publisher = Publisher(
+        subscribers=[slow_subscriber], queued=True, max_queue_size=1,
+        overflow_policy=overflow_policy
+    )
+
+    publisher.notify("first")
+    await asyncio.sleep(0)  # The first notification is being delivered.
+    publisher.notify("second")
+    publisher.notify("third")
+    resume_delivery.set()
+    await publisher.wait_for_deliveries()
+
+    assert deliveries == expected_deliveries
+    assert publisher.get_subscriber_metrics()[slow_subscriber].dropped == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("overflow_policy", list(OverflowPolicy))
+async def test_notify_in_queued_mode_never_drops_notifications_that_must_be_delivered(
+        overflow_policy
+):
+    deliveries = []
+    resume_delivery = asyncio.Event()
+
+    async def slow_subscriber(value):
+        deliveries.append(value)
+        await resume_delivery.wait()
+
+    publisher = Publisher(
+        subscribers=[slow_subscriber], queued=True, max_queue_size=1,
+        overflow_policy=overflow_policy,
+        must_deliver=lambda args, kwargs: "error" in args[0]
+    )
+
+    publisher.notify("first")
+    await asyncio.sleep(0)  # The first notification is being delivered.
+    publisher.notify("error")
+    publisher.notify("second error")
+    resume_delivery.set()
+    await publisher.wait_for_deliveries()
+
+    assert deliveries == ["first", "error", "second error"]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_can_opt_in_to_queued_delivery():
+    queued_subscriber = Mock()
+    subscriber = Mock()
+    publisher = Publisher()
+    publisher.register(queued_subscriber, queued=True)
+    publisher.register(subscriber)
+
+    publisher.notify("foo")
+
+    subscriber.assert_called_once_with("foo")
+    queued_subscriber.assert_not_called()
+    await publisher.wait_for_deliveries()
+    queued_subscriber.assert_called_once_with("foo")
+
+
+@pytest.mark.asyncio
+async def test_notify_in_queued_mode_flags_subscribers_exceeding_the_time_budget(caplog):
+    async def slow_subscriber(_value):
+        await asyncio.sleep(0.02)
+
+    fast_subscriber = Mock()
+    publisher = Publisher(
+        subscribers=[slow_subscriber, fast_subscriber], queued=True, time_budget=0.01
+    )
+
+    publisher.notify("foo")
+    await publisher.wait_for_deliveries()
+
+    metrics = publisher.get_subscriber_metrics()
+    assert metrics[slow_subscriber].slow_deliveries == 1
+    assert metrics[slow_subscriber].max_seconds >= 0.02
+    assert metrics[fast_subscriber].slow_deliveries == 0
+    assert metrics[fast_subscriber].delivered == 1
+    warnings = [record for record in caplog.records if record.levelname == "WARNING"]
+    assert len(warnings) == 1
+
+
+@pytest.mark.asyncio
+async def test_unregister_in_queued_mode_discards_pending_notifications():
+    subscriber = Mock()
+    publisher = Publisher(subscribers=[subscriber], queued=True)
+
+    publisher.notify("foo")
+    publisher.unregister(subscriber)
+    await asyncio.sleep(0)
+
+    subscriber.assert_not_called()
+
+
+class View:
+    def __init__(self):
+        self.updates = []
+
+    def status_update(self, state):
+        self.updates.append(state)
+
+
+def test_weakly_registered_subscribers_are_unregistered_once_garbage_collected():
+    view = View()
+    publisher = Publisher()
+    publisher.register(view.status_update, weak=True)
+
+    publisher.notify("foo")
+    assert publisher.is_subscriber_registered(view.status_update)
+    assert view.updates == ["foo"]
+
+    del view
+    gc.collect()
+
+    assert publisher.number_of_subscribers == 0
+
+
+def test_strongly_registered_subscribers_are_kept_alive():
+    view = View()
+    view_ref = weakref.ref(view)
+    publisher = Publisher()
+    publisher.register(view.status_update)
+
+    del view
+    gc.collect()
+
+    assert view_ref() is not None
+    assert publisher.number_of_subscribers == 1
+
+
+def test_unregister_unregisters_weakly_registered_bound_method():
+    view = View()
+    publisher = Publisher()
+    publisher.register(view.status_update, weak=True)
+
+    publisher.unregister(view.status_update)
+
+    assert not publisher.is_subscriber_registered(view.status_update)
+    assert publisher.number_of_subscribers == 0
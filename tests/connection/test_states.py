@@ -16,6 +16,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
 from typing import Type
 from unittest.mock import Mock, call, AsyncMock
 
@@ -256,6 +257,7 @@ async def test_disconnected_run_tasks_when_reconnection_is_requested_and_should_
     """
     context = AsyncMock()
     context.reconnection = Mock()
+    context.kill_switch_engaged = False
     disconnected = states.Disconnected(context=context)
 
     generated_event = await disconnected.run_tasks()
@@ -363,3 +365,100 @@ async def test_disconnecting_run_tasks_stops_connection():
     connection_calls = connection.method_calls
     assert len(connection_calls) == 1
     connection_calls[0].method = connection.stop
+
+
+@pytest.mark.asyncio
+async def test_connected_run_tasks_persists_the_connection_while_applying_the_kill_switch_setting():
+    context = AsyncMock()
+    context.kill_switch_setting = KillSwitchSetting.ON
+    persistence_started = asyncio.Event()
+    kill_switch_applied = asyncio.Event()
+
+    async def add_persistence():
+        persistence_started.set()
+        await kill_switch_applied.wait()
+
+    async def enable_kill_switch(permanent):
+        await persistence_started.wait()
+        kill_switch_applied.set()
+
+    context.connection.add_persistence = add_persistence
+    context.kill_switch.enable = enable_kill_switch
+
+    # Both tasks wait for each other, so they only finish if they run concurrently.
+    await asyncio.wait_for(states.Connected(context).run_tasks(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_disconnected_run_tasks_removes_persistence_while_disabling_the_kill_switch():
+    context = AsyncMock()
+    context.reconnection = None
+    context.kill_switch_setting = KillSwitchSetting.ON
+    persistence_removal_started = asyncio.Event()
+    kill_switch_disabled = asyncio.Event()
+
+    async def remove_persistence():
+        persistence_removal_started.set()
+        await kill_switch_disabled.wait()
+
+    async def disable_kill_switch():
+        await persistence_removal_started.wait()
+        kill_switch_disabled.set()
+
+    context.connection.remove_persistence = remove_persistence
+    context.kill_switch.disable = disable_kill_switch
+
+    # Both tasks wait for each other, so they only finish if they run concurrently.
+    await asyncio.wait_for(states.Disconnected(context).run_tasks(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_disconnected_run_tasks_does_not_do_kill_switch_calls_concurrently():
+    context = AsyncMock()
+    context.reconnection = None
+    context.kill_switch_setting = KillSwitchSetting.ON
+    kill_switch_calls_in_flight = []
+
+    async def kill_switch_call():
+        assert not kill_switch_calls_in_flight
+        kill_switch_calls_in_flight.append(None)
+        await asyncio.sleep(0)
+        kill_switch_calls_in_flight.pop()
+
+    context.kill_switch.disable = kill_switch_call
+    context.kill_switch.disable_ipv6_leak_protection = kill_switch_call
+
+    await states.Disconnected(context).run_tasks()
+
+
+@pytest.mark.asyncio
+async def test_disconnected_run_tasks_when_reconnection_is_requested_keeps_the_engaged_kill_switch():
+    context = AsyncMock()
+    context.reconnection = Mock()
+    context.kill_switch_engaged = True
+    disconnected = states.Disconnected(context=context)
+
+    generated_event = await disconnected.run_tasks()
+
+    assert context.method_calls == [call.connection.remove_persistence()]
+    assert isinstance(generated_event, events.Up)
+
+
+@pytest.mark.parametrize("current_state_type", [states.Connecting, states.Connected, states.Error])
+def test_kill_switch_engaged_flag_is_carried_across_server_switch_states(current_state_type):
+    current_connection = Mock()
+    new_connection = Mock()
+    current_state = current_state_type(states.StateContext(
+        connection=current_connection, kill_switch_engaged=True
+    ))
+
+    disconnecting = current_state.on_event(events.Up(events.EventContext(connection=new_connection)))
+    disconnected = disconnecting.on_event(
+        events.Disconnected(events.EventContext(connection=current_connection))
+    )
+    connecting = disconnected.on_event(events.Up(events.EventContext(connection=new_connection)))
+
+    assert isinstance(connecting, states.Connecting)
+    assert disconnecting.context.kill_switch_engaged
+    assert disconnected.context.kill_switch_engaged
+    assert connecting.context.kill_switch_engaged
@@ -0,0 +1,87 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from proton.vpn.connection import states
+from proton.vpn.connection.enum import KillSwitchSetting
+from proton.vpn.connection.timeline import ConnectionTimeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timeline_records_state_and_task_durations():
+    clock = FakeClock()
+    timeline = ConnectionTimeline(clock=clock)
+
+    timeline.enter_state("Connecting")
+    with timeline.track("kill_switch.enable"):
+        clock.now += 0.5
+    clock.now += 2
+    timeline.enter_state("Connected")
+    clock.now += 0.25
+    timeline.finish()
+    clock.now += 10
+
+    assert [(entry.kind, entry.name, entry.start, entry.duration) for entry in timeline.entries] == [
+        ("state", "Connecting", 0, 2.5),
+        ("task", "kill_switch.enable", 0, 0.5),
+        ("state", "Connected", 2.5, None),
+    ]
+    assert timeline.finished
+    assert timeline.duration == 2.75
+    assert timeline.state_durations() == {"Connecting": 2.5}
+    assert str(timeline) == (
+        "Connecting +0ms (kill_switch.enable 500ms) -> Connected +2500ms, total: 2750ms"
+    )
+
+
+def test_timeline_marks_tasks_raising_an_exception_as_failed():
+    timeline = ConnectionTimeline(clock=FakeClock())
+    timeline.enter_state("Connecting")
+
+    with pytest.raises(RuntimeError):
+        with timeline.track("connection.start"):
+            raise RuntimeError("Backend error")
+
+    task_entry = timeline.entries[-1]
+    assert task_entry.failed
+    assert task_entry.duration == 0
+    assert timeline.to_dict()["entries"][-1]["failed"]
+
+
+@pytest.mark.asyncio
+async def test_state_records_its_tasks_in_the_timeline():
+    timeline = ConnectionTimeline(clock=FakeClock())
+    state = states.Connecting(states.StateContext(connection=AsyncMock(), timeline=timeline))
+    state.context.kill_switch = AsyncMock()
+    state.context.kill_switch_setting = KillSwitchSetting.OFF
+
+    await state.run_tasks()
+
+    assert [entry.name for entry in timeline.entries] == [
+        "kill_switch.enable", "connection.start"
+    ]
@@ -0,0 +1,220 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import socket
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from proton.vpn.connection import states
+from proton.vpn.core.daemon import VPNDaemonClient, DaemonError, DaemonAlreadyRunningError
+from proton.vpn.core.daemon.server import VPNDaemon
+from proton.vpn.core.quick_connect import QuickConnectCandidates
+from proton.vpn.core.testing.fleet import generate_fleet
+from proton.vpn.session.client_config import ClientConfig
+from proton.vpn.session.servers.logicals import ServerList, PersistenceKeys
+
+
+def _mock_api(logged_in=True):
+    api = Mock()
+    api.is_user_logged_in.return_value = logged_in
+    api.vpn_session_loaded = logged_in
+    api.user_tier = 2
+    api.server_list = ServerList.from_dict({
+        "LogicalServers": generate_fleet(200), PersistenceKeys.USER_TIER.value: 2
+    })
+    api.refresher.enable = AsyncMock()
+    api.refresher.disable = AsyncMock()
+    api.refresher.is_vpn_data_ready = logged_in
+    api.refresher.get_quick_connect_candidates.return_value = None
+
+    vpn_connector = Mock()
+    vpn_connector.current_state = states.Disconnected()
+    vpn_connector.connect = AsyncMock()
+    vpn_connector.disconnect = AsyncMock()
+    api.get_vpn_connector = AsyncMock(return_value=vpn_connector)
+    return api
+
+
+class _RunningDaemon:
+    def __init__(self, api, socket_path):
+        self.daemon = VPNDaemon(api, socket_path=str(socket_path))
+
+    async def __aenter__(self):
+        await self.daemon.start()
+        return self.daemon
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.daemon.stop()
+
+
+@pytest.mark.asyncio
+async def test_status_and_server_queries(tmp_path):
+    api = _mock_api()
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(api, socket_path), VPNDaemonClient(str(socket_path)) as client:
+        status = await client.status()
+        countries = await client.countries()
+        swiss_servers = await client.servers(country="ch")
+        fastest = await client.fastest()
+        server = await client.server(server_name=fastest["name"])
+
+    api.refresher.enable.assert_called_once()
+    assert status == {
+        "logged_in": True, "vpn_data_ready": True, "user_tier": 2,
+        "connection": {"state": "DISCONNECTED", "server_id": None, "server_name": None},
+    }
+    assert sum(country["server_count"] for country in countries) == len(api.server_list)
+    assert swiss_servers and all(s["exit_country"] == "CH" for s in swiss_servers)
+    assert fastest["id"] == api.server_list.get_fastest().id
+    assert server == fastest
+
+
+@pytest.mark.asyncio
+async def test_connect_to_fastest_server_in_country(tmp_path):
+    api = _mock_api()
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(api, socket_path), VPNDaemonClient(str(socket_path)) as client:
+        server = await client.connect(country="CH", protocol_name="wireguard")
+
+    vpn_connector = api.get_vpn_connector.return_value
+    expected_server = api.server_list.get_fastest_in_country("CH")
+    assert server["id"] == expected_server.id
+    vpn_connector.get_vpn_server.assert_called_once_with(expected_server, api.client_config)
+    vpn_connector.connect.assert_called_once_with(
+        vpn_connector.get_vpn_server.return_value, protocol="wireguard", backend=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_connect_uses_precomputed_quick_connect_candidates(tmp_path):
+    api = _mock_api()
+    api.client_config = ClientConfig.default()
+    candidates = QuickConnectCandidates(api.server_list, api.client_config)
+    api.refresher.get_quick_connect_candidates.return_value = candidates
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(api, socket_path), VPNDaemonClient(str(socket_path)) as client:
+        server = await client.connect(country="CH")
+
+    vpn_connector = api.get_vpn_connector.return_value
+    expected_candidate = candidates.get_fastest("CH")
+    assert server["id"] == expected_candidate.logical_server.id
+    vpn_connector.get_vpn_server.assert_not_called()
+    vpn_connector.connect.assert_called_once_with(
+        expected_candidate.vpn_server, protocol=None, backend=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_state_updates_are_pushed_to_subscribed_clients(tmp_path):
+    api = _mock_api()
+    socket_path = tmp_path / "daemon.sock"
+    received_states = asyncio.Queue()
+    async with _RunningDaemon(api, socket_path) as daemon, \
+            VPNDaemonClient(str(socket_path)) as subscribed_client, \
+            VPNDaemonClient(str(socket_path)) as other_client:
+        initial_state = await subscribed_client.subscribe(received_states.put_nowait)
+        await other_client.ping()
+
+        daemon.status_update(states.Connecting())
+        received_state = await asyncio.wait_for(received_states.get(), timeout=1)
+
+    assert initial_state["state"] == "DISCONNECTED"
+    assert received_state["state"] == "CONNECTING"
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_on_the_client(tmp_path):
+    api = _mock_api(logged_in=False)
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(api, socket_path), VPNDaemonClient(str(socket_path)) as client:
+        with pytest.raises(DaemonError) as not_logged_in:
+            await client.servers()
+        with pytest.raises(DaemonError) as unknown_method:
+            await client.request("foobar")
+
+        # The connection is still usable after errors.
+        assert (await client.status())["logged_in"] is False
+
+    api.refresher.enable.assert_not_called()
+    assert not_logged_in.value.error_type == "NotLoggedIn"
+    assert unknown_method.value.error_type == "UnknownMethod"
+
+
+@pytest.mark.asyncio
+async def test_socket_is_removed_when_daemon_stops(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(_mock_api(), socket_path):
+        assert socket_path.exists()
+        assert socket_path.stat().st_mode & 0o077 == 0
+
+    assert not socket_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_daemon_refuses_to_start_if_another_one_is_running(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    async with _RunningDaemon(_mock_api(), socket_path):
+        second_daemon = VPNDaemon(_mock_api(), socket_path=str(socket_path))
+        with pytest.raises(DaemonAlreadyRunningError):
+            await second_daemon.start()
+
+        # The running daemon is still reachable.
+        async with VPNDaemonClient(str(socket_path)) as client:
+            assert await client.ping()
+
+
+@pytest.mark.asyncio
+async def test_daemon_replaces_socket_left_behind_by_a_daemon_that_did_not_stop_cleanly(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(str(socket_path))
+    stale_socket.close()
+
+    async with _RunningDaemon(_mock_api(), socket_path), \
+            VPNDaemonClient(str(socket_path)) as client:
+        assert await client.ping()
+
+
+@pytest.mark.asyncio
+async def test_daemon_refuses_to_start_if_the_socket_path_is_not_a_socket(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    socket_path.write_text("Not a socket.")
+
+    daemon = VPNDaemon(_mock_api(), socket_path=str(socket_path))
+    with pytest.raises(DaemonError):
+        await daemon.start()
+
+    assert socket_path.read_text() == "Not a socket."
+
+
+@pytest.mark.asyncio
+async def test_state_callbacks_can_do_requests_to_the_daemon(tmp_path):
+    socket_path = tmp_path / "daemon.sock"
+    statuses = asyncio.Queue()
+    async with _RunningDaemon(_mock_api(), socket_path) as daemon, \
+            VPNDaemonClient(str(socket_path)) as client:
+        async def on_state_changed(_state):
+            statuses.put_nowait(await client.status())
+
+        await client.subscribe(on_state_changed)
+        daemon.status_update(states.Connecting())
+        status = await asyncio.wait_for(statuses.get(), timeout=1)
+
+    assert status["logged_in"] is True
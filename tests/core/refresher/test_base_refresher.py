@@ -0,0 +1,101 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import Mock, AsyncMock
+
+import pytest
+from proton.session.exceptions import ProtonAPIError, ProtonAPINotReachable
+
+from proton.vpn.core.refresher.base_refresher import BaseRefresher
+from proton.vpn.core.refresher.scheduler import RunAgain
+from proton.vpn.session.exceptions import BackgroundRequestPreemptedError
+
+
+class DummyRefresher(BaseRefresher):
+    NAME = "dummy"
+
+    def __init__(self, session_holder, max_retry_delay=3600):
+        super().__init__(session_holder)
+        self.refresh_mock = AsyncMock(return_value=60)
+        self._max_retry_delay = max_retry_delay
+
+    @property
+    def initial_refresh_delay(self):
+        return 0
+
+    @property
+    def max_retry_delay(self):
+        return self._max_retry_delay
+
+    async def _refresh(self, force):
+        return await self.refresh_mock(force)
+
+
+@pytest.mark.asyncio
+async def test_refresh_backs_off_exponentially_on_transient_api_errors_and_caps_delay():
+    refresher = DummyRefresher(session_holder=Mock(), max_retry_delay=3)
+    refresher.refresh_mock.side_effect = ProtonAPINotReachable("Not reachable")
+
+    delays = [(await refresher.refresh()).delay_in_ms / 1000 for _ in range(4)]
+
+    assert delays[0] <= delays[1] <= delays[2]
+    assert delays[-1] == 3
+
+
+@pytest.mark.asyncio
+async def test_refresh_waits_at_least_as_long_as_requested_by_retry_after_header():
+    refresher = DummyRefresher(session_holder=Mock(), max_retry_delay=10)
+    refresher.refresh_mock.side_effect = ProtonAPIError(
+        429, {"Retry-After": "300"}, {"Code": 429, "Error": "Too many requests"}
+    )
+
+    run_again = await refresher.refresh()
+
+    assert 299 <= run_again.delay_in_ms / 1000 <= 300
+
+
+@pytest.mark.asyncio
+async def test_refresh_resets_backoff_after_a_successful_refresh():
+    refresher = DummyRefresher(session_holder=Mock())
+    refresher.refresh_mock.side_effect = [ProtonAPINotReachable("Not reachable"), 60]
+    await refresher.refresh()
+
+    run_again = await refresher.refresh()
+
+    assert run_again == RunAgain.after_seconds(60)
+    assert refresher._retry_policy.failed_attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_raises_unexpected_errors():
+    refresher = DummyRefresher(session_holder=Mock())
+    refresher.refresh_mock.side_effect = RuntimeError("Unexpected")
+
+    with pytest.raises(RuntimeError):
+        await refresher.refresh()
+
+
+@pytest.mark.asyncio
+async def test_preempted_refresh_is_rescheduled_without_counting_as_failed_attempt():
+    refresher = DummyRefresher(session_holder=Mock())
+    refresher.refresh_mock.side_effect = BackgroundRequestPreemptedError()
+
+    run_again = await refresher.refresh()
+
+    assert run_again == RunAgain.after_seconds(DummyRefresher.PREEMPTED_REFRESH_DELAY)
+    assert refresher._retry_policy.failed_attempts == 0
@@ -41,3 +41,22 @@ async def test_refresh_fetches_feature_flags_and_returns_next_refresh_delay():
     session.fetch_feature_flags.assert_called_once()
 
     assert next_refresh_delay == RunAgain.after_seconds(new_feature_flags.seconds_until_expiration)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flags_differ", [True, False])
+async def test_refresh_notifies_data_updated_only_when_feature_flags_changed(flags_differ):
+    session_holder = Mock()
+    session = session_holder.session
+
+    refresher = FeatureFlagsRefresher(session_holder=session_holder)
+    refresher.data_updated_callback = Mock()
+
+    new_feature_flags = Mock()
+    new_feature_flags.seconds_until_expiration = 60
+    new_feature_flags.differs_from.return_value = flags_differ
+    session.fetch_feature_flags = AsyncMock(return_value=new_feature_flags)
+
+    await refresher.refresh()
+
+    assert refresher.data_updated_callback.called is flags_differ
@@ -16,12 +16,16 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
-from unittest.mock import Mock, AsyncMock
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
 
 import pytest
 
 from proton.vpn.core.refresher.scheduler import RunAgain
-from proton.vpn.core.refresher.server_list_refresher import ServerListRefresher
+from proton.vpn.core.refresher.server_list_refresher import (
+    ServerListRefresher, AdaptiveLoadsRefreshInterval, RefreshDemand
+)
+from proton.vpn.session.request_priority import RequestLanes, RequestPriority
 
 
 @pytest.mark.asyncio
@@ -64,6 +68,7 @@ async def test_refresh_updates_server_loads_if_expired_and_returns_next_refresh_
 
     updated_server_list = Mock()
     updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = None
     session.update_server_loads = AsyncMock()
     session.update_server_loads.return_value = updated_server_list
 
@@ -85,6 +90,50 @@ async def test_refresh_updates_server_loads_if_expired_and_returns_next_refresh_
     assert next_refresh_delay == RunAgain.after_seconds(updated_server_list.seconds_until_expiration)
 
 
+@pytest.mark.asyncio
+@patch("proton.vpn.core.refresher.server_list_refresher.QuickConnectCandidates")
+async def test_refresh_recomputes_quick_connect_candidates_after_server_loads_update(
+        quick_connect_candidates_class
+):
+    session_holder = Mock()
+    session = session_holder.session
+    session.server_list.expired = False
+    session.server_list.loads_expired = True
+
+    updated_server_list = Mock()
+    updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = None
+    session.update_server_loads = AsyncMock(return_value=updated_server_list)
+
+    refresher = ServerListRefresher(session_holder=session_holder)
+    await refresher.refresh()
+
+    # Candidates are computed as soon as the loads are updated...
+    quick_connect_candidates_class.assert_called_once_with(
+        updated_server_list, session.client_config
+    )
+    # and reused while they were computed for the current server list.
+    quick_connect_candidates_class.return_value.is_computed_for.return_value = True
+    assert refresher.get_quick_connect_candidates() is quick_connect_candidates_class.return_value
+    quick_connect_candidates_class.return_value.is_computed_for.assert_called_once_with(
+        session.server_list, session.client_config
+    )
+    quick_connect_candidates_class.assert_called_once()
+
+
+@patch("proton.vpn.core.refresher.server_list_refresher.QuickConnectCandidates")
+def test_get_quick_connect_candidates_returns_none_when_server_list_is_not_available(
+        quick_connect_candidates_class
+):
+    session_holder = Mock()
+    session_holder.session.server_list = None
+
+    refresher = ServerListRefresher(session_holder=session_holder)
+
+    assert refresher.get_quick_connect_candidates() is None
+    quick_connect_candidates_class.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_refresh_schedules_next_refresh_if_server_list_is_not_expired():
     session_holder = Mock()
@@ -107,3 +156,155 @@ async def test_refresh_schedules_next_refresh_if_server_list_is_not_expired():
     # And the next refresh should've been scheduled when the current
     # server list expires.
     assert next_refresh_delay == RunAgain.after_seconds(session.server_list.seconds_until_expiration)
+
+
+@pytest.mark.asyncio
+async def test_refresh_adapts_loads_refresh_interval_to_the_observed_loads_churn():
+    session_holder = Mock()
+    session = session_holder.session
+
+    session.server_list.expired = False
+    session.server_list.loads_expired = True
+
+    updated_server_list = Mock()
+    updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = 0.5
+    session.update_server_loads = AsyncMock()
+    session.update_server_loads.return_value = updated_server_list
+
+    loads_refresh_interval = AdaptiveLoadsRefreshInterval(
+        min_interval=60, max_interval=3600, initial_interval=900, step_factor=1.5
+    )
+    refresher = ServerListRefresher(
+        session_holder=session_holder, loads_refresh_interval=loads_refresh_interval
+    )
+
+    await refresher.refresh()
+
+    # High churn should shorten the loads refresh interval.
+    updated_server_list.set_loads_refresh_interval.assert_called_once_with(600)
+
+
+@pytest.mark.parametrize("churn, expected_interval", [
+    (None, 900),    # Unknown churn keeps the current interval.
+    (0.0, 1350),    # Quiet period: back off.
+    (0.1, 900),     # Moderate churn keeps the current interval.
+    (0.3, 600),     # High churn: refresh faster.
+])
+def test_adaptive_loads_refresh_interval_update(churn, expected_interval):
+    interval = AdaptiveLoadsRefreshInterval(
+        min_interval=60, max_interval=3600, initial_interval=900, step_factor=1.5
+    )
+
+    assert interval.update(churn) == expected_interval
+    assert interval.interval == expected_interval
+
+
+@pytest.mark.parametrize("churn, expected_interval", [
+    (0.0, 1000),
+    (1.0, 500),
+])
+def test_adaptive_loads_refresh_interval_is_kept_within_bounds(churn, expected_interval):
+    interval = AdaptiveLoadsRefreshInterval(
+        min_interval=500, max_interval=1000, initial_interval=900, step_factor=2
+    )
+
+    for _ in range(10):
+        interval.update(churn)
+
+    assert interval.interval == expected_interval
+
+
+@pytest.mark.asyncio
+async def test_refresh_updates_server_loads_eagerly_when_a_connection_is_imminent():
+    session_holder = Mock()
+    session = session_holder.session
+
+    # Neither the server list nor the loads are expired...
+    session.server_list.expired = False
+    session.server_list.loads_expired = False
+    session.server_list.seconds_until_expiration = 60
+    updated_server_list = Mock()
+    updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = None
+    session.update_server_loads = AsyncMock()
+    session.update_server_loads.return_value = updated_server_list
+
+    refresher = ServerListRefresher(session_holder=session_holder)
+    # but the frontend declared that a connection is imminent.
+    refresher.demand = RefreshDemand.CONNECT_IMMINENT
+
+    await refresher.refresh()
+    session.update_server_loads.assert_called_once()
+
+    # Loads are not refreshed again if they were just refreshed.
+    await refresher.refresh()
+    session.update_server_loads.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("demand, preempted", [
+    (RefreshDemand.UI_VISIBLE, True),
+    (RefreshDemand.CONNECT_IMMINENT, False),
+])
+async def test_loads_refresh_is_only_preempted_on_connection_if_not_triggered_by_it(
+        demand, preempted
+):
+    session_holder = Mock()
+    session = session_holder.session
+    session.server_list.expired = False
+    session.server_list.loads_expired = True
+    updated_server_list = Mock()
+    updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = None
+    request_lanes = RequestLanes()
+    request_sent = asyncio.Event()
+
+    async def send_loads_request():
+        request_sent.set()
+        await asyncio.sleep(0.1)
+        return updated_server_list
+
+    async def update_server_loads():
+        return await request_lanes.run(RequestPriority.from_context(), send_loads_request)
+
+    session.update_server_loads = update_server_loads
+    refresher = ServerListRefresher(session_holder=session_holder)
+    refresher.demand = demand
+
+    refresh = asyncio.create_task(refresher.refresh())
+    await request_sent.wait()
+    # The user connects while the loads are being refreshed.
+    request_lanes.preempt_background_requests()
+    run_again = await refresh
+
+    if preempted:
+        assert run_again == RunAgain.after_seconds(ServerListRefresher.PREEMPTED_REFRESH_DELAY)
+    else:
+        assert run_again == RunAgain.after_seconds(60)
+
+
+@pytest.mark.asyncio
+async def test_refresh_schedules_lazy_loads_refresh_when_idle():
+    session_holder = Mock()
+    session = session_holder.session
+
+    session.server_list.expired = False
+    session.server_list.loads_expired = True
+    updated_server_list = Mock()
+    updated_server_list.seconds_until_expiration = 60
+    updated_server_list.loads_churn = None
+    session.update_server_loads = AsyncMock()
+    session.update_server_loads.return_value = updated_server_list
+
+    loads_refresh_interval = AdaptiveLoadsRefreshInterval(initial_interval=900)
+    refresher = ServerListRefresher(
+        session_holder=session_holder, loads_refresh_interval=loads_refresh_interval
+    )
+    refresher.demand = RefreshDemand.IDLE
+
+    await refresher.refresh()
+
+    updated_server_list.set_loads_refresh_interval.assert_called_once_with(
+        900 * ServerListRefresher.IDLE_INTERVAL_FACTOR
+    )
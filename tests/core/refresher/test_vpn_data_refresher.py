@@ -20,21 +20,35 @@ from unittest.mock import Mock, AsyncMock, call
 
 import pytest
 
-from proton.vpn.core.refresher import VPNDataRefresher
+from proton.vpn.core.refresher import VPNDataRefresher, RefreshDemand
+from proton.vpn.core.refresher.base_refresher import BaseRefresher, sort_by_dependencies
+
+
+def _mock_refresher(name, depends_on=()):
+    refresher = Mock()
+    refresher.NAME = name
+    refresher.DEPENDS_ON = depends_on
+    refresher.initial_refresh_delay = 0
+    return refresher
+
+
+def _mock_refreshers():
+    return {
+        "client_config_refresher": _mock_refresher("client config"),
+        "server_list_refresher": _mock_refresher("server list", depends_on=("feature flags",)),
+        "certificate_refresher": _mock_refresher("certificate"),
+        "feature_flags_refresher": _mock_refresher("feature flags"),
+    }
 
 
 @pytest.mark.asyncio
 async def test_enable_schedules_all_refreshers_if_the_vpn_session_is_already_loaded():
     session_holder = Mock()
     scheduler = Mock()
-    client_config_refresher = Mock()
-    client_config_refresher.initial_refresh_delay = 0
-    server_list_refresher = Mock()
-    server_list_refresher.initial_refresh_delay = 0
-    certificate_refresher = Mock()
-    certificate_refresher.initial_refresh_delay = 0
-    feature_flag_refresher = Mock()
-    feature_flag_refresher.initial_refresh_delay = 0
+    client_config_refresher = _mock_refresher("client config")
+    server_list_refresher = _mock_refresher("server list", depends_on=("feature flags",))
+    certificate_refresher = _mock_refresher("certificate")
+    feature_flag_refresher = _mock_refresher("feature flags")
     refresher = VPNDataRefresher(
         session_holder=session_holder,
         scheduler=scheduler,
@@ -50,9 +64,9 @@ async def test_enable_schedules_all_refreshers_if_the_vpn_session_is_already_loa
 
     assert scheduler.mock_calls == [
         call.run_after(client_config_refresher.initial_refresh_delay, client_config_refresher.refresh),
+        call.run_after(feature_flag_refresher.initial_refresh_delay, feature_flag_refresher.refresh),
         call.run_after(server_list_refresher.initial_refresh_delay, server_list_refresher.refresh),
         call.run_after(certificate_refresher.initial_refresh_delay, certificate_refresher.refresh),
-        call.run_after(feature_flag_refresher.initial_refresh_delay, feature_flag_refresher.refresh),
         call.start()
     ]
 
@@ -60,14 +74,10 @@ async def test_enable_schedules_all_refreshers_if_the_vpn_session_is_already_loa
 async def test_enable_fetches_vpn_session_when_not_loaded_and_then_schedules_refreshers():
     session_holder = Mock()
     scheduler = Mock()
-    client_config_refresher = Mock()
-    client_config_refresher.initial_refresh_delay = 0
-    server_list_refresher = Mock()
-    server_list_refresher.initial_refresh_delay = 0
-    certificate_refresher = Mock()
-    certificate_refresher.initial_refresh_delay = 0
-    feature_flag_refresher = Mock()
-    feature_flag_refresher.initial_refresh_delay = 0
+    client_config_refresher = _mock_refresher("client config")
+    server_list_refresher = _mock_refresher("server list", depends_on=("feature flags",))
+    certificate_refresher = _mock_refresher("certificate")
+    feature_flag_refresher = _mock_refresher("feature flags")
 
     mock_manager = Mock()
     mock_manager.session_holder = session_holder
@@ -94,8 +104,113 @@ async def test_enable_fetches_vpn_session_when_not_loaded_and_then_schedules_ref
     assert mock_manager.mock_calls == [
         call.session_holder.session.fetch_session_data(),
         call.scheduler.run_after(client_config_refresher.initial_refresh_delay, client_config_refresher.refresh),
+        call.scheduler.run_after(feature_flag_refresher.initial_refresh_delay, feature_flag_refresher.refresh),
         call.scheduler.run_after(server_list_refresher.initial_refresh_delay, server_list_refresher.refresh),
         call.scheduler.run_after(certificate_refresher.initial_refresh_delay, certificate_refresher.refresh),
-        call.scheduler.run_after(feature_flag_refresher.initial_refresh_delay, feature_flag_refresher.refresh),
         call.scheduler.start()
     ]
+
+
+@pytest.mark.asyncio
+async def test_set_refresh_demand_reschedules_server_list_refresh_straight_away_when_demand_increases():
+    session_holder = Mock()
+    scheduler = Mock()
+    refreshers = _mock_refreshers()
+    server_list_refresher = refreshers["server_list_refresher"]
+    server_list_refresher.demand = RefreshDemand.IDLE
+    refresher = VPNDataRefresher(
+        session_holder=session_holder,
+        scheduler=scheduler,
+        **refreshers
+    )
+    session_holder.session.loaded = True
+    await refresher.enable()
+    server_list_task_id = scheduler.run_after.return_value
+    scheduler.reset_mock()
+
+    refresher.set_refresh_demand(RefreshDemand.CONNECT_IMMINENT)
+
+    assert server_list_refresher.demand == RefreshDemand.CONNECT_IMMINENT
+    assert scheduler.mock_calls == [
+        call.cancel_task(server_list_task_id),
+        call.run_soon(server_list_refresher.refresh),
+        call.run_tasks_ready_to_fire()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_set_refresh_demand_does_not_reschedule_server_list_refresh_when_demand_decreases():
+    session_holder = Mock()
+    scheduler = Mock()
+    refreshers = _mock_refreshers()
+    server_list_refresher = refreshers["server_list_refresher"]
+    server_list_refresher.demand = RefreshDemand.UI_VISIBLE
+    refresher = VPNDataRefresher(
+        session_holder=session_holder,
+        scheduler=scheduler,
+        **refreshers
+    )
+    session_holder.session.loaded = True
+    await refresher.enable()
+    scheduler.reset_mock()
+
+    refresher.set_refresh_demand(RefreshDemand.IDLE)
+
+    assert server_list_refresher.demand == RefreshDemand.IDLE
+    scheduler.cancel_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refreshers_depending_on_updated_data_are_rescheduled_straight_away():
+    session_holder = Mock()
+    scheduler = Mock()
+    refreshers = _mock_refreshers()
+    refresher = VPNDataRefresher(
+        session_holder=session_holder,
+        scheduler=scheduler,
+        **refreshers
+    )
+    session_holder.session.loaded = True
+    await refresher.enable()
+    scheduler.reset_mock()
+
+    feature_flags_refresher = refreshers["feature_flags_refresher"]
+    server_list_refresher = refreshers["server_list_refresher"]
+    feature_flags_refresher.data_updated_callback(feature_flags_refresher)
+
+    server_list_refresher.on_dependency_updated.assert_called_once_with("feature flags")
+    assert scheduler.mock_calls == [
+        call.cancel_task(scheduler.run_after.return_value),
+        call.run_soon(server_list_refresher.refresh)
+    ]
+    refreshers["client_config_refresher"].on_dependency_updated.assert_not_called()
+    refreshers["certificate_refresher"].on_dependency_updated.assert_not_called()
+
+
+def test_sort_by_dependencies_places_dependencies_first_and_otherwise_keeps_order():
+    a = _mock_refresher("a", depends_on=("c",))
+    b = _mock_refresher("b")
+    c = _mock_refresher("c")
+
+    assert sort_by_dependencies([a, b, c]) == [c, a, b]
+
+
+@pytest.mark.parametrize("refreshers", [
+    [_mock_refresher("a", depends_on=("b",)), _mock_refresher("b", depends_on=("a",))],
+    [_mock_refresher("a", depends_on=("unknown",))],
+])
+def test_sort_by_dependencies_raises_value_error_on_cycles_and_unknown_dependencies(refreshers):
+    with pytest.raises(ValueError):
+        sort_by_dependencies(refreshers)
+
+
+def test_base_refresher_requires_subclasses_to_define_a_name():
+    class NamelessRefresher(BaseRefresher):
+        initial_refresh_delay = 0
+        max_retry_delay = 0
+
+        async def _refresh(self, force):
+            return 0
+
+    with pytest.raises(TypeError):
+        NamelessRefresher(session_holder=Mock())
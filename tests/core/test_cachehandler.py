@@ -19,9 +19,11 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 import json
 import os
 import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
-from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn.core.cache_handler import CacheHandler, CachePath
 
 
 class TestCacheHandler:
@@ -64,3 +66,97 @@ class TestCacheHandler:
         cache_handler.remove()
 
         assert not os.path.isfile(cache_filepath)
+
+    def test_save_does_not_leave_temporary_files(self, dir_path, cache_filepath):
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.save({"save_cache": "dummy-data"})
+        cache_handler.save({"save_cache": "dummy-data"})
+
+        files = [name for name in os.listdir(dir_path.name) if not name.endswith(".lock")]
+        assert files == [os.path.basename(cache_filepath)]
+
+    def test_save_keeps_previous_cache_if_write_fails(self, cache_filepath):
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.save({"save_cache": "old-data"})
+
+        with patch("os.fsync", side_effect=OSError("Disk full")), pytest.raises(OSError):
+            cache_handler.save({"save_cache": "new-data"})
+
+        assert CacheHandler(cache_filepath).load() == {"save_cache": "old-data"}
+
+    def test_save_skips_write_when_data_did_not_change(self, cache_filepath):
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.save({"save_cache": "dummy-data"})
+
+        with patch("os.replace", wraps=os.replace) as replace_mock:
+            cache_handler.save({"save_cache": "dummy-data"})
+            replace_mock.assert_not_called()
+
+            cache_handler.save({"save_cache": "new-data"})
+            replace_mock.assert_called_once()
+
+    def test_save_skips_write_when_data_did_not_change_since_loaded(self, cache_filepath):
+        CacheHandler(cache_filepath).save({"save_cache": "dummy-data"})
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.load()
+
+        with patch("os.replace", wraps=os.replace) as replace_mock:
+            cache_handler.save({"save_cache": "dummy-data"})
+
+        replace_mock.assert_not_called()
+
+    def test_save_writes_again_after_cache_was_removed(self, cache_filepath):
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.save({"save_cache": "dummy-data"})
+        cache_handler.remove()
+
+        cache_handler.save({"save_cache": "dummy-data"})
+
+        assert os.path.isfile(cache_filepath)
+
+    def test_changed_on_disk_when_cache_is_written_by_another_handler(self, cache_filepath):
+        cache_handler = CacheHandler(cache_filepath)
+        assert not cache_handler.changed_on_disk
+        cache_handler.save({"save_cache": "dummy-data"})
+        assert not cache_handler.changed_on_disk
+
+        CacheHandler(cache_filepath).save({"save_cache": "new-data"})
+
+        assert cache_handler.changed_on_disk
+        cache_handler.load()
+        assert not cache_handler.changed_on_disk
+
+    def test_save_writes_data_unchanged_locally_if_cache_was_written_by_another_handler(
+            self, cache_filepath
+    ):
+        cache_handler = CacheHandler(cache_filepath)
+        cache_handler.save({"save_cache": "dummy-data"})
+        CacheHandler(cache_filepath).save({"save_cache": "new-data"})
+
+        cache_handler.save({"save_cache": "dummy-data"})
+
+        assert CacheHandler(cache_filepath).load() == {"save_cache": "dummy-data"}
+
+    @pytest.mark.asyncio
+    async def test_refresh_lock_is_only_acquired_by_one_handler_at_a_time(self, cache_filepath):
+        async with CacheHandler(cache_filepath).refresh_lock() as acquired:
+            assert acquired
+            async with CacheHandler(cache_filepath).refresh_lock(timeout=0.2) as acquired:
+                assert not acquired
+
+        async with CacheHandler(cache_filepath).refresh_lock(timeout=0.2) as acquired:
+            assert acquired
+
+
+@patch("proton.vpn.core.cache_handler.VPNExecutionEnvironment")
+def test_cache_path_is_only_resolved_when_first_accessed(vpn_execution_environment_mock):
+    vpn_execution_environment_mock.return_value.path_cache = "/cache"
+
+    class Fetcher:
+        CACHE_PATH = CachePath("fetcher.json")
+
+    vpn_execution_environment_mock.assert_not_called()
+
+    assert Fetcher.CACHE_PATH == Path("/cache/fetcher.json")
+    assert Fetcher().CACHE_PATH == Path("/cache/fetcher.json")
+    vpn_execution_environment_mock.assert_called_once()
@@ -19,9 +19,12 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 from proton.vpn.core.refresher import VPNDataRefresher
 from proton.vpn.session.servers import LogicalServer
 from proton.vpn.session.client_config import ClientConfig
-from proton.vpn.core.connection import VPNConnector
+from proton.vpn.core.connection import Subscriber, VPNConnector, VPNStateSubscriber
 from proton.vpn.connection import events, exceptions, states
-from unittest.mock import Mock, AsyncMock
+from proton.vpn.connection.enum import ConnectionStateEnum, KillSwitchSetting
+from proton.vpn.killswitch.interface import CachingKillSwitch
+from unittest.mock import Mock, AsyncMock, patch
+import asyncio
 import pytest
 
 
@@ -250,3 +253,300 @@ async def test_connector_updates_connection_credentials_when_certificate_is_refr
 
     if update_credentials_expected:
         current_state.context.connection.update_credentials.assert_called_once_with(session_holder.vpn_credentials)
+
+
+def _create_connector_recording_handled_events():
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        state=states.Connected(),
+    )
+    handled_events = []
+    first_event_handled = asyncio.Event()
+    resume_event_handling = asyncio.Event()
+
+    async def handle_on_event(event):
+        handled_events.append(event)
+        first_event_handled.set()
+        await resume_event_handling.wait()
+
+    connector._handle_on_event = handle_on_event
+    return connector, handled_events, first_event_handled, resume_event_handling
+
+
+@pytest.mark.asyncio
+async def test__on_connection_event_supersedes_pending_up_events_with_the_latest_one():
+    connector, handled_events, first_event_handled, resume_event_handling = \
+        _create_connector_recording_handled_events()
+
+    down_event = events.Down(events.EventContext(connection=Mock()))
+    up_events = [events.Up(events.EventContext(connection=Mock())) for _ in range(3)]
+
+    down_task = asyncio.create_task(connector._on_connection_event(down_event))
+    await first_event_handled.wait()
+    up_tasks = []
+    for up_event in up_events:
+        up_tasks.append(asyncio.create_task(connector._on_connection_event(up_event)))
+        await asyncio.sleep(0)
+
+    resume_event_handling.set()
+    await asyncio.wait_for(asyncio.gather(down_task, *up_tasks), timeout=1)
+
+    assert handled_events == [down_event, up_events[-1]]
+    for superseded_event in up_events[:-1]:
+        superseded_event.context.connection.unregister.assert_called_once_with(
+            connector._on_connection_event
+        )
+    up_events[-1].context.connection.unregister.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test__on_connection_event_waits_for_space_when_the_event_queue_is_full():
+    connector, handled_events, first_event_handled, resume_event_handling = \
+        _create_connector_recording_handled_events()
+    connector._pending_event_slots = asyncio.Semaphore(1)
+
+    first_task = asyncio.create_task(connector._on_connection_event(events.Down()))
+    await first_event_handled.wait()
+    queued_task = asyncio.create_task(connector._on_connection_event(events.Connected()))
+    await asyncio.sleep(0)
+    waiting_task = asyncio.create_task(connector._on_connection_event(events.Disconnected()))
+    await asyncio.sleep(0)
+
+    assert len(connector._pending_events) == 1
+
+    resume_event_handling.set()
+    await asyncio.wait_for(asyncio.gather(first_task, queued_task, waiting_task), timeout=1)
+
+    assert [type(event) for event in handled_events] == [
+        events.Down, events.Connected, events.Disconnected
+    ]
+
+
+@pytest.mark.asyncio
+async def test_connector_records_connection_timeline_until_connection_settles():
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        state=states.Disconnected(),
+    )
+    connection = Mock()
+    connecting_state = Mock(spec=states.Connecting, context=states.StateContext())
+    connecting_state.run_tasks = AsyncMock(return_value=events.Connected(
+        events.EventContext(connection=connection)
+    ))
+    connected_state = Mock(spec=states.Connected, context=states.StateContext())
+    connected_state.run_tasks = AsyncMock(return_value=None)
+    connecting_state.on_event.return_value = connected_state
+    connector._current_state.on_event = Mock(return_value=connecting_state)
+
+    await connector._on_connection_event(events.Up(events.EventContext(connection=connection)))
+
+    timeline = connector.timeline
+    assert timeline.finished
+    assert [entry.name for entry in timeline.entries] == [
+        type(connecting_state).__name__, type(connected_state).__name__
+    ]
+    assert connecting_state.context.timeline is timeline
+    assert connected_state.context.timeline is timeline
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kill_switch_setting, kill_switch_engaged", [
+    (KillSwitchSetting.OFF, False),
+    (KillSwitchSetting.ON, True),
+    (KillSwitchSetting.PERMANENT, True),
+])
+async def test_apply_kill_switch_setting_keeps_track_of_whether_the_kill_switch_is_engaged(
+        kill_switch_setting, kill_switch_engaged
+):
+    current_state = states.Connected(states.StateContext(
+        connection=Mock(), kill_switch_engaged=not kill_switch_engaged
+    ))
+    current_state.context.kill_switch = AsyncMock()
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        state=current_state,
+    )
+
+    await connector._apply_kill_switch_setting(kill_switch_setting)
+
+    assert current_state.context.kill_switch_engaged is kill_switch_engaged
+
+
+def test_set_ks_impl_keeps_the_caching_kill_switch_while_the_backend_does_not_change():
+    kill_switch = Mock()
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=None,
+        kill_switch=kill_switch,
+    )
+
+    with patch("proton.vpn.core.connection.KillSwitch.get"):
+        connector._set_ks_impl(Mock())
+        caching_kill_switch = states.StateContext.kill_switch
+        connector._set_ks_impl(Mock())
+
+    assert isinstance(caching_kill_switch, CachingKillSwitch)
+    assert caching_kill_switch.backend is kill_switch
+    assert states.StateContext.kill_switch is caching_kill_switch
+
+
+@pytest.mark.asyncio
+async def test_disconnect_invalidates_the_cached_kill_switch_state():
+    # Another process may have changed the kill switch in the meantime.
+    kill_switch = Mock(spec=CachingKillSwitch)
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        state=states.Connected(states.StateContext(connection=Mock())),
+    )
+    connector._on_connection_event = AsyncMock()
+
+    with patch.object(states.StateContext, "kill_switch", kill_switch):
+        await connector.disconnect()
+
+    kill_switch.invalidate.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_state_updates_are_only_queued_for_subscribers_opting_in():
+    connector = VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        state=states.Disconnected(),
+    )
+    subscriber = Mock(spec=VPNStateSubscriber)
+    queued_subscriber = Mock(spec=VPNStateSubscriber)
+    connector.register(subscriber)
+    connector.register(queued_subscriber, queued=True)
+
+    connector._publisher.notify(states.Connecting())
+
+    assert subscriber.status_update.call_count == 1
+    queued_subscriber.status_update.assert_not_called()
+    await connector._publisher.wait_for_deliveries()
+    assert queued_subscriber.status_update.call_count == 1
+
+
+def _create_connector_in_disconnected_state():
+    return VPNConnector(
+        session_holder=None,
+        settings_persistence=None,
+        usage_reporting=Mock(),
+        publisher=Mock(),
+        state=states.Disconnected(),
+    )
+
+
+def _create_state(state_type):
+    state = Mock(spec=state_type, type=state_type.type, context=states.StateContext())
+    state.run_tasks = AsyncMock(return_value=None)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_wait_for_returns_straight_away_if_the_state_is_the_current_one():
+    connector = _create_connector_in_disconnected_state()
+
+    state = await connector.wait_for(ConnectionStateEnum.DISCONNECTED, timeout=0)
+
+    assert state is connector.current_state
+
+
+@pytest.mark.asyncio
+async def test_wait_for_returns_as_soon_as_the_state_is_reached():
+    connector = _create_connector_in_disconnected_state()
+    connected_state = _create_state(states.Connected)
+
+    waiter = asyncio.create_task(connector.wait_for(ConnectionStateEnum.CONNECTED, timeout=1))
+    await asyncio.sleep(0)
+    await connector._update_state(_create_state(states.Connecting))
+    assert not waiter.done()
+    await connector._update_state(connected_state)
+
+    assert await waiter is connected_state
+
+
+@pytest.mark.asyncio
+async def test_wait_for_waits_for_the_tasks_of_the_current_state_to_be_done():
+    connector = _create_connector_in_disconnected_state()
+    connected_state = _create_state(states.Connected)
+    run_tasks_started = asyncio.Event()
+    finish_run_tasks = asyncio.Event()
+
+    async def run_tasks():
+        run_tasks_started.set()
+        await finish_run_tasks.wait()
+
+    connected_state.run_tasks = run_tasks
+    update_state_task = asyncio.create_task(connector._update_state(connected_state))
+    await run_tasks_started.wait()
+
+    waiter = asyncio.create_task(connector.wait_for(ConnectionStateEnum.CONNECTED, timeout=1))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    finish_run_tasks.set()
+    await update_state_task
+    assert await waiter is connected_state
+
+
+@pytest.mark.asyncio
+async def test_wait_for_raises_timeout_error_if_the_state_is_not_reached_in_time():
+    connector = _create_connector_in_disconnected_state()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await connector.wait_for(ConnectionStateEnum.CONNECTED, timeout=0.01)
+
+    assert not connector._state_waiters[ConnectionStateEnum.CONNECTED]
+
+
+@pytest.mark.asyncio
+async def test_states_streams_every_state_reached_until_closed():
+    connector = _create_connector_in_disconnected_state()
+    new_states = [_create_state(states.Connecting), _create_state(states.Connected)]
+
+    async with connector.states() as state_stream:
+        for new_state in new_states:
+            await connector._update_state(new_state)
+
+        assert await state_stream.__anext__() is new_states[0]
+        assert await state_stream.__anext__() is new_states[1]
+
+    assert [state async for state in state_stream] == []
+    assert not list(connector._state_streams)
+
+
+def test_subscriber_wait_for_state_returns_straight_away_if_the_state_was_already_reached():
+    subscriber = Subscriber()
+
+    subscriber.status_update(states.Connected())
+
+    subscriber.wait_for_state(ConnectionStateEnum.CONNECTED, timeout=0)
+    with pytest.raises(TimeoutError):
+        subscriber.wait_for_state(ConnectionStateEnum.DISCONNECTED, timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_update_state_records_the_transition_in_the_history():
+    connector = _create_connector_in_disconnected_state()
+    connection = Mock(server_id="server-1")
+    error_event = events.Timeout(events.EventContext(connection=connection, error=RuntimeError()))
+    error_state = _create_state(states.Error)
+    error_state.context = states.StateContext(event=error_event, connection=connection)
+
+    await connector._update_state(error_state)
+
+    transition = connector.transition_history.get_transitions()[-1]
+    assert transition["state"] == "ERROR"
+    assert transition["event"] == "Timeout"
+    assert transition["server_id"] == "server-1"
+    assert transition["error"] == "RuntimeError"
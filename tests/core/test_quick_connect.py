@@ -0,0 +1,134 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import pytest
+
+from proton.vpn.core.quick_connect import QuickConnectCandidates, build_vpn_server
+from proton.vpn.core.testing.fleet import generate_fleet
+from proton.vpn.session.client_config import ClientConfig
+from proton.vpn.session.exceptions import ServerNotFoundError
+from proton.vpn.session.servers.logicals import ServerList, PersistenceKeys
+from proton.vpn.session.servers.types import ServerFeatureEnum
+
+
+def _server_list(size=500, user_tier=2):
+    return ServerList.from_dict({
+        "LogicalServers": generate_fleet(size, seed=size), PersistenceKeys.USER_TIER.value: user_tier
+    })
+
+
+def _expected_ranking(server_list, matches):
+    return [
+        server.id for server in sorted(server_list, key=lambda server: server.score)
+        if server.enabled and server.tier <= server_list.user_tier and matches(server)
+    ]
+
+
+def test_fastest_candidate_matches_server_list_fastest_server():
+    server_list = _server_list()
+    candidates = QuickConnectCandidates(server_list, ClientConfig.default())
+
+    assert candidates.get_fastest().logical_server.id == server_list.get_fastest().id
+    assert candidates.get_fastest("ch").logical_server.id == \
+        server_list.get_fastest_in_country("CH").id
+
+
+def test_candidates_are_ranked_by_score_for_each_intent():
+    server_list = _server_list()
+    candidates = QuickConnectCandidates(server_list, ClientConfig.default(), candidates_per_intent=5)
+
+    def not_secure_core_nor_tor(server):
+        return ServerFeatureEnum.SECURE_CORE not in server.features \
+            and ServerFeatureEnum.TOR not in server.features
+
+    expected_rankings = {
+        (None, None): _expected_ranking(server_list, not_secure_core_nor_tor),
+        ("DE", None): _expected_ranking(
+            server_list,
+            lambda server: server.exit_country == "DE" and not_secure_core_nor_tor(server)
+        ),
+        (None, ServerFeatureEnum.P2P): _expected_ranking(
+            server_list,
+            lambda server: ServerFeatureEnum.P2P in server.features
+            and not_secure_core_nor_tor(server)
+        ),
+        (None, ServerFeatureEnum.SECURE_CORE): _expected_ranking(
+            server_list,
+            lambda server: ServerFeatureEnum.SECURE_CORE in server.features
+            and ServerFeatureEnum.TOR not in server.features
+        ),
+    }
+    for (country_code, feature), expected_ranking in expected_rankings.items():
+        ranking = [
+            candidate.logical_server.id for candidate in candidates.get(country_code, feature)
+        ]
+        assert ranking == expected_ranking[:5]
+
+
+def test_candidates_only_include_servers_within_the_user_tier():
+    server_list = _server_list(user_tier=0)
+    candidates = QuickConnectCandidates(server_list, ClientConfig.default())
+
+    assert candidates.get()
+    assert all(candidate.logical_server.tier == 0 for candidate in candidates.get())
+    assert not candidates.get(feature=ServerFeatureEnum.SECURE_CORE)
+    with pytest.raises(ServerNotFoundError):
+        candidates.get_fastest(feature=ServerFeatureEnum.SECURE_CORE)
+
+
+def test_candidates_vpn_servers_are_ready_to_connect():
+    client_config = ClientConfig.default()
+    candidate = QuickConnectCandidates(_server_list(), client_config).get_fastest()
+
+    vpn_server = candidate.vpn_server
+    assert vpn_server.server_id == candidate.logical_server.id
+    assert vpn_server.server_name == candidate.logical_server.name
+    assert vpn_server.wireguard_ports.udp == client_config.wireguard_ports.udp
+    assert vpn_server.openvpn_ports.tcp == client_config.openvpn_ports.tcp
+    assert any(
+        physical_server.entry_ip == vpn_server.server_ip
+        for physical_server in candidate.logical_server.physical_servers
+    )
+
+
+def test_build_vpn_server_uses_the_specified_physical_server():
+    logical_server = _server_list().get_fastest()
+    physical_server = logical_server.physical_servers[-1]
+
+    vpn_server = build_vpn_server(logical_server, ClientConfig.default(), physical_server)
+
+    assert vpn_server.server_ip == physical_server.entry_ip
+    assert vpn_server.domain == physical_server.domain
+    assert vpn_server.label == physical_server.label
+
+
+def test_is_computed_for_checks_the_server_list_and_client_config_identity():
+    server_list = _server_list()
+    client_config = ClientConfig.default()
+    candidates = QuickConnectCandidates(server_list, client_config)
+
+    assert candidates.is_computed_for(server_list, client_config)
+    assert not candidates.is_computed_for(_server_list(), client_config)
+    assert not candidates.is_computed_for(server_list, ClientConfig.default())
+
+
+def test_get_candidates_by_country_and_feature_raises_value_error():
+    candidates = QuickConnectCandidates(_server_list(), ClientConfig.default())
+
+    with pytest.raises(ValueError):
+        candidates.get("CH", ServerFeatureEnum.P2P)
@@ -0,0 +1,136 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+
+import pytest
+
+from proton.vpn.core.snapshot_store import SnapshotStore
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return tmp_path / "snapshot.bin"
+
+
+def test_saved_entries_are_loaded_from_a_new_store(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("serverlist", {"LogicalServers": []})
+    store.save("features", {"toggles": []})
+
+    new_store = SnapshotStore(snapshot_path)
+
+    assert new_store.load("serverlist") == {"LogicalServers": []}
+    assert new_store.load("features") == {"toggles": []}
+    assert new_store.load("clientconfig") is None
+
+
+def test_snapshot_starts_with_table_of_contents(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("a", {"key": "value"})
+    store.save("b", [1, 2])
+
+    table_of_contents, payload = snapshot_path.read_bytes().split(b"\n", 1)
+    entries = json.loads(table_of_contents)["entries"]
+
+    offset, length = entries["b"]
+    assert json.loads(payload[offset:offset + length]) == [1, 2]
+
+
+def test_remove_entry(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("a", {"key": "value"})
+
+    store.remove("a")
+
+    assert not SnapshotStore(snapshot_path).contains("a")
+
+
+def test_batch_writes_snapshot_once_at_the_end(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+
+    with store.batch():
+        store.save("a", {"key": "value"})
+        store.save("b", {"key": "value"})
+        assert not snapshot_path.exists()
+
+    new_store = SnapshotStore(snapshot_path)
+    assert new_store.contains("a") and new_store.contains("b")
+
+
+def test_write_does_not_leave_temporary_files(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("a", {"key": "value"})
+    store.save("a", {"key": "new value"})
+
+    files = [name for name in os.listdir(snapshot_path.parent) if not name.endswith(".lock")]
+    assert files == [snapshot_path.name]
+
+
+def test_store_reads_snapshot_again_when_replaced_by_another_store(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("a", {"key": "value"})
+
+    SnapshotStore(snapshot_path).save("a", {"key": "new value"})
+
+    assert store.changed_on_disk
+    assert store.load("a") == {"key": "new value"}
+
+
+def test_batch_does_not_overwrite_entries_changed_by_another_store(snapshot_path):
+    store = SnapshotStore(snapshot_path)
+    store.save("a", {"key": "value"})
+    store.save("c", {"key": "value"})
+
+    with store.batch():
+        store.save("a", {"key": "new value"})
+        store.remove("c")
+        SnapshotStore(snapshot_path).save("b", {"key": "value"})
+
+    new_store = SnapshotStore(snapshot_path)
+    assert new_store.load("a") == {"key": "new value"}
+    assert new_store.load("b") == {"key": "value"}
+    assert not new_store.contains("c")
+
+
+@pytest.mark.parametrize("content", [
+    b"not a snapshot",
+    b'{"version": 1, "entries": {"a": [0, 100]}}\n{}',  # Truncated entry.
+    b'{"version": 999, "entries": {}}\n',
+])
+def test_invalid_snapshot_is_ignored(snapshot_path, content):
+    snapshot_path.write_bytes(content)
+
+    store = SnapshotStore(snapshot_path)
+
+    assert store.load("a") is None
+
+
+def test_entry_falls_back_to_legacy_cache_file_until_saved(tmp_path, snapshot_path):
+    legacy_path = tmp_path / "serverlist.json"
+    legacy_path.write_text(json.dumps({"legacy": True}))
+    entry = SnapshotStore(snapshot_path).entry("serverlist", legacy_filepath=legacy_path)
+
+    assert entry.exists
+    assert entry.load() == {"legacy": True}
+
+    entry.save({"legacy": False})
+
+    assert entry.load() == {"legacy": False}
+    assert not legacy_path.exists()
@@ -0,0 +1,55 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from proton.vpn.core.state_stream import StateStream
+
+
+@pytest.mark.asyncio
+async def test_state_stream_drops_the_oldest_states_when_the_buffer_is_full():
+    stream = StateStream(on_close=Mock(), max_buffered_states=2)
+
+    for state in ("first", "second", "third"):
+        stream.push(state)
+    stream.close()
+
+    assert [state async for state in stream] == ["second", "third"]
+    assert stream.dropped_states == 1
+
+
+@pytest.mark.asyncio
+async def test_state_stream_waits_for_new_states_until_closed():
+    on_close = Mock()
+    stream = StateStream(on_close=on_close)
+    next_state = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+    assert not next_state.done()
+
+    stream.push("connected")
+    assert await next_state == "connected"
+
+    next_state = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+    stream.close()
+    with pytest.raises(StopAsyncIteration):
+        await next_state
+    on_close.assert_called_once_with(stream)
@@ -0,0 +1,77 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import pytest
+
+from proton.vpn.connection import events
+from proton.vpn.connection.enum import ConnectionStateEnum
+from proton.vpn.core.transition_history import TransitionHistory
+
+
+def test_transition_history_keeps_only_the_most_recent_transitions():
+    history = TransitionHistory(capacity=2)
+
+    history.record(ConnectionStateEnum.CONNECTING, events.Up, "server-1", timestamp=1)
+    history.record(ConnectionStateEnum.CONNECTED, events.Connected, "server-1", timestamp=2)
+    history.record(
+        ConnectionStateEnum.ERROR, events.Timeout, "server-1",
+        error_type=RuntimeError, timestamp=3
+    )
+
+    assert len(history) == 2
+    assert history.get_transitions() == [
+        {
+            "timestamp": 2, "state": "CONNECTED", "event": "Connected",
+            "server_id": "server-1", "error": None
+        },
+        {
+            "timestamp": 3, "state": "ERROR", "event": "Timeout",
+            "server_id": "server-1", "error": "RuntimeError"
+        },
+    ]
+    assert [transition["state"] for transition in history.get_transitions(limit=1)] == ["ERROR"]
+
+
+def test_transition_history_reuses_preallocated_records():
+    history = TransitionHistory(capacity=3)
+    records = list(history._records)
+
+    for timestamp in range(10):
+        history.record(ConnectionStateEnum.CONNECTING, timestamp=timestamp)
+
+    assert history._records == records
+    assert [transition["timestamp"] for transition in history.get_transitions()] == [7, 8, 9]
+
+
+def test_transition_history_attachment_has_a_line_per_transition():
+    history = TransitionHistory()
+    history.record(ConnectionStateEnum.CONNECTING, events.Up, "server-1", timestamp=0)
+    history.record(ConnectionStateEnum.CONNECTED, events.Connected, "server-1", timestamp=1.5)
+
+    attachment = history.to_attachment()
+
+    assert attachment.name == "connection_history.txt"
+    assert attachment.read().decode("utf-8") == (
+        "1970-01-01T00:00:00.000+00:00 CONNECTING event=Up server_id=server-1\n"
+        "1970-01-01T00:00:01.500+00:00 CONNECTED event=Connected server_id=server-1\n"
+    )
+
+
+def test_transition_history_raises_value_error_on_invalid_capacity():
+    with pytest.raises(ValueError):
+        TransitionHistory(capacity=0)
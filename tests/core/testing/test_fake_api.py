@@ -0,0 +1,126 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from proton.session.exceptions import ProtonAPIError
+
+from proton.vpn.core.cache_handler import CacheHandler
+from proton.vpn.core.testing.fake_api import FakeAPIServer, LoopbackAPIClient
+from proton.vpn.core.testing.fleet import SECURE_CORE_COUNTRIES, generate_fleet
+from proton.vpn.session.rate_limiter import RateLimiter
+from proton.vpn.session.retry_policy import RetryPolicy
+from proton.vpn.session.servers.fetcher import ServerListFetcher
+from proton.vpn.session.servers.types import ServerFeatureEnum
+
+
+@pytest.fixture(autouse=True)
+def isolated_api_state():
+    # Avoid the shared API state to leak between tests.
+    with patch("proton.vpn.session.utils._api_retry_policy", RetryPolicy()), \
+            patch("proton.vpn.session.utils._api_rate_limiter", RateLimiter(
+                global_capacity=1000, route_capacity=1000
+            )):
+        yield
+
+
+def _session(client: LoopbackAPIClient):
+    session = Mock()
+    session.async_api_request = client.async_api_request
+    session.vpn_account.max_tier = 2
+    session.vpn_account.location.IP = "83.76.246.115"
+    session.feature_flags.get.return_value = True  # TimestampedLogicals
+    return session
+
+
+def test_generate_fleet_is_deterministic():
+    assert generate_fleet(20, seed=1) == generate_fleet(20, seed=1)
+    assert generate_fleet(20, seed=1) != generate_fleet(20, seed=2)
+
+
+def test_generate_fleet_mixes_secure_core_free_and_multi_physical_servers():
+    fleet = generate_fleet(2000, seed=0)
+
+    secure_core = [s for s in fleet if s["Features"] & ServerFeatureEnum.SECURE_CORE]
+    assert secure_core
+    assert all(s["EntryCountry"] != s["ExitCountry"] or s["EntryCountry"] in SECURE_CORE_COUNTRIES
+               for s in secure_core)
+    assert any(s["Tier"] == 0 for s in fleet)
+    assert any(len(s["Servers"]) > 1 for s in fleet)
+    assert len({s["Name"] for s in fleet}) == len(fleet)
+
+
+@pytest.mark.asyncio
+async def test_server_list_fetcher_fetches_and_updates_loads_from_fake_api(tmp_path):
+    async with FakeAPIServer(fleet_size=50) as server:
+        client = LoopbackAPIClient(server.port)
+        fetcher = ServerListFetcher(
+            _session(client), cache_file=CacheHandler(tmp_path / "serverlist.json")
+        )
+
+        server_list = await fetcher.fetch()
+        assert len(server_list) == len(server.logicals)
+
+        server_list = await fetcher.fetch()  # If-Modified-Since -> 304
+        assert len(server_list) == len(server.logicals)
+
+        await fetcher.update_loads()
+        await client.close()
+
+    assert server.request_count["/vpn/v1/logicals"] == 2
+    assert server.request_count["/vpn/v1/loads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_list_fetchers_sharing_a_cache_file_only_fetch_once(tmp_path):
+    """Simulates several processes, each with its own session, sharing the cache."""
+    async with FakeAPIServer(fleet_size=50) as server:
+        clients = [LoopbackAPIClient(server.port) for _ in range(3)]
+        fetchers = [
+            ServerListFetcher(
+                _session(client), cache_file=CacheHandler(tmp_path / "serverlist.json")
+            )
+            for client in clients
+        ]
+
+        server_lists = await asyncio.gather(*(fetcher.fetch() for fetcher in fetchers))
+        await asyncio.gather(*(fetcher.update_loads() for fetcher in fetchers))
+        for client in clients:
+            await client.close()
+
+    assert all(len(server_list) == len(server.logicals) for server_list in server_lists)
+    assert server.request_count["/vpn/v1/logicals"] == 1
+    assert server.request_count["/vpn/v1/loads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_returned_with_retry_after():
+    async with FakeAPIServer() as server:
+        client = LoopbackAPIClient(server.port)
+        server.inject_error("/vpn/v2", 429, retry_after=30)
+
+        with pytest.raises(ProtonAPIError) as error:
+            await client.async_api_request("/vpn/v2")
+        response = await client.async_api_request("/vpn/v2")
+        await client.close()
+
+    assert error.value.http_code == 429
+    assert error.value.http_headers["Retry-After"] == "30"
+    assert response["Code"] == 1000
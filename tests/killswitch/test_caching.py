@@ -0,0 +1,94 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from proton.vpn.killswitch.interface import CachingKillSwitch
+from proton.vpn.core.testing.counting_kill_switch import CountingKillSwitch
+
+
+@pytest.mark.asyncio
+async def test_enable_calls_are_always_forwarded():
+    backend = CountingKillSwitch()
+    kill_switch = CachingKillSwitch(backend)
+    server = Mock()
+
+    # The kill switch may have been disabled by another process in between.
+    await kill_switch.enable(server)
+    await kill_switch.enable(server)
+    await kill_switch.enable_ipv6_leak_protection()
+    await kill_switch.enable_ipv6_leak_protection()
+
+    assert backend.calls == [
+        ("enable", server, False),
+        ("enable", server, False),
+        ("enable_ipv6_leak_protection", False),
+        ("enable_ipv6_leak_protection", False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_disable_calls_are_only_forwarded_when_enabled_or_state_is_unknown():
+    backend = CountingKillSwitch()
+    kill_switch = CachingKillSwitch(backend)
+
+    await kill_switch.disable()
+    await kill_switch.disable()
+    await kill_switch.disable_ipv6_leak_protection()
+    await kill_switch.disable_ipv6_leak_protection()
+    await kill_switch.enable_ipv6_leak_protection()
+    await kill_switch.disable_ipv6_leak_protection()
+    await kill_switch.disable_ipv6_leak_protection()
+
+    assert backend.calls == [
+        ("disable",),
+        ("disable_ipv6_leak_protection",),
+        ("enable_ipv6_leak_protection", False),
+        ("disable_ipv6_leak_protection",),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_calls_are_forwarded_again_after_invalidating_the_cached_state():
+    backend = CountingKillSwitch()
+    kill_switch = CachingKillSwitch(backend)
+
+    await kill_switch.disable()
+    kill_switch.invalidate()
+    await kill_switch.disable()
+
+    assert backend.call_counts["disable"] == 2
+
+
+@pytest.mark.asyncio
+async def test_calls_are_forwarded_again_after_a_backend_error():
+    backend = AsyncMock()
+    kill_switch = CachingKillSwitch(backend)
+
+    await kill_switch.disable()
+    backend.disable.side_effect = RuntimeError("Backend error")
+    kill_switch.invalidate()
+
+    with pytest.raises(RuntimeError):
+        await kill_switch.disable()
+    backend.disable.side_effect = None
+    await kill_switch.disable()
+
+    assert backend.disable.call_count == 3
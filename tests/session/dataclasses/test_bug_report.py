@@ -0,0 +1,29 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from dataclasses import fields
+
+from proton.vpn.session.dataclasses import BugReportForm
+from proton.vpn.session.utils import generate_os_string, get_distro_version
+
+
+def test_bug_report_form_os_defaults_are_computed_on_instantiation():
+    # Computing them when the class is defined would load distro on import.
+    form_fields = {form_field.name: form_field for form_field in fields(BugReportForm)}
+    assert form_fields["os"].default_factory is generate_os_string
+    assert form_fields["os_version"].default_factory is get_distro_version
@@ -16,7 +16,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 """
+import time
+
 from proton.vpn.session.servers import LogicalServer, ServerFeatureEnum
+from proton.vpn.session.servers.types import ServerLoad
 from proton.vpn.session.servers.logicals import sort_servers_alphabetically_by_country_and_server_name, ServerList
 
 
@@ -141,3 +144,36 @@ def test_sort_servers_alphabetically_by_country_and_server_name():
     expected_server_name_order = ["AR#9", "AR#10", "JP#9", "JP-FREE#10", "Random Name"]
     actual_server_name_order = [server.name for server in logicals]
     assert actual_server_name_order == expected_server_name_order
+
+
+def test_server_list_update_computes_loads_churn():
+    server_list = ServerList(
+        user_tier=2,
+        logicals=[
+            LogicalServer({"ID": server_id, "Status": 1, "Score": 1.0, "Load": 10})
+            for server_id in range(5)
+        ]
+    )
+    assert server_list.loads_churn is None
+
+    server_list.update([
+        ServerLoad({"ID": 0, "Status": 1, "Score": 1.05, "Load": 15}),  # Within tolerances.
+        ServerLoad({"ID": 1, "Status": 1, "Score": 2.0, "Load": 10}),  # Score changed.
+        ServerLoad({"ID": 2, "Status": 0, "Score": 1.0, "Load": 10}),  # Status changed.
+        ServerLoad({"ID": 3, "Status": 1, "Score": 1.0, "Load": 60}),  # Load changed.
+        ServerLoad({"ID": 4, "Status": 1, "Score": 1.0, "Load": 10}),  # Nothing changed.
+    ])
+
+    assert server_list.loads_churn == 0.6
+
+
+def test_server_list_set_loads_refresh_interval_reschedules_loads_expiration():
+    server_list = ServerList(user_tier=2, logicals=[])
+    refresh_interval = 60 * 60
+
+    server_list.set_loads_refresh_interval(refresh_interval)
+
+    seconds_until_loads_expiration = server_list.loads_expiration_time - time.time()
+    randomness = ServerList.REFRESH_RANDOMNESS
+    assert refresh_interval * (1 - randomness) - 1 <= seconds_until_loads_expiration
+    assert seconds_until_loads_expiration <= refresh_interval * (1 + randomness)
@@ -0,0 +1,142 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+
+import pytest
+from proton.session.exceptions import ProtonAPIError
+
+from proton.vpn.session.api_metrics import APIMetrics
+from proton.vpn.session.rate_limiter import RateLimiter
+from proton.vpn.session.retry_policy import RetryPolicy
+from proton.vpn.session.utils import rest_api_request
+
+
+def test_record_aggregates_latency_status_codes_and_sizes_per_route():
+    metrics = APIMetrics()
+
+    metrics.record("/vpn/v1/loads", latency=0.2, response={"LogicalServers": []})
+    metrics.record("/vpn/v1/loads?Tier=2", latency=0.6, response={"LogicalServers": []})
+
+    route_metrics = metrics.get("/vpn/v1/loads")
+    assert route_metrics.request_count == 2
+    assert route_metrics.average_latency == pytest.approx(0.4)
+    assert route_metrics.max_latency == 0.6
+    assert route_metrics.latency_histogram[0.25] == 1
+    assert route_metrics.latency_histogram[1] == 1
+    assert route_metrics.status_codes == {200: 2}
+    # The size of parsed responses is unknown.
+    assert route_metrics.response_bytes == 0
+
+
+def test_record_uses_status_code_and_content_length_of_raw_responses():
+    metrics = APIMetrics()
+    not_modified_response = Mock()
+    not_modified_response.status_code = 304
+    not_modified_response.find_first_header.return_value = None
+
+    modified_response = Mock()
+    modified_response.status_code = 200
+    modified_response.find_first_header.return_value = "1024"
+
+    metrics.record("/vpn/v1/logicals", latency=0.1, response=not_modified_response)
+    metrics.record("/vpn/v1/logicals", latency=0.1, response=modified_response)
+
+    route_metrics = metrics.get("/vpn/v1/logicals")
+    assert route_metrics.not_modified_count == 1
+    assert route_metrics.status_codes == {200: 1, 304: 1}
+    assert route_metrics.response_bytes == 1024
+
+
+def test_record_uses_raw_body_length_when_content_length_is_missing():
+    metrics = APIMetrics()
+    response = Mock()
+    response.status_code = 200
+    response.find_first_header.return_value = None
+    response.content = b'{"Code":1000}'
+
+    metrics.record("/vpn/v1/logicals", latency=0.1, response=response)
+
+    assert metrics.get("/vpn/v1/logicals").response_bytes == len(b'{"Code":1000}')
+
+
+def test_record_counts_errors_by_type():
+    metrics = APIMetrics()
+    error = ProtonAPIError(422, {}, {"Code": 2001, "Error": "Invalid input"})
+
+    metrics.record("/vpn/v1/certificate", latency=0.1, error=error)
+
+    route_metrics = metrics.get("/vpn/v1/certificate")
+    assert route_metrics.error_count == 1
+    assert route_metrics.errors == {"ProtonAPIError": 1}
+    assert route_metrics.status_codes == {422: 1}
+    assert route_metrics.response_bytes == 0
+
+
+def _raw_response(json_response, content_length):
+    response = Mock()
+    response.status_code = 200
+    response.json = json_response
+    response.find_first_header.return_value = str(content_length)
+    return response
+
+
+@pytest.mark.asyncio
+async def test_rest_api_request_records_the_size_of_json_responses():
+    session = Mock()
+    session.async_api_request = AsyncMock(
+        return_value=_raw_response({"Code": 1000, "LogicalServers": []}, content_length=2048)
+    )
+    metrics = APIMetrics()
+
+    with patch("proton.vpn.session.utils._api_metrics", metrics), \
+            patch("proton.vpn.session.utils._api_retry_policy", RetryPolicy()), \
+            patch("proton.vpn.session.utils._api_rate_limiter", RateLimiter()):
+        response = await rest_api_request(session, "/vpn/v1/loads")
+
+    # The caller gets the parsed JSON, as when the raw response is not requested.
+    assert response == {"Code": 1000, "LogicalServers": []}
+    session.async_api_request.assert_awaited_once_with("/vpn/v1/loads", return_raw=True)
+    assert metrics.get("/vpn/v1/loads").request_count == 1
+    assert metrics.get("/vpn/v1/loads").status_codes == {200: 1}
+    assert metrics.get("/vpn/v1/loads").response_bytes == 2048
+
+
+@pytest.mark.asyncio
+async def test_rest_api_request_latency_excludes_the_time_waiting_for_the_request_lane():
+    session = Mock()
+    session.async_api_request = AsyncMock(return_value=_raw_response({"Code": 1000}, 13))
+    metrics = APIMetrics()
+    lanes = Mock()
+
+    lane_wait = 0.2
+
+    async def run_after_waiting_for_the_lane(priority, request):  # pylint: disable=unused-argument
+        await asyncio.sleep(lane_wait)
+        return await request()
+
+    lanes.run = run_after_waiting_for_the_lane
+
+    with patch("proton.vpn.session.utils._api_metrics", metrics), \
+            patch("proton.vpn.session.utils._api_retry_policy", RetryPolicy()), \
+            patch("proton.vpn.session.utils._api_rate_limiter", RateLimiter()), \
+            patch("proton.vpn.session.utils._api_request_lanes", lanes):
+        await rest_api_request(session, "/vpn/v2")
+
+    assert metrics.get("/vpn/v2").max_latency < lane_wait
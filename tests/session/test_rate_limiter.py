@@ -0,0 +1,119 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from proton.vpn.session.rate_limiter import (
+    RateLimiter, TokenBucket, background_requests, are_background_requests
+)
+
+
+# Patching the sleep function used by the rate limiter patches asyncio.sleep itself.
+_real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await _real_sleep(0)
+
+
+def test_token_bucket_refills_at_configured_rate_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=4, time_function=clock)
+    for _ in range(4):
+        bucket.consume()
+
+    assert bucket.seconds_until_available() == 0.5
+
+    clock.now += 10
+    assert bucket.tokens == 4
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_once_the_route_burst_is_exhausted():
+    clock = FakeClock()
+    limiter = RateLimiter(route_rate=1, route_capacity=2, time_function=clock)
+
+    with patch("proton.vpn.session.rate_limiter.asyncio.sleep", clock.sleep):
+        await limiter.acquire("/vpn/v1/loads")
+        await limiter.acquire("/vpn/v1/loads?Tier=2")  # Query string is ignored.
+        assert clock.now == 0
+
+        await limiter.acquire("/vpn/v1/loads")
+        assert clock.now == 1
+
+        # Other routes have their own bucket.
+        await limiter.acquire("/vpn/v2")
+        assert clock.now == 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_caps_the_global_rate_across_routes():
+    clock = FakeClock()
+    limiter = RateLimiter(global_rate=1, global_capacity=2, time_function=clock)
+
+    with patch("proton.vpn.session.rate_limiter.asyncio.sleep", clock.sleep):
+        for route in ("/a", "/b", "/c"):
+            await limiter.acquire(route)
+
+    assert clock.now == 1
+
+
+@pytest.mark.asyncio
+async def test_background_requests_leave_headroom_for_user_initiated_ones():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        route_rate=1, route_capacity=2, background_reserve=1, time_function=clock
+    )
+
+    with patch("proton.vpn.session.rate_limiter.asyncio.sleep", clock.sleep):
+        await limiter.acquire("/route", background=True)
+        assert clock.now == 0
+
+        # The next background request would consume the reserved token...
+        await limiter.acquire("/route", background=True)
+        assert clock.now == 1
+
+    # ...whereas a user-initiated one can use it straight away.
+    clock.now = 0
+    limiter = RateLimiter(
+        route_rate=1, route_capacity=2, background_reserve=1, time_function=clock
+    )
+    with patch("proton.vpn.session.rate_limiter.asyncio.sleep", clock.sleep):
+        await limiter.acquire("/route", background=True)
+        await limiter.acquire("/route", background=False)
+        assert clock.now == 0
+
+
+def test_background_requests_context_flags_requests_as_background():
+    assert not are_background_requests()
+
+    with background_requests():
+        assert are_background_requests()
+
+    assert not are_background_requests()
@@ -0,0 +1,94 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+import pytest
+
+from proton.vpn.session.exceptions import BackgroundRequestPreemptedError
+from proton.vpn.session.rate_limiter import background_requests
+from proton.vpn.session.request_priority import RequestLanes, RequestPriority
+
+
+def test_request_priority_is_inferred_from_context():
+    assert RequestPriority.from_context() is RequestPriority.INTERACTIVE
+
+    with background_requests():
+        assert RequestPriority.from_context() is RequestPriority.BACKGROUND
+
+
+@pytest.mark.asyncio
+async def test_background_requests_are_paused_while_interactive_requests_are_in_flight():
+    lanes = RequestLanes()
+    interactive_request_done = asyncio.Event()
+    order = []
+
+    async def interactive_request():
+        await interactive_request_done.wait()
+        order.append("interactive")
+
+    async def background_request():
+        order.append("background")
+
+    interactive_task = asyncio.create_task(
+        lanes.run(RequestPriority.INTERACTIVE, interactive_request)
+    )
+    await asyncio.sleep(0)
+    background_task = asyncio.create_task(
+        lanes.run(RequestPriority.BACKGROUND, background_request)
+    )
+    await asyncio.sleep(0)
+    assert order == []
+
+    interactive_request_done.set()
+    await asyncio.gather(interactive_task, background_task)
+
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_preempted_background_requests_raise_preempted_error():
+    lanes = RequestLanes()
+    request_started = asyncio.Event()
+
+    async def slow_background_request():
+        request_started.set()
+        await asyncio.sleep(10)
+
+    background_task = asyncio.create_task(
+        lanes.run(RequestPriority.BACKGROUND, slow_background_request)
+    )
+    await request_started.wait()
+    assert lanes.background_requests_in_flight == 1
+
+    lanes.preempt_background_requests()
+
+    with pytest.raises(BackgroundRequestPreemptedError):
+        await background_task
+    assert lanes.background_requests_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_preempt_background_requests_does_not_affect_interactive_requests():
+    lanes = RequestLanes()
+
+    async def interactive_request():
+        lanes.preempt_background_requests()
+        return "response"
+
+    assert await lanes.run(RequestPriority.INTERACTIVE, interactive_request) == "response"
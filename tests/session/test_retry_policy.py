@@ -0,0 +1,154 @@
+"""
+Copyright (c) 2024 Proton AG
+
+This file is part of Proton VPN.
+
+Proton VPN is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Proton VPN is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from unittest.mock import Mock
+
+import pytest
+from proton.session.exceptions import ProtonAPIError, ProtonAPINotReachable
+
+from proton.vpn.session.exceptions import APICircuitOpenError
+from proton.vpn.session.retry_policy import (
+    RetryPolicy, CircuitState, get_retry_after, is_retryable_error
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_next_delay_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(base_delay=1, max_delay=5, randomness=0)
+
+    delays = []
+    for _ in range(5):
+        policy.record_failure()
+        delays.append(policy.get_next_delay())
+
+    assert delays == [1, 2, 4, 5, 5]
+
+
+def test_get_next_delay_honours_retry_after():
+    clock = FakeClock()
+    policy = RetryPolicy(base_delay=1, randomness=0, time_function=clock)
+
+    policy.record_failure(retry_after=120)
+
+    assert policy.get_next_delay() == 120
+
+
+def test_record_success_resets_backoff():
+    policy = RetryPolicy(randomness=0)
+    policy.record_failure()
+    policy.record_failure()
+
+    policy.record_success()
+
+    assert policy.failed_attempts == 0
+    assert policy.get_next_delay() == 0
+
+
+def test_circuit_opens_after_failure_threshold_and_half_opens_after_reset_timeout():
+    clock = FakeClock()
+    policy = RetryPolicy(failure_threshold=2, reset_timeout=30, time_function=clock)
+
+    policy.record_failure()
+    assert policy.state is CircuitState.CLOSED
+
+    policy.record_failure()
+    assert policy.state is CircuitState.OPEN
+    assert policy.start_request() is None
+    assert policy.seconds_until_retry_allowed == 30
+
+    clock.now += 30
+    assert policy.state is CircuitState.HALF_OPEN
+    assert policy.start_request().is_probe
+    # Only one probe request is allowed while half-open.
+    assert policy.start_request() is None
+
+
+@pytest.mark.parametrize("probe_succeeds, expected_state", [
+    (True, CircuitState.CLOSED),
+    (False, CircuitState.OPEN),
+])
+def test_probe_outcome_closes_or_reopens_the_circuit(probe_succeeds, expected_state):
+    clock = FakeClock()
+    policy = RetryPolicy(failure_threshold=1, reset_timeout=30, time_function=clock)
+    policy.record_failure()
+    clock.now += 30
+    probe = policy.start_request()
+
+    if probe_succeeds:
+        policy.record_success()
+    else:
+        policy.record_failure(attempt=probe)
+
+    assert policy.state is expected_state
+
+
+def test_interactive_requests_are_allowed_as_probes_while_the_circuit_is_open():
+    clock = FakeClock()
+    policy = RetryPolicy(failure_threshold=1, reset_timeout=30, time_function=clock)
+    policy.record_failure()
+    assert policy.start_request() is None
+
+    attempt = policy.start_request(interactive=True)
+
+    assert attempt.is_probe
+    policy.record_success()
+    assert policy.state is CircuitState.CLOSED
+
+
+def test_failure_of_a_request_in_flight_before_the_circuit_opened_does_not_fail_the_probe():
+    clock = FakeClock()
+    policy = RetryPolicy(failure_threshold=1, reset_timeout=30, time_function=clock)
+    request_in_flight = policy.start_request()
+    policy.record_failure()
+    clock.now += 30
+    policy.start_request()  # Probe.
+
+    policy.record_failure(attempt=request_in_flight)
+
+    assert policy.state is CircuitState.HALF_OPEN
+    # The probe is still in flight.
+    assert policy.start_request() is None
+
+
+@pytest.mark.parametrize("error, expected_result", [
+    (ProtonAPINotReachable("Not reachable"), True),
+    (ProtonAPIError(429, {}, {"Code": 429, "Error": "Too many requests"}), True),
+    (ProtonAPIError(503, {}, {"Code": 503, "Error": "Unavailable"}), True),
+    (ProtonAPIError(422, {}, {"Code": 2001, "Error": "Invalid input"}), False),
+    (RuntimeError("Unexpected"), False),
+])
+def test_is_retryable_error(error, expected_result):
+    assert is_retryable_error(error) is expected_result
+
+
+@pytest.mark.parametrize("error, expected_retry_after", [
+    (ProtonAPIError(429, {"Retry-After": "42"}, {"Code": 429, "Error": "Too many requests"}), 42),
+    (ProtonAPIError(429, {"retry-after": "7"}, {"Code": 429, "Error": "Too many requests"}), 7),
+    (ProtonAPIError(503, {}, {"Code": 503, "Error": "Unavailable"}), None),
+    (APICircuitOpenError(retry_after=15), 15),
+    (Mock(spec=Exception), None),
+])
+def test_get_retry_after(error, expected_retry_after):
+    assert get_retry_after(error) == expected_retry_after
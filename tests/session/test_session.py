@@ -19,7 +19,7 @@ along with ProtonVPN.  If not, see <https://www.gnu.org/licenses/>.
 import tempfile
 from os.path import basename
 from unittest.mock import patch
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
@@ -122,3 +122,62 @@ async def test_submit_report():
         assert form_field.value == bug_report.attachments[1]
         assert form_field.filename == basename(form_field.value.name)
 
+
+
+def create_session_restored_from_keyring(fetcher):
+    s = VPNSession(fetcher=fetcher)
+    with patch("proton.vpn.session.session.VPNAccount"), \
+            patch("proton.vpn.session.session.Session.__setstate__"):
+        s.__setstate__({"vpn": {}})
+    return s
+
+
+def test_setstate_defers_loading_session_data_from_cache_until_it_is_accessed():
+    fetcher = Mock()
+    s = create_session_restored_from_keyring(fetcher)
+
+    fetcher.load_server_list_from_cache.assert_not_called()
+    fetcher.load_client_config_from_cache.assert_not_called()
+    fetcher.load_feature_flags_from_cache.assert_not_called()
+
+    assert s.server_list is fetcher.load_server_list_from_cache.return_value
+    assert s.server_list is fetcher.load_server_list_from_cache.return_value
+    fetcher.load_server_list_from_cache.assert_called_once()
+    fetcher.load_client_config_from_cache.assert_not_called()
+    fetcher.load_feature_flags_from_cache.assert_not_called()
+
+
+def test_session_data_is_none_when_it_could_not_be_loaded_from_cache():
+    fetcher = Mock()
+    fetcher.load_client_config_from_cache.side_effect = ValueError("Invalid cache")
+    s = create_session_restored_from_keyring(fetcher)
+
+    assert s.client_config is None
+    assert not s.loaded
+
+
+@pytest.mark.asyncio
+async def test_fetch_client_config_discards_pending_load_from_cache():
+    fetcher = Mock()
+    new_client_config = Mock()
+    fetcher.fetch_client_config = AsyncMock(return_value=new_client_config)
+    s = create_session_restored_from_keyring(fetcher)
+
+    await s.fetch_client_config()
+
+    assert s.client_config is new_client_config
+    fetcher.load_client_config_from_cache.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_server_list_loads_cached_server_list_first():
+    """The cached server list is required to only fetch it again if it was modified."""
+    fetcher = Mock()
+    new_server_list = Mock()
+    fetcher.fetch_server_list = AsyncMock(return_value=new_server_list)
+    s = create_session_restored_from_keyring(fetcher)
+
+    await s.fetch_server_list()
+
+    fetcher.load_server_list_from_cache.assert_called_once()
+    assert s.server_list is new_server_list
@@ -1,6 +1,13 @@
+from unittest.mock import Mock, AsyncMock, patch
+
 import pytest
+from proton.session.exceptions import ProtonAPINotReachable
 
-from proton.vpn.session.utils import to_semver_build_metadata_format
+from proton.vpn.session.exceptions import APICircuitOpenError
+from proton.vpn.session.rate_limiter import RateLimiter
+from proton.vpn.session.request_priority import RequestPriority
+from proton.vpn.session.retry_policy import RetryPolicy
+from proton.vpn.session.utils import to_semver_build_metadata_format, rest_api_request
 
 
 @pytest.mark.parametrize("input,expected_output", [
@@ -12,3 +19,43 @@ from proton.vpn.session.utils import to_semver_build_metadata_format
 ])
 def test_to_semver_build_metadata_format(input, expected_output):
     assert to_semver_build_metadata_format(input) == expected_output
+
+
+@pytest.mark.asyncio
+async def test_rest_api_request_fails_fast_once_the_api_circuit_is_open():
+    session = Mock()
+    session.async_api_request = AsyncMock(side_effect=ProtonAPINotReachable("Not reachable"))
+    retry_policy = RetryPolicy(failure_threshold=2, reset_timeout=30)
+
+    with patch("proton.vpn.session.utils._api_retry_policy", retry_policy), \
+            patch("proton.vpn.session.utils._api_rate_limiter", RateLimiter()):
+        for _ in range(2):
+            with pytest.raises(ProtonAPINotReachable):
+                await rest_api_request(session, "/route", priority=RequestPriority.BACKGROUND)
+
+        with pytest.raises(APICircuitOpenError) as error:
+            await rest_api_request(session, "/route", priority=RequestPriority.BACKGROUND)
+
+    assert session.async_api_request.await_count == 2
+    assert 0 < error.value.retry_after <= 30
+
+
+@pytest.mark.asyncio
+async def test_rest_api_request_interactive_requests_close_the_open_circuit_once_the_api_recovers():
+    session = Mock()
+    session.async_api_request = AsyncMock(side_effect=ProtonAPINotReachable("Not reachable"))
+    retry_policy = RetryPolicy(failure_threshold=1, reset_timeout=30)
+
+    with patch("proton.vpn.session.utils._api_retry_policy", retry_policy), \
+            patch("proton.vpn.session.utils._api_rate_limiter", RateLimiter()):
+        with pytest.raises(ProtonAPINotReachable):
+            await rest_api_request(session, "/route", priority=RequestPriority.BACKGROUND)
+
+        session.async_api_request.side_effect = None
+        session.async_api_request.return_value = Mock(
+            status_code=200, json={"Code": 1000}, **{"find_first_header.return_value": None}
+        )
+        response = await rest_api_request(session, "/route", priority=RequestPriority.INTERACTIVE)
+
+    assert response == {"Code": 1000}
+    assert retry_policy.start_request() is not None